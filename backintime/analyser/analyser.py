@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from itertools import islice
 from backintime.timeframes import Timeframes, estimate_close_time
+from backintime.data.columns import CandleColumns, to_decimal
+from backintime.resampling import ResampledCandles, resample
 
 from .indicators.base import MarketData
 from .indicators.adx import adx
@@ -118,6 +120,61 @@ class AnalyserBuffer:
                     volumes[-1] += candle.volume
 
 
+class ResampledAnalyserBuffer(AnalyserBuffer):
+    """
+    `AnalyserBuffer` for candles known up front. Each timeframe 
+    is resampled from `columns` at once, when reserved, so that 
+    `update` only moves the current position. 
+    Must be updated with candles of `columns`, in the same order.
+    """
+    def __init__(self, start_time: datetime, columns: CandleColumns):
+        self._start_time = start_time
+        self._columns = columns
+        self._data: t.Dict[Timeframes, t.Dict] = {}
+        self._resampled: t.Dict[Timeframes, ResampledCandles] = {}
+        self._position = -1
+
+    @property
+    def position(self) -> int:
+        """Index of the last candle the buffer was updated with."""
+        return self._position
+
+    def reserve(self, 
+                timeframe: Timeframes, 
+                candle_property: CandleProperties,
+                quantity: int) -> None:
+        if not timeframe in self._resampled:
+            self._resampled[timeframe] = resample(self._columns, timeframe)
+            self._data[timeframe] = {}
+        tf_data = self._data[timeframe]
+        tf_data[candle_property] = max(quantity, 
+                                       tf_data.get(candle_property, 0))
+
+    def get_values(self, 
+                   timeframe: Timeframes, 
+                   candle_property: CandleProperties,
+                   limit: int) -> t.List[Decimal]:
+        limit = min(limit, self._data[timeframe][candle_property])
+        position = self._position
+        if position < 0 or limit <= 0:
+            return []
+
+        name = candle_property.value.lower()
+        resampled = self._resampled[timeframe]
+        bar_index = int(resampled.bar_index[position])
+        closed_bars = getattr(resampled.bars, name)
+        values = closed_bars[max(0, bar_index - limit + 1):bar_index].tolist()
+        values.append(getattr(resampled.partial, name)[position])
+        return [ to_decimal(float(value)) for value in values ]
+
+    def skip(self, count: int) -> None:
+        """Move the current position by `count` candles."""
+        self._position += count
+
+    def update(self, candle) -> None:
+        self._position += 1
+
+
 class MarketDataInfo(MarketData):
     """
     Wrapper around `AnalyserBuffer` that provides a read-only
@@ -138,19 +195,23 @@ class Analyser:
     def __init__(self, buffer: AnalyserBuffer):
         self._market_data = MarketDataInfo(buffer)
 
+    def _calculate(self, indicator: t.Callable, *args) -> t.Any:
+        """Calculate `indicator` on the buffered market data."""
+        return indicator(self._market_data, *args)
+
     def sma(self, 
             timeframe: Timeframes,
             candle_property: CandleProperties = CLOSE,
             period: int = 9) -> numpy.ndarray:
         """Simple Moving Average, also known as 'MA'."""
-        return sma(self._market_data, timeframe, candle_property, period)
+        return self._calculate(sma, timeframe, candle_property, period)
 
     def ema(self, 
             timeframe: Timeframes,
             candle_property: CandleProperties = CLOSE,
             period: int = 9) -> numpy.ndarray:
         """Exponential Moving Average (EMA)."""
-        return ema(self._market_data, timeframe, candle_property, period)
+        return self._calculate(ema, timeframe, candle_property, period)
 
     def adx(self, timeframe: Timeframes, period: int = 14) -> numpy.ndarray:
         """
@@ -162,11 +223,11 @@ class Analyser:
         and readings above 40 indicate trend strength. 
         An extremely strong trend is indicated by readings above 50.
         """
-        return adx(self._market_data, timeframe, period)
+        return self._calculate(adx, timeframe, period)
 
     def atr(self, timeframe: Timeframes, period: int = 14) -> numpy.ndarray:
         """Average True Range (ATR)."""
-        return atr(self._market_data, timeframe, period)
+        return self._calculate(atr, timeframe, period)
 
     def rsi(self, timeframe: Timeframes, period: int = 14) -> numpy.ndarray:
         """
@@ -177,7 +238,7 @@ class Analyser:
         Traditionally, and according to Wilder, RSI is considered 
         overbought when above 70 and oversold when below 30.
         """
-        return rsi(self._market_data, timeframe, period)
+        return self._calculate(rsi, timeframe, period)
 
     def bbands(self, 
                timeframe: Timeframes,
@@ -194,13 +255,13 @@ class Analyser:
         The bands automatically widen when volatility increases
         and narrow when volatility decreases.
         """
-        return bbands(self._market_data, timeframe, 
-                      candle_property, period, deviation_quotient)
+        return self._calculate(bbands, timeframe, 
+                               candle_property, period, deviation_quotient)
 
     def dmi(self, timeframe: Timeframes,
                 period: int = 14) -> DMIResultSequence:
         """Directional Movement Indicator (DMI)."""
-        return dmi(self._market_data, timeframe, period)
+        return self._calculate(dmi, timeframe, period)
 
     def macd(self, 
              timeframe: Timeframes,
@@ -213,8 +274,8 @@ class Analyser:
         Trend-following momentum indicator that shows the 
         relationship between two moving averages of prices.
         """
-        return macd(self._market_data, 
-                    timeframe, fastperiod, slowperiod, signalperiod)
+        return self._calculate(macd, timeframe, 
+                               fastperiod, slowperiod, signalperiod)
 
     def pivot(self, 
               timeframe: Timeframes,
@@ -228,7 +289,7 @@ class Analyser:
         The pivot points come as a technical analysis indicator
         calculated using a security’s high, low, and close.
         """
-        return pivot(self._market_data, timeframe, period)
+        return self._calculate(pivot, timeframe, period)
 
     def pivot_fib(self, 
                   timeframe: Timeframes,
@@ -242,7 +303,7 @@ class Analyser:
         The pivot points come as a technical analysis indicator
         calculated using a security’s high, low, and close.
         """
-        return pivot_fib(self._market_data, timeframe, period)
+        return self._calculate(pivot_fib, timeframe, period)
 
     def pivot_classic(self, 
                       timeframe: Timeframes,
@@ -256,4 +317,4 @@ class Analyser:
         The pivot points come as a technical analysis indicator
         calculated using a security’s high, low, and close.
         """
-        return pivot_classic(self._market_data, timeframe, period)
\ No newline at end of file
+        return self._calculate(pivot_classic, timeframe, period)
\ No newline at end of file
@@ -10,6 +10,8 @@ from .base import MarketData, IndicatorParam, IndicatorResultSequence
 
 @dataclass
 class BbandsResultItem:
+    __slots__ = ('upper_band', 'middle_band', 'lower_band')
+
     upper_band: numpy.float64
     middle_band: numpy.float64
     lower_band: numpy.float64
@@ -10,6 +10,8 @@ from .base import MarketData, IndicatorParam, IndicatorResultSequence
 
 @dataclass
 class DMIResultItem:
+    __slots__ = ('adx', 'positive_di', 'negative_di')
+
     adx: numpy.float64
     positive_di: numpy.float64
     negative_di: numpy.float64
@@ -10,6 +10,8 @@ from .base import MarketData, IndicatorParam, IndicatorResultSequence
 
 @dataclass
 class MacdResultItem:
+    __slots__ = ('macd', 'signal', 'hist')
+
     macd: numpy.float64
     signal: numpy.float64
     hist: numpy.float64
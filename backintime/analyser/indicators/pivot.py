@@ -10,6 +10,10 @@ from .base import MarketData, IndicatorParam, IndicatorResultSequence
 
 @dataclass
 class TraditionalPivotPointsItem:
+    __slots__ = (
+        'pivot', 's1', 's2', 's3', 's4', 's5', 'r1', 'r2', 'r3', 'r4', 'r5'
+    )
+
     pivot:  numpy.float64
     s1:     numpy.float64
     s2:     numpy.float64
@@ -25,6 +29,8 @@ class TraditionalPivotPointsItem:
 
 @dataclass
 class ClassicPivotPointsItem:
+    __slots__ = ('pivot', 's1', 's2', 's3', 's4', 'r1', 'r2', 'r3', 'r4')
+
     pivot:  numpy.float64
     s1:     numpy.float64
     s2:     numpy.float64
@@ -38,6 +44,8 @@ class ClassicPivotPointsItem:
 
 @dataclass
 class FibonacciPivotPointsItem:
+    __slots__ = ('pivot', 's1', 's2', 's3', 'r1', 'r2', 'r3')
+
     pivot:  numpy.float64
     s1:     numpy.float64
     s2:     numpy.float64
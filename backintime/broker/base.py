@@ -52,6 +52,8 @@ class OrderOptions:
 
 
 class OrderInfo(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def order_id(self) -> int:
@@ -128,10 +130,12 @@ class MarketOrderOptions(OrderOptions):
 
 
 class MarketOrderInfo(OrderInfo): 
-    pass
+    __slots__ = ()
 
 
 class StrategyOrderInfo(OrderInfo):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def trigger_price(self) -> Decimal:
@@ -156,7 +160,7 @@ class TakeProfitOptions(OrderOptions):
 
 
 class TakeProfitInfo(StrategyOrderInfo):
-    pass
+    __slots__ = ()
 
 
 class StopLossOptions(OrderOptions):
@@ -172,7 +176,7 @@ class StopLossOptions(OrderOptions):
 
 
 class StopLossInfo(StrategyOrderInfo):
-    pass
+    __slots__ = ()
 
 
 class LimitOrderOptions(OrderOptions):
@@ -190,6 +194,8 @@ class LimitOrderOptions(OrderOptions):
 
 
 class LimitOrderInfo(OrderInfo):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def take_profit(self) -> t.Optional[TakeProfitInfo]:
@@ -202,6 +208,8 @@ class LimitOrderInfo(OrderInfo):
 
 
 class TradeInfo(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def trade_id(self) -> int:
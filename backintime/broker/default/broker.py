@@ -149,6 +149,11 @@ class Broker(AbstractBroker):
         equity = fiat_balance + crypto_balance * market_price
         return equity.quantize(self._min_fiat, ROUND_FLOOR)
 
+    @property
+    def has_pending_orders(self) -> bool:
+        """Whether `update` may execute or activate any order."""
+        return self._orders.has_pending_orders()
+
     def iter_orders(self) -> t.Iterator[OrderInfo]:
         """Get orders iterator."""
         for order_id, order in self._orders:
@@ -31,6 +31,10 @@ from backintime.broker.base import (
 # Orders implementation
 class Order:
     """Base class for all orders."""
+    __slots__ = ('side', 'order_type', 'amount', 'order_price',
+                 'date_created', 'date_updated', 'status',
+                 '_fill_price', '_trading_fee', 'min_fiat', 'min_crypto')
+
     def __init__(self, 
                  side: OrderSide, 
                  order_type: OrderType,
@@ -76,6 +80,8 @@ class Order:
 
 
 class MarketOrder(Order):
+    __slots__ = ()
+
     def __init__(self, 
                  side: OrderSide, 
                  amount: Decimal,
@@ -88,6 +94,8 @@ class MarketOrder(Order):
 
 # Strategy orders have trigger price
 class StrategyOrder(Order):
+    __slots__ = ('trigger_price', 'date_activated')
+
     def __init__(self,
                  side: OrderSide,
                  order_type: OrderType,
@@ -105,6 +113,8 @@ class StrategyOrder(Order):
 
 
 class TakeProfitOrder(StrategyOrder):
+    __slots__ = ()
+
     def __init__(self,
                  side: OrderSide,
                  amount: Decimal,
@@ -121,6 +131,8 @@ class TakeProfitOrder(StrategyOrder):
 
 
 class StopLossOrder(StrategyOrder):
+    __slots__ = ()
+
     def __init__(self,
                  side: OrderSide,
                  amount: Decimal,
@@ -138,6 +150,9 @@ class StopLossOrder(StrategyOrder):
 
 # Limit orders have optional TP/SL
 class LimitOrder(Order):
+    __slots__ = ('take_profit_options', 'stop_loss_options',
+                 'take_profit', 'stop_loss')
+
     def __init__(self, 
                  side: OrderSide,
                  amount: Decimal,
@@ -163,6 +178,8 @@ class OrderInfo(base.OrderInfo):
     Wrapper around `Order` that provides a read-only view
     into the wrapped `Order` data.
     """
+    __slots__ = ('_order_id', '_order')
+
     def __init__(self, order_id: int, order: Order):
         self._order_id = order_id
         self._order = order
@@ -222,11 +239,15 @@ class OrderInfo(base.OrderInfo):
 
 
 class MarketOrderInfo(OrderInfo, base.MarketOrderInfo): 
+    __slots__ = ()
+
     def __init__(self, order_id: int, order: MarketOrder):
         super().__init__(order_id, order)
 
 
 class StrategyOrderInfo(OrderInfo, base.StrategyOrderInfo):
+    __slots__ = ()
+
     def __init__(self, order_id: int, order: StrategyOrder):
         super().__init__(order_id, order)
 
@@ -240,22 +261,36 @@ class StrategyOrderInfo(OrderInfo, base.StrategyOrderInfo):
 
 
 class TakeProfitInfo(StrategyOrderInfo):
+    __slots__ = ()
+
     def __init__(self, order_id: int, order: TakeProfitOrder):
         super().__init__(order_id, order)
 
 
 class StopLossInfo(StrategyOrderInfo):
+    __slots__ = ()
+
     def __init__(self, order_id: int, order: StopLossOrder):
         super().__init__(order_id, order)
 
 
-@dataclass
+@dataclass(init=False)
 class StrategyOrders:
-    take_profit_id: t.Optional[int] = None
-    stop_loss_id: t.Optional[int] = None
+    __slots__ = ('take_profit_id', 'stop_loss_id')
+
+    take_profit_id: t.Optional[int]
+    stop_loss_id: t.Optional[int]
+
+    def __init__(self, 
+                 take_profit_id: t.Optional[int] = None, 
+                 stop_loss_id: t.Optional[int] = None):
+        self.take_profit_id = take_profit_id
+        self.stop_loss_id = stop_loss_id
 
 
 class LimitOrderInfo(OrderInfo, base.LimitOrderInfo):
+    __slots__ = ('_strategy_orders',)
+
     def __init__(self, 
                  order_id: int, 
                  order: LimitOrder, 
@@ -279,6 +314,8 @@ class LimitOrderInfo(OrderInfo, base.LimitOrderInfo):
 
 
 class TradeInfo(base.TradeInfo):
+    __slots__ = ('_trade_id', '_order_info', '_result_balance')
+
     def __init__(self, 
                  trade_id: int, 
                  order_info: OrderInfo, 
@@ -20,6 +20,9 @@ class OrdersRepository(abc.Iterable):
         self._orders_counter = count()
         self._orders_map: t.Dict[int, Order] = {}
         self._linked_strategy_orders: t.Dict[int, StrategyOrders] = {}
+        # Number of entries in market/limit orders for each open order
+        self._open_orders: t.Dict[int, int] = {}
+        self._peak_open_orders = 0
 
     def get_order(self, order_id: int) -> t.Optional[Order]:
         return self._orders_map.get(order_id)
@@ -36,18 +39,49 @@ class OrdersRepository(abc.Iterable):
         for order_id in self._strategy_orders.copy():
             yield (order_id, self._orders_map[order_id])
 
+    def has_pending_orders(self) -> bool:
+        """Whether there are orders to review on the next update."""
+        return bool(self._market_orders or self._limit_orders)
+
+    def count_pending_orders(self) -> int:
+        """Get number of orders to review on the next update."""
+        return len(self._market_orders) + len(self._limit_orders)
+
+    def count_open_orders(self) -> int:
+        """Get number of orders that are neither executed nor cancelled."""
+        return len(self._open_orders)
+
+    @property
+    def peak_open_orders(self) -> int:
+        """The largest number of orders that were open at once."""
+        return self._peak_open_orders
+
+    def _open_order(self, order_id: int) -> None:
+        entries = self._open_orders.get(order_id, 0)
+        self._open_orders[order_id] = entries + 1
+        if not entries:
+            self._peak_open_orders = max(self._peak_open_orders, 
+                                         len(self._open_orders))
+
+    def _close_order(self, order_id: int) -> None:
+        entries = self._open_orders.pop(order_id) - 1
+        if entries:
+            self._open_orders[order_id] = entries
+
     def get_linked_orders(self, order_id: int) -> StrategyOrders:
         return self._linked_strategy_orders[order_id]
 
     def add_market_order(self, order: MarketOrder) -> int:
         order_id = next(self._orders_counter)
         self._market_orders.append(order_id)
+        self._open_order(order_id)
         self._orders_map[order_id] = order
         return order_id 
 
     def add_limit_order(self, order: LimitOrder) -> int:
         order_id = next(self._orders_counter)
         self._limit_orders.append(order_id)
+        self._open_order(order_id)
         self._orders_map[order_id] = order
         # Create shared obj for linked TP/SL orders 
         strategy_orders = StrategyOrders()
@@ -84,18 +118,24 @@ class OrdersRepository(abc.Iterable):
 
     def add_order_to_market_orders(self, order_id: int) -> None:
         self._market_orders.append(order_id)
+        self._open_order(order_id)
 
     def add_order_to_limit_orders(self, order_id: int) -> None:
         self._limit_orders.append(order_id)
+        self._open_order(order_id)
 
     def remove_market_orders(self) -> None:
+        for order_id in self._market_orders:
+            self._close_order(order_id)
         self._market_orders = []
 
     def remove_market_order(self, order_id: int) -> None:
         self._market_orders.remove(order_id)
+        self._close_order(order_id)
 
     def remove_limit_order(self, order_id: int) -> None:
         self._limit_orders.remove(order_id)
+        self._close_order(order_id)
 
     def remove_take_profit_order(self, order_id: int) -> None:
         self.remove_strategy_order(order_id)
@@ -106,14 +146,17 @@ class OrdersRepository(abc.Iterable):
     def remove_strategy_order(self, order_id: int) -> None:
         if order_id in self._limit_orders:
             self._limit_orders.remove(order_id)
+            self._close_order(order_id)
         if order_id in self._market_orders:
             self._market_orders.remove(order_id)
+            self._close_order(order_id)
         if order_id in self._strategy_orders:
             self._strategy_orders.remove(order_id)
 
     def _add_strategy_order(self, order: StrategyOrder) -> int:
         order_id = next(self._orders_counter)
         self._limit_orders.append(order_id)
+        self._open_order(order_id)
         self._strategy_orders.append(order_id)
         self._orders_map[order_id] = order
         return order_id
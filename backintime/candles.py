@@ -1,26 +1,61 @@
+import numpy
 import typing as t
-from dataclasses import dataclass, replace
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from decimal import Decimal
 from .data.candle import Candle as InputCandle
+from .data.columns import (
+    CandleColumns, 
+    COLUMNS, 
+    TIME_COLUMNS, 
+    to_millis, 
+    from_millis, 
+    to_decimal
+)
+from .resampling import ResampledCandles, resample
 from .timeframes import Timeframes, estimate_close_time
 
 
-@dataclass
+_NAN = Decimal('NaN')
+
+
+# Slotted dataclass with defaults requires explicit `__init__`
+@dataclass(init=False)
 class Candle:
     """
     Contains a snapshot of OHLCV data of a candle. 
     The `is_closed` attribute can be used to determine if 
     the data is in its final state (i.e., the candle is closed).
     """
+    __slots__ = ('open_time', 'close_time', 'open', 'high', 
+                 'low', 'close', 'volume', 'is_closed')
+
     open_time:  datetime
     close_time: datetime
-    open:       Decimal = Decimal('NaN')
-    high:       Decimal = Decimal('NaN')
-    low:        Decimal = Decimal('NaN')
-    close:      Decimal = Decimal('NaN')
-    volume:     Decimal = Decimal('NaN')
-    is_closed:  bool = False
+    open:       Decimal
+    high:       Decimal
+    low:        Decimal
+    close:      Decimal
+    volume:     Decimal
+    is_closed:  bool
+
+    def __init__(self,
+                 open_time: datetime,
+                 close_time: datetime,
+                 open: Decimal = _NAN,
+                 high: Decimal = _NAN,
+                 low: Decimal = _NAN,
+                 close: Decimal = _NAN,
+                 volume: Decimal = _NAN,
+                 is_closed: bool = False):
+        self.open_time = open_time
+        self.close_time = close_time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.is_closed = is_closed
 
 
 class CandleNotFound(Exception):
@@ -35,6 +70,67 @@ def _create_placeholder_candle(open_time: datetime,
     return Candle(open_time=open_time, close_time=close_time)
 
 
+class CandlesHistory:
+    """
+    Ring buffer of the last `depth` closed candles, stored 
+    column-wise (see `CandleColumns`). Each value is written twice, 
+    `depth` items apart, so that the last candles always occupy 
+    a contiguous range and can be returned as views.
+    """
+    def __init__(self, depth: int):
+        self._depth = depth
+        self._arrays = {
+            name: numpy.zeros(2*depth, dtype=numpy.int64) 
+                    if name in TIME_COLUMNS else numpy.full(2*depth, numpy.nan)
+                for name in COLUMNS
+        }
+        self._position = 0     # where the next candle is written
+        self._count = 0
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, candle: Candle) -> None:
+        values = (to_millis(candle.open_time), to_millis(candle.close_time),
+                  float(candle.open), float(candle.high), float(candle.low),
+                  float(candle.close), float(candle.volume))
+        position = self._position
+        mirror = position + self._depth
+        for name, value in zip(COLUMNS, values):
+            array = self._arrays[name]
+            array[position] = value
+            array[mirror] = value
+        self._position = (position + 1) % self._depth
+        self._count = min(self._count + 1, self._depth)
+
+    def last(self, count: int) -> CandleColumns:
+        """
+        Get read-only views of at most `count` last candles, 
+        in historical order.
+        """
+        count = min(count, self._count)
+        end = self._position + self._depth
+        views = []
+        for name in COLUMNS:
+            view = self._arrays[name][end - count:end]
+            view.flags.writeable = False
+            views.append(view)
+        return CandleColumns(*views)
+
+
+def _get_depths(timeframes: t.Union[t.Set[Timeframes], 
+                                    t.Dict[Timeframes, int]]
+                ) -> t.Dict[Timeframes, int]:
+    """Map timeframes to history depth (0 if not specified)."""
+    if isinstance(timeframes, dict):
+        return dict(timeframes)
+    return { timeframe: 0 for timeframe in timeframes }
+
+
 class CandlesBuffer:
     """
     Provides the last candle representation for all timeframes
@@ -42,13 +138,22 @@ class CandlesBuffer:
     It is useful for checking properties of a candle 
     on one timeframe (H1, for example), while having data
     on another (for instance, M1).
+
+    If `timeframes` maps timeframes to history depth, 
+    that many last closed candles are also kept for each of them.
     """
     def __init__(self,
                  start_time: datetime,
-                 timeframes: t.Set[Timeframes]):
+                 timeframes: t.Union[t.Set[Timeframes], 
+                                     t.Dict[Timeframes, int]]):
+        depths = _get_depths(timeframes)
         self._data = {
             timeframe: _create_placeholder_candle(start_time, timeframe)
-                for timeframe in timeframes 
+                for timeframe in depths 
+        }
+        self._history = {
+            timeframe: CandlesHistory(depth)
+                for timeframe, depth in depths.items() if depth > 0
         }
 
     def get(self, timeframe: Timeframes) -> Candle:
@@ -89,6 +194,196 @@ class CandlesBuffer:
             candle.volume += new_candle.volume
 
         candle.is_closed = (new_candle.close_time == candle.close_time)
+        if candle.is_closed and timeframe in self._history:
+            self._history[timeframe].append(candle)
+
+    def history(self, timeframe: Timeframes, count: int) -> CandleColumns:
+        """
+        Get at most `count` last closed candles on `timeframe`.
+        If history of `timeframe` is not kept, raises `CandleNotFound`.
+        """
+        try:
+            return self._history[timeframe].last(count)
+        except KeyError:
+            raise CandleNotFound(timeframe)
+
+
+class _ResampledCandle:
+    """
+    Candle of `ResampledCandlesBuffer`, whose values are read from 
+    precomputed arrays at the current position of the buffer.
+    """
+    __slots__ = ('_buffer', '_resampled', '_placeholder')
+
+    def __init__(self, 
+                 buffer: 'ResampledCandlesBuffer', 
+                 resampled: ResampledCandles,
+                 placeholder: Candle):
+        self._buffer = buffer
+        self._resampled = resampled
+        self._placeholder = placeholder
+
+    def _get_time(self, name: str) -> datetime:
+        position = self._buffer.position
+        if position < 0:
+            return getattr(self._placeholder, name)
+        column = getattr(self._resampled.partial, name)
+        return from_millis(int(column[position]))
+
+    def _get_price(self, name: str) -> Decimal:
+        position = self._buffer.position
+        if position < 0:
+            return getattr(self._placeholder, name)
+        column = getattr(self._resampled.partial, name)
+        return to_decimal(float(column[position]))
+
+    @property
+    def open_time(self) -> datetime:
+        return self._get_time('open_time')
+
+    @property
+    def close_time(self) -> datetime:
+        return self._get_time('close_time')
+
+    @property
+    def open(self) -> Decimal:
+        return self._get_price('open')
+
+    @property
+    def high(self) -> Decimal:
+        return self._get_price('high')
+
+    @property
+    def low(self) -> Decimal:
+        return self._get_price('low')
+
+    @property
+    def close(self) -> Decimal:
+        return self._get_price('close')
+
+    @property
+    def volume(self) -> Decimal:
+        return self._get_price('volume')
+
+    @property
+    def is_closed(self) -> bool:
+        position = self._buffer.position
+        return position >= 0 and bool(self._resampled.is_closed[position])
+
+
+class ResampledCandlesBuffer(CandlesBuffer):
+    """
+    `CandlesBuffer` for candles known up front. All timeframes are 
+    resampled from `columns` at once, so that `update` only moves 
+    the current position. Values are converted to `Decimal`
+    when accessed. 
+    Must be updated with candles of `columns`, in the same order.
+    """
+    def __init__(self,
+                 start_time: datetime,
+                 timeframes: t.Union[t.Set[Timeframes], 
+                                     t.Dict[Timeframes, int]],
+                 columns: CandleColumns):
+        self._depths = _get_depths(timeframes)
+        self._resampled = {
+            timeframe: resample(columns, timeframe) 
+                for timeframe in self._depths
+        }
+        self._data = {
+            timeframe: _ResampledCandle(
+                            self, resampled,
+                            _create_placeholder_candle(start_time, timeframe))
+                for timeframe, resampled in self._resampled.items()
+        }
+        self._position = -1
+
+    @property
+    def position(self) -> int:
+        """Index of the last candle the buffer was updated with."""
+        return self._position
+
+    def skip(self, count: int) -> None:
+        """Move the current position by `count` candles."""
+        self._position += count
+
+    def update(self, candle: InputCandle) -> None:
+        self._position += 1
+
+    def history(self, timeframe: Timeframes, count: int) -> CandleColumns:
+        if not self._depths.get(timeframe):
+            raise CandleNotFound(timeframe)
+        count = min(count, self._depths[timeframe])
+        position = self._position
+        if position < 0:
+            return CandleColumns.empty()
+
+        resampled = self._resampled[timeframe]
+        stop = int(resampled.bar_index[position])
+        if resampled.is_closed[position]:
+            stop += 1
+        history = resampled.bars.slice(max(0, stop - count), stop)
+        for name in COLUMNS:
+            getattr(history, name).flags.writeable = False
+        return history
+
+
+class CandleView:
+    """
+    Read-only view of a buffered candle.
+    Always reflects the current state of the candle, 
+    use `snapshot` to get a copy of it.
+    """
+    __slots__ = ('_candle',)
+
+    def __init__(self, candle: Candle):
+        self._candle = candle
+
+    @property
+    def open_time(self) -> datetime:
+        return self._candle.open_time
+
+    @property
+    def close_time(self) -> datetime:
+        return self._candle.close_time
+
+    @property
+    def open(self) -> Decimal:
+        return self._candle.open
+
+    @property
+    def high(self) -> Decimal:
+        return self._candle.high
+
+    @property
+    def low(self) -> Decimal:
+        return self._candle.low
+
+    @property
+    def close(self) -> Decimal:
+        return self._candle.close
+
+    @property
+    def volume(self) -> Decimal:
+        return self._candle.volume
+
+    @property
+    def is_closed(self) -> bool:
+        return self._candle.is_closed
+
+    def snapshot(self) -> Candle:
+        """Get a copy of the candle in its current state."""
+        candle = self._candle
+        return Candle(open_time=candle.open_time,
+                      close_time=candle.close_time,
+                      open=candle.open,
+                      high=candle.high,
+                      low=candle.low,
+                      close=candle.close,
+                      volume=candle.volume,
+                      is_closed=candle.is_closed)
+
+    def __repr__(self) -> str:
+        return f"CandleView({self._candle!r})"
 
 
 class Candles:
@@ -100,11 +395,36 @@ class Candles:
     """
     def __init__(self, buffer: CandlesBuffer):
         self._buffer=buffer
+        self._views: t.Dict[Timeframes, CandleView] = {}
 
-    def get(self, timeframe: Timeframes) -> Candle:
+    def get(self, timeframe: Timeframes) -> CandleView:
         """
-        Get the last candle representation on `timeframe`.
+        Get read-only view of the last candle on `timeframe`.
+        The view reflects further updates of the candle.
         If the candle of `timeframe` is not found, 
         raises `CandleNotFound`.
         """
-        return replace(self._buffer.get(timeframe))
+        try:
+            return self._views[timeframe]
+        except KeyError:
+            view = CandleView(self._buffer.get(timeframe))
+            self._views[timeframe] = view
+            return view
+
+    def snapshot(self, timeframe: Timeframes) -> Candle:
+        """
+        Get a copy of the last candle representation on `timeframe`.
+        If the candle of `timeframe` is not found, 
+        raises `CandleNotFound`.
+        """
+        return self.get(timeframe).snapshot()
+
+    def history(self, timeframe: Timeframes, count: int) -> CandleColumns:
+        """
+        Get at most `count` last closed candles on `timeframe` 
+        as read-only NumPy views, in historical order. 
+        `count` is limited by history depth declared in 
+        `candle_timeframes` of the strategy.
+        If history of `timeframe` is not kept, raises `CandleNotFound`.
+        """
+        return self._buffer.history(timeframe, count)
@@ -1,17 +1,26 @@
+import copy
 import time
 import typing as t
 import requests as r
+import threading
 from datetime import datetime, timezone
-from collections import abc
+from collections import abc, deque
+from concurrent.futures import ThreadPoolExecutor, Future
 from decimal import Decimal
+from requests.adapters import HTTPAdapter
 
 from backintime.timeframes import Timeframes, estimate_close_time
+from backintime.analyser.indicators.constants import (
+    CandleProperties,
+    OPEN, HIGH, LOW, CLOSE, VOLUME
+)
 from .candle import Candle
 from .data_provider import (
     DataProvider, 
     DataProviderFactory, 
     DataProviderError,
-    ParsingError
+    ParsingError,
+    ALL_PROPERTIES
 )
 
 
@@ -26,15 +35,29 @@ def _parse_time(millis_timestamp: int) -> datetime:
     return datetime.fromtimestamp(timestamp, tz=timezone.utc)
 
 
-def _parse_candle(candle: list) -> Candle:
-    """Parse candle from a sequence"""
+_NAN = Decimal('NaN')
+
+
+def _parse_price(value: str, 
+                 candle_property: CandleProperties,
+                 properties: t.AbstractSet[CandleProperties]) -> Decimal:
+    return Decimal(value) if candle_property in properties else _NAN
+
+
+def _parse_candle(candle: list, 
+                  properties: t.AbstractSet[CandleProperties] = ALL_PROPERTIES
+                  ) -> Candle:
+    """
+    Parse candle from a sequence. 
+    Prices not in `properties` are not parsed and set to NaN.
+    """
     try:
         return Candle(open_time=_parse_time(candle[0]),
-                      open=Decimal(candle[1]),
-                      high=Decimal(candle[2]),
-                      low=Decimal(candle[3]),
-                      close=Decimal(candle[4]),
-                      volume=Decimal(candle[5]),
+                      open=_parse_price(candle[1], OPEN, properties),
+                      high=_parse_price(candle[2], HIGH, properties),
+                      low=_parse_price(candle[3], LOW, properties),
+                      close=_parse_price(candle[4], CLOSE, properties),
+                      volume=_parse_price(candle[5], VOLUME, properties),
                       close_time=_parse_time(candle[6]))
     except Exception as e:
         raise ParsingError(str(e))
@@ -45,7 +68,57 @@ def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    Holds at most `capacity` tokens, refilled at `refill_rate` 
+    tokens per second. `acquire` blocks until enough tokens 
+    are available. Tokens are reserved in the order of `acquire` 
+    calls, and callers wait for refill without holding the lock.
+    """
+    def __init__(self, capacity: float, refill_rate: float):
+        self._capacity = capacity
+        self._refill_rate = refill_rate
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Take `tokens` from the bucket, waiting for refill if needed."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self._capacity, 
+                               self._tokens + elapsed*self._refill_rate)
+            self._updated = now
+            # Reserve tokens now, going into debt if there are not enough,
+            # so that later callers wait for their own refill after it
+            self._tokens -= tokens
+            wait = -self._tokens / self._refill_rate
+        if wait > 0:
+            time.sleep(wait)
+
+
+# Binance limits request weight per IP address, so limiter is shared
+# by all providers unless a dedicated one is passed.
+# https://binance-docs.github.io/apidocs/spot/en/#limits
+_WEIGHT_PER_MINUTE = 1200
+_KLINES_WEIGHT = 2
+_MAX_RETRIES = 3
+# Seconds to wait for connection and for response data
+_DEFAULT_TIMEOUT = 30.0
+_default_limiter = TokenBucket(_WEIGHT_PER_MINUTE, _WEIGHT_PER_MINUTE/60)
+
+
 class BinanceCandles(DataProvider):
+    """
+    Provides candles from Binance klines API.
+    Pages of up to 1000 candles are downloaded ahead by a pool of 
+    `workers` threads over pooled HTTP connections, while earlier 
+    pages are being consumed. Candles are still yielded in order.
+    Requests are throttled with token bucket `limiter` according 
+    to Binance request weight limits.
+    """
     _url = 'https://api.binance.com/api/v3/klines'
     _intervals = {
         Timeframes.M1: '1m',
@@ -64,12 +137,22 @@ class BinanceCandles(DataProvider):
                  symbol: str, 
                  timeframe: Timeframes, 
                  since: datetime, 
-                 until: t.Optional[datetime]=_utcnow()):
+                 until: t.Optional[datetime]=_utcnow(),
+                 url: t.Optional[str] = None,
+                 workers: int = 4,
+                 limiter: t.Optional[TokenBucket] = None,
+                 properties: t.AbstractSet[CandleProperties] = ALL_PROPERTIES,
+                 timeout: float = _DEFAULT_TIMEOUT):
         self._symbol=symbol
         self._timeframe=timeframe
         self._since=since
         self._until=until
         self._interval = self._intervals[timeframe]
+        self._url = url or self._url
+        self._workers = workers
+        self._limiter = limiter or _default_limiter
+        self._properties = properties
+        self._timeout = timeout
 
     @property
     def title(self) -> str:
@@ -91,8 +174,8 @@ class BinanceCandles(DataProvider):
     def until(self) -> datetime:
         return self._until
 
-    def __iter__(self) -> t.Iterator[Candle]:
-        """Return generator that will yield one candle at a time."""
+    def _iter_params(self) -> t.Iterator[dict]:
+        """Yield request params for each page in (since, until)."""
         since = _to_ms(self._since)
         until = _to_ms(self._until)
         end_time = estimate_close_time(self._until, self._timeframe, -1)
@@ -101,48 +184,100 @@ class BinanceCandles(DataProvider):
         max_per_request = 1000
         tf_ms = self._timeframe.value * 1000
         max_time_step = max_per_request * tf_ms
-        # requests counter
-        counter = 0
-
-        params = {
-            "symbol": self._symbol,
-            "interval": self._interval,
-            "startTime": None,  # candle open >= startTime
-            "endTime": None,    # candle open <= endTime
-            "limit": max_per_request    # candles quantity <= limit
-        }
 
         for start_time_ms in range(since, until, max_time_step):
-            params["startTime"] = start_time_ms
-            params["endTime"] = min(end_time, start_time_ms + max_time_step - tf_ms)
-            
+            yield {
+                "symbol": self._symbol,
+                "interval": self._interval,
+                # candle open >= startTime
+                "startTime": start_time_ms,
+                # candle open <= endTime
+                "endTime": min(end_time, 
+                               start_time_ms + max_time_step - tf_ms),
+                # candles quantity <= limit
+                "limit": max_per_request
+            }
+
+    def _fetch_page(self, session: r.Session, params: dict) -> list:
+        """Download one page of klines."""
+        try:
+            for attempt in range(_MAX_RETRIES + 1):
+                self._limiter.acquire(_KLINES_WEIGHT)
+                res = session.get(self._url, params=params, 
+                                  timeout=self._timeout)
+                # Rate limit exceeded anyway (e.g. by another process)
+                if res.status_code in (418, 429) and attempt < _MAX_RETRIES:
+                    time.sleep(float(res.headers.get('Retry-After', 1)))
+                    continue
+                break
+            res.raise_for_status()
+        # Wrap exceptions so that caller will know it is something
+        # related to a data provider without knowing about `requests`.
+        except r.exceptions.Timeout as e:
+            raise DataProviderError(f"Request timed out: {e}")
+        except r.exceptions.ConnectionError as e:
+            raise DataProviderError("Failed to connect")
+        except r.exceptions.HTTPError as e:
+            raise DataProviderError(str(e))
+        return res.json()
+
+    def __iter__(self) -> t.Iterator[Candle]:
+        """Return generator that will yield one candle at a time."""
+        # At most `workers` pages are downloaded ahead
+        prefetch = max(1, self._workers)
+        pending: t.Deque[Future] = deque()
+
+        with r.Session() as session, \
+                ThreadPoolExecutor(self._workers) as executor:
+            adapter = HTTPAdapter(pool_connections=1, 
+                                  pool_maxsize=self._workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
             try:
-                res = r.get(self._url, params)
-                res.raise_for_status()
-            # Wrap exceptions so that caller will know it is something
-            # related to a data provider without knowing about `requests`.
-            except r.exceptions.ConnectionError as e:
-                raise DataProviderError("Failed to connect")
-            except r.exceptions.HTTPError as e:
-                raise DataProviderError(str(e))
-            else:
-                counter += 1
-
-            for item in res.json():
-                yield _parse_candle(item)
-            # sleep after every 20th call
-            if counter % 20 == 0:
-                time.sleep(1)
+                for params in self._iter_params():
+                    pending.append(executor.submit(self._fetch_page, 
+                                                   session, params))
+                    if len(pending) > prefetch:
+                        for item in pending.popleft().result():
+                            yield _parse_candle(item, self._properties)
+                while pending:
+                    for item in pending.popleft().result():
+                        yield _parse_candle(item, self._properties)
+            finally:
+                # Don't wait for pages nobody will consume
+                for future in pending:
+                    future.cancel()
 
 
 class BinanceCandlesFactory(DataProviderFactory):
-    def __init__(self, ticker: str, timeframe: Timeframes):
+    def __init__(self, 
+                 ticker: str, 
+                 timeframe: Timeframes,
+                 url: t.Optional[str] = None,
+                 workers: int = 4,
+                 limiter: t.Optional[TokenBucket] = None,
+                 timeout: float = _DEFAULT_TIMEOUT):
         self.ticker = ticker
         self._timeframe = timeframe
+        self.url = url
+        self.workers = workers
+        self.limiter = limiter
+        self.timeout = timeout
+        self.properties = ALL_PROPERTIES
 
     @property
     def timeframe(self) -> Timeframes:
         return self._timeframe
 
+    def project(self, 
+                properties: t.AbstractSet[CandleProperties]
+                ) -> 'BinanceCandlesFactory':
+        """Get factory that parses only prices in `properties`."""
+        factory = copy.copy(self)
+        factory.properties = frozenset(properties)
+        return factory
+
     def create(self, since: datetime, until: datetime):
-        return BinanceCandles(self.ticker, self.timeframe, since, until)
+        return BinanceCandles(self.ticker, self.timeframe, since, until,
+                              self.url, self.workers, self.limiter,
+                              self.properties, self.timeout)
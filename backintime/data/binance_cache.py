@@ -0,0 +1,261 @@
+"""
+Persistent on-disk cache of Binance klines.
+
+Klines are stored per API host, symbol, interval and calendar
+chunk (a day or a month) as binary columns (see `CandleColumns`),
+in `<directory>/<host>/<symbol>/<interval>/<chunk>.npz` files,
+so that klines of different hosts (e.g., testnet) never mix.
+Chunks that are not cached are downloaded as a whole;
+the chunk that is not closed yet is always downloaded again
+and never stored. Least recently used chunks are evicted
+once the cache exceeds its size limit.
+"""
+import os
+import numpy
+import zipfile
+import typing as t
+from dataclasses import dataclass
+from datetime import datetime
+from urllib.parse import urlparse
+from backintime.timeframes import Timeframes
+from backintime.analyser.indicators.constants import CandleProperties
+from .binance import (
+    BinanceCandles,
+    BinanceCandlesFactory,
+    TokenBucket,
+    _DEFAULT_TIMEOUT,
+    _utcnow
+)
+from .columns import CandleColumns
+from .data_provider import Candle, DataProvider
+from .partitioned import (
+    DAY,
+    MONTH,
+    iter_partitions,
+    _next_partition_start
+)
+
+
+_CHUNK_FORMATS = {
+    DAY: '%Y-%m-%d',
+    MONTH: '%Y-%m'
+}
+
+
+@dataclass
+class KlineCacheStats:
+    """Cache statistics since the cache object was created."""
+    hits: int = 0
+    misses: int = 0
+    # Downloads of chunks that were not closed yet
+    refetches: int = 0
+    evictions: int = 0
+
+
+class KlineCache:
+    """
+    Directory of cached klines chunks.
+    If `max_bytes` is set, least recently used chunks are removed
+    once total size of the cache exceeds it.
+    """
+    def __init__(self,
+                 directory: str,
+                 chunk: str = MONTH,
+                 max_bytes: t.Optional[int] = None):
+        if chunk not in _CHUNK_FORMATS:
+            raise ValueError(f"Unsupported chunk: {chunk}. "
+                             f"Use one of {tuple(_CHUNK_FORMATS)}")
+        self.directory = directory
+        self.chunk = chunk
+        self.max_bytes = max_bytes
+        self.stats = KlineCacheStats()
+
+    def get_path(self, 
+                 host: str, 
+                 symbol: str, 
+                 interval: str, 
+                 start: datetime) -> str:
+        """Get path to the chunk of klines that begins at `start`."""
+        name = start.strftime(_CHUNK_FORMATS[self.chunk]) + '.npz'
+        # Port separator is not allowed in paths on some platforms
+        host = host.replace(':', '_')
+        return os.path.join(self.directory, host, symbol, interval, name)
+
+    def get(self,
+            host: str,
+            symbol: str,
+            interval: str,
+            start: datetime) -> t.Optional[CandleColumns]:
+        """
+        Get cached chunk or None if it is not in the cache.
+        Broken chunks (e.g., truncated) are removed.
+        """
+        path = self.get_path(host, symbol, interval, start)
+        try:
+            columns = CandleColumns.load(path)
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, EOFError, 
+                zipfile.BadZipFile):
+            os.remove(path)
+            self.stats.misses += 1
+            return None
+        os.utime(path)    # mark as recently used
+        self.stats.hits += 1
+        return columns
+
+    def put(self,
+            host: str,
+            symbol: str,
+            interval: str,
+            start: datetime,
+            columns: CandleColumns) -> None:
+        """Store chunk of klines, then evict chunks over the size limit."""
+        path = self.get_path(host, symbol, interval, start)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first, so that interrupted
+        # writes never leave a broken chunk behind
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as file:
+            numpy.savez(file, **columns.as_dict())
+        os.replace(temp_path, path)
+        self.evict(keep=path)
+
+    def _iter_files(self) -> t.Iterator[os.DirEntry]:
+        stack = [self.directory]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif entry.name.endswith('.npz'):
+                    yield entry
+
+    def size(self) -> int:
+        """Get total size of cached chunks in bytes."""
+        return sum(entry.stat().st_size for entry in self._iter_files())
+
+    def evict(self, keep: t.Optional[str] = None) -> None:
+        """Remove least recently used chunks over the size limit."""
+        if self.max_bytes is None:
+            return
+        files = [ (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+                    for entry in self._iter_files() ]
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all cached chunks."""
+        for entry in list(self._iter_files()):
+            os.remove(entry.path)
+
+
+class CachedBinanceCandles(DataProvider):
+    """Provides candles from Binance, reusing klines stored in cache."""
+    def __init__(self,
+                 factory: 'CachedBinanceCandlesFactory',
+                 since: datetime,
+                 until: datetime):
+        self._factory = factory
+        self._since = since
+        self._until = until
+
+    @property
+    def title(self) -> str:
+        directory = self._factory.cache.directory
+        return f"Binance klines API v3 (cached in {directory})"
+
+    @property
+    def symbol(self) -> str:
+        return self._factory.ticker
+
+    @property
+    def timeframe(self) -> Timeframes:
+        return self._factory.timeframe
+
+    @property
+    def since(self) -> datetime:
+        return self._since
+
+    @property
+    def until(self) -> datetime:
+        return self._until
+
+    def _download(self, start: datetime, end: datetime) -> CandleColumns:
+        factory = self._factory
+        candles = BinanceCandles(factory.ticker, factory.timeframe,
+                                 start, end, factory.url,
+                                 factory.workers, factory.limiter,
+                                 timeout=factory.timeout)
+        return CandleColumns.from_candles(candles)
+
+    def _get_chunk(self, start: datetime, now: datetime) -> CandleColumns:
+        cache = self._factory.cache
+        host = self._factory.host
+        symbol = self._factory.ticker
+        interval = BinanceCandles._intervals[self.timeframe]
+        end = _next_partition_start(start, cache.chunk)
+
+        if end > now:
+            # Chunk is still open, so it is incomplete
+            cache.stats.refetches += 1
+            return self._download(start, end)
+
+        columns = cache.get(host, symbol, interval, start)
+        if columns is None:
+            columns = self._download(start, end)
+            cache.put(host, symbol, interval, start, columns)
+        return columns
+
+    def __iter__(self) -> t.Iterator[Candle]:
+        """Return generator that will yield one candle at a time."""
+        now = _utcnow()
+        for start in iter_partitions(self._since, self._until,
+                                     self._factory.cache.chunk):
+            columns = self._get_chunk(start, now)
+            yield from columns.between(self._since, self._until)
+
+
+class CachedBinanceCandlesFactory(BinanceCandlesFactory):
+    """
+    Creates providers of candles from Binance, that keep
+    downloaded klines in `cache`, so that repeated runs over
+    the same history never touch the network.
+    """
+    def __init__(self,
+                 ticker: str,
+                 timeframe: Timeframes,
+                 cache: KlineCache,
+                 url: t.Optional[str] = None,
+                 workers: int = 4,
+                 limiter: t.Optional[TokenBucket] = None,
+                 timeout: float = _DEFAULT_TIMEOUT):
+        super().__init__(ticker, timeframe, url, workers, limiter, timeout)
+        self.cache = cache
+
+    @property
+    def host(self) -> str:
+        """Host of the klines API, that cached chunks belong to."""
+        return urlparse(self.url or BinanceCandles._url).netloc
+
+    def project(self, 
+                properties: t.AbstractSet[CandleProperties]
+                ) -> 'CachedBinanceCandlesFactory':
+        # Cached chunks must hold all prices
+        return self
+
+    def create(self,
+               since: datetime,
+               until: datetime) -> CachedBinanceCandles:
+        return CachedBinanceCandles(self, since, until)
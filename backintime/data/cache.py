@@ -0,0 +1,120 @@
+"""
+In-process cache of parsed candles, shared across
+`DataProviderFactory.create` calls.
+
+`CachedDataProviderFactory` wraps any factory. Candles are read
+from the wrapped factory once, kept as `CandleColumns`, and any
+later (since, until) sub-range is served as a view of the same
+arrays. When a range outside of cached one is requested,
+only the missing parts are read.
+"""
+import typing as t
+from collections import OrderedDict
+from datetime import datetime
+from backintime.timeframes import Timeframes
+from .columns import CandleColumns, ColumnarCandles, read_columns
+from .data_provider import DataProviderFactory
+
+
+class _Entry:
+    def __init__(self,
+                 columns: CandleColumns,
+                 title: str,
+                 symbol: str,
+                 since: datetime,
+                 until: datetime):
+        self.columns = columns
+        self.title = title
+        self.symbol = symbol
+        self.since = since
+        self.until = until
+
+
+class DatasetCache:
+    """
+    LRU cache of datasets with a memory budget.
+    Least recently used datasets are dropped once total size
+    of arrays exceeds `max_bytes`. The most recent dataset
+    is kept even if it alone exceeds the budget.
+    """
+    def __init__(self, max_bytes: int = 512*1024**2):
+        self.max_bytes = max_bytes
+        self._entries: t.OrderedDict[t.Hashable, _Entry] = OrderedDict()
+
+    @property
+    def nbytes(self) -> int:
+        """Get total size of cached arrays in bytes."""
+        return sum(entry.columns.nbytes for entry in self._entries.values())
+
+    def get(self, key: t.Hashable) -> t.Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: t.Hashable, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        total = self.nbytes
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.columns.nbytes
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by all wrappers unless a dedicated cache is passed
+_default_cache = DatasetCache()
+
+
+class CachedDataProviderFactory(DataProviderFactory):
+    """
+    Wraps `factory`, so that its candles are read and parsed
+    only once per process. Datasets are kept in `cache`,
+    which is shared by all wrappers by default.
+    """
+    def __init__(self,
+                 factory: DataProviderFactory,
+                 cache: t.Optional[DatasetCache] = None):
+        self.factory = factory
+        self.cache = cache if cache is not None else _default_cache
+
+    @property
+    def timeframe(self) -> Timeframes:
+        return self.factory.timeframe
+
+    def _read(self, since: datetime, until: datetime) -> _Entry:
+        provider = self.factory.create(since, until)
+        columns = read_columns(provider)
+        return _Entry(columns, provider.title, provider.symbol, since, until)
+
+    def _extend(self,
+                entry: _Entry,
+                since: datetime,
+                until: datetime) -> _Entry:
+        """Read candles missing in `entry` to cover (since, until)."""
+        chunks = [entry.columns]
+        title, symbol = entry.title, entry.symbol
+        if since < entry.since:
+            chunks.insert(0, self._read(since, entry.since).columns)
+        if until > entry.until:
+            chunks.append(self._read(entry.until, until).columns)
+        return _Entry(CandleColumns.concatenate(chunks), title, symbol,
+                      min(since, entry.since), max(until, entry.until))
+
+    def create(self, since: datetime, until: datetime) -> ColumnarCandles:
+        key = self.factory
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = self._read(since, until)
+            self.cache.put(key, entry)
+        elif since < entry.since or until > entry.until:
+            entry = self._extend(entry, since, until)
+            self.cache.put(key, entry)
+
+        return ColumnarCandles(entry.columns, entry.title, entry.symbol,
+                               self.timeframe, since, until)
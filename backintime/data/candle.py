@@ -7,6 +7,10 @@ from decimal import Decimal
 
 @dataclass
 class Candle:
+    __slots__ = (
+        'open', 'high', 'low', 'close', 'volume', 'open_time', 'close_time'
+    )
+
     open: Decimal
     high: Decimal
     low: Decimal
@@ -0,0 +1,261 @@
+"""
+Columnar representation of candles.
+
+`CandleColumns` stores candles as NumPy arrays: open and close
+times as milliseconds timestamps (int64) and OHLCV as float64.
+Prices are converted back to `Decimal` through the shortest
+float representation. It equals the source value only if the value
+has up to 15 significant digits, and trailing zeros of the source
+are not kept (`100.50000000` becomes `100.5`). Data providers that
+yield candles one at a time keep prices exactly as in the source.
+"""
+import numpy
+import typing as t
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from backintime.timeframes import Timeframes
+from .candle import Candle
+from .data_provider import DataProvider, DataProviderFactory
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Number of candles converted from arrays at once during iteration
+_BLOCK_SIZE = 4096
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+TIME_COLUMNS = ('open_time', 'close_time')
+COLUMNS = TIME_COLUMNS + PRICE_COLUMNS
+
+
+def to_millis(time: datetime) -> int:
+    """Convert `datetime` to milliseconds timestamp."""
+    return round(time.timestamp()*1000)
+
+
+def from_millis(millis: int) -> datetime:
+    """Convert milliseconds timestamp to `datetime`(UTC)."""
+    return _EPOCH + timedelta(milliseconds=millis)
+
+
+def to_decimal(value: float) -> Decimal:
+    """Convert float to `Decimal` through its shortest representation."""
+    return Decimal(repr(value))
+
+
+class CandleColumns:
+    """
+    Candles stored column-wise, in historical order.
+    Slicing returns views of the same arrays, without copying.
+    """
+    def __init__(self,
+                 open_time: numpy.ndarray,
+                 close_time: numpy.ndarray,
+                 open: numpy.ndarray,
+                 high: numpy.ndarray,
+                 low: numpy.ndarray,
+                 close: numpy.ndarray,
+                 volume: numpy.ndarray):
+        self.open_time = open_time
+        self.close_time = close_time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def empty(cls) -> 'CandleColumns':
+        times = [numpy.empty(0, dtype=numpy.int64) for _ in TIME_COLUMNS]
+        prices = [numpy.empty(0) for _ in PRICE_COLUMNS]
+        return cls(*times, *prices)
+
+    @classmethod
+    def from_candles(cls, candles: t.Iterable[Candle]) -> 'CandleColumns':
+        """Build columns from an iterable of candles."""
+        rows = [
+            (to_millis(candle.open_time), to_millis(candle.close_time),
+             candle.open, candle.high, candle.low,
+             candle.close, candle.volume)
+                for candle in candles
+        ]
+        if not rows:
+            return cls.empty()
+        columns = list(zip(*rows))
+        times = [numpy.array(x, dtype=numpy.int64) for x in columns[:2]]
+        prices = [numpy.array(x, dtype=numpy.float64) for x in columns[2:]]
+        return cls(*times, *prices)
+
+    @classmethod
+    def concatenate(cls,
+                    chunks: t.Sequence['CandleColumns']) -> 'CandleColumns':
+        """Join chunks into one dataset, in the given order."""
+        if not chunks:
+            return cls.empty()
+        return cls(*(
+            numpy.concatenate([getattr(chunk, name) for chunk in chunks])
+                for name in COLUMNS
+        ))
+
+    @classmethod
+    def load(cls, filename: str) -> 'CandleColumns':
+        """Load columns from a binary `.npz` file."""
+        with numpy.load(filename) as data:
+            return cls(*(data[name] for name in COLUMNS))
+
+    def save(self, filename: str) -> None:
+        """Save columns to a binary `.npz` file."""
+        numpy.savez(filename, **self.as_dict())
+
+    def as_dict(self) -> t.Dict[str, numpy.ndarray]:
+        return { name: getattr(self, name) for name in COLUMNS }
+
+    @property
+    def nbytes(self) -> int:
+        """Get the size of all arrays in bytes."""
+        return sum(getattr(self, name).nbytes for name in COLUMNS)
+
+    def is_sorted(self) -> bool:
+        """Check whether candles are in historical order."""
+        return bool(numpy.all(self.open_time[1:] >= self.open_time[:-1]))
+
+    def sorted(self) -> 'CandleColumns':
+        """Get candles in historical order (stable for equal times)."""
+        if self.is_sorted():
+            return self
+        order = numpy.argsort(self.open_time, kind='stable')
+        return self.take(order)
+
+    def take(self, indices: numpy.ndarray) -> 'CandleColumns':
+        """Get candles at `indices` (boolean mask or integer array)."""
+        return CandleColumns(*(
+            getattr(self, name)[indices] for name in COLUMNS
+        ))
+
+    def slice(self, start: int, stop: int) -> 'CandleColumns':
+        """Get candles in [start, stop) as a view."""
+        return CandleColumns(*(
+            getattr(self, name)[start:stop] for name in COLUMNS
+        ))
+
+    def find_range(self,
+                   since: datetime,
+                   until: datetime) -> t.Tuple[int, int]:
+        """
+        Get [start, stop) positions of candles with
+        `since` <= open time < `until`. Requires historical order.
+        """
+        start, stop = numpy.searchsorted(self.open_time,
+                                         (to_millis(since), to_millis(until)))
+        return int(start), int(max(start, stop))
+
+    def between(self, since: datetime, until: datetime) -> 'CandleColumns':
+        """Get candles with `since` <= open time < `until` as a view."""
+        return self.slice(*self.find_range(since, until))
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    def __getitem__(self, index: int) -> Candle:
+        return Candle(open_time=from_millis(int(self.open_time[index])),
+                      open=to_decimal(float(self.open[index])),
+                      high=to_decimal(float(self.high[index])),
+                      low=to_decimal(float(self.low[index])),
+                      close=to_decimal(float(self.close[index])),
+                      volume=to_decimal(float(self.volume[index])),
+                      close_time=from_millis(int(self.close_time[index])))
+
+    def __iter__(self) -> t.Iterator[Candle]:
+        """Yield candles one at a time, converting arrays in blocks."""
+        for start in range(0, len(self), _BLOCK_SIZE):
+            stop = start + _BLOCK_SIZE
+            block = zip(*(
+                getattr(self, name)[start:stop].tolist() for name in COLUMNS
+            ))
+            for open_time, close_time, open, high, low, close, volume in block:
+                yield Candle(open_time=from_millis(open_time),
+                             open=to_decimal(open),
+                             high=to_decimal(high),
+                             low=to_decimal(low),
+                             close=to_decimal(close),
+                             volume=to_decimal(volume),
+                             close_time=from_millis(close_time))
+
+
+class ColumnarCandles(DataProvider):
+    """Provides candles from `CandleColumns` for (since, until)."""
+    def __init__(self,
+                 columns: CandleColumns,
+                 title: str,
+                 symbol: str,
+                 timeframe: Timeframes,
+                 since: datetime,
+                 until: datetime):
+        self._columns = columns
+        self._title = title
+        self._symbol = symbol
+        self._timeframe = timeframe
+        self._since = since
+        self._until = until
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def symbol(self) -> str:
+        return self._symbol
+
+    @property
+    def timeframe(self) -> Timeframes:
+        return self._timeframe
+
+    @property
+    def since(self) -> datetime:
+        return self._since
+
+    @property
+    def until(self) -> datetime:
+        return self._until
+
+    @property
+    def columns(self) -> CandleColumns:
+        """Get candles in (since, until) as columns."""
+        return self._columns.between(self._since, self._until)
+
+    def __iter__(self) -> t.Iterator[Candle]:
+        """Return generator that will yield one candle at a time."""
+        return iter(self.columns)
+
+
+def read_columns(provider: DataProvider) -> CandleColumns:
+    """
+    Read all candles of the provider as columns, 
+    at once if the provider supports it.
+    """
+    read = getattr(provider, 'read_columns', None)
+    if read is not None:
+        return read()
+    elif isinstance(provider, ColumnarCandles):
+        return provider.columns
+    return CandleColumns.from_candles(provider)
+
+
+class CandleColumnsFactory(DataProviderFactory):
+    """Creates providers of candles from in-memory `CandleColumns`."""
+    def __init__(self,
+                 columns: CandleColumns,
+                 symbol: str,
+                 timeframe: Timeframes,
+                 title: str = "in-memory candles"):
+        self.columns = columns.sorted()
+        self.symbol = symbol
+        self.title = title
+        self._timeframe = timeframe
+
+    @property
+    def timeframe(self) -> Timeframes:
+        return self._timeframe
+
+    def create(self, since: datetime, until: datetime) -> ColumnarCandles:
+        return ColumnarCandles(self.columns, self.title, self.symbol,
+                               self.timeframe, since, until)
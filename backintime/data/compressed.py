@@ -0,0 +1,86 @@
+"""
+Streaming access to compressed CSV files: `.gz`, `.zst`
+and `.zip` archives, which may hold multiple members
+(e.g. monthly klines dumps). Members of `.zip` archives
+are read in the order of their names.
+Data is decompressed on the fly, never extracted to disk.
+
+`.zst` support requires `zstandard` package, install it with
+`pip install backintime[zstd]`.
+"""
+import io
+import gzip
+import zipfile
+import typing as t
+
+
+GZIP = '.gz'
+ZSTD = '.zst'
+ZIP = '.zip'
+COMPRESSED_SUFFIXES = (GZIP, ZSTD, ZIP)
+# Large buffers amortize per-call decompression overhead
+DEFAULT_BUFFER_SIZE = 1024**2
+
+
+def is_compressed(filename: str) -> bool:
+    """Check whether the file is a supported archive."""
+    return filename.lower().endswith(COMPRESSED_SUFFIXES)
+
+
+def _import_zstandard():
+    """Import `zstandard`, which is an optional dependency."""
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(".zst support requires zstandard package, "
+                          "install it with `pip install backintime[zstd]`")
+    return zstandard
+
+
+def check_dependencies(filename: str) -> None:
+    """
+    Raise `ImportError` with install hint if reading the archive
+    requires a package that is not installed.
+    """
+    if filename.lower().endswith(ZSTD):
+        _import_zstandard()
+
+
+def _open_zstd(filename: str, buffer_size: int) -> t.BinaryIO:
+    zstandard = _import_zstandard()
+    rawfile = open(filename, 'rb')
+    decompressor = zstandard.ZstdDecompressor()
+    return decompressor.stream_reader(rawfile, read_size=buffer_size,
+                                      closefd=True)
+
+
+def _open_binary_members(filename: str,
+                         buffer_size: int) -> t.Iterator[t.BinaryIO]:
+    """Yield decompressed binary streams of archive members."""
+    suffix = filename.lower()
+    if suffix.endswith(GZIP):
+        yield gzip.open(filename, 'rb')
+    elif suffix.endswith(ZSTD):
+        yield _open_zstd(filename, buffer_size)
+    elif suffix.endswith(ZIP):
+        with zipfile.ZipFile(filename) as archive:
+            members = sorted(info.filename for info in archive.infolist()
+                                if not info.is_dir())
+            for member in members:
+                yield archive.open(member)
+    else:
+        raise ValueError(f"Unsupported archive type: {filename}")
+
+
+def open_members(filename: str,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 encoding: str = 'utf-8') -> t.Iterator[t.TextIO]:
+    """
+    Yield text streams of archive members, one at a time.
+    Each stream is closed once the next one is requested.
+    """
+    for member in _open_binary_members(filename, buffer_size):
+        buffered = io.BufferedReader(member, buffer_size)
+        with io.TextIOWrapper(buffered, encoding=encoding, 
+                              newline='') as stream:
+            yield stream
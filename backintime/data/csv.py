@@ -1,20 +1,36 @@
 from __future__ import annotations
 
+import io
+import os
+import copy
 import csv
+import math
+import numpy
 import typing as t
 import pandas as pd 
+from concurrent.futures import Future, ProcessPoolExecutor
 from itertools import dropwhile
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 from dataclasses import dataclass
-from collections import abc
+from collections import abc, deque
 from backintime.timeframes import Timeframes
+from backintime.analyser.indicators.constants import CandleProperties
+from .csv_index import CSVTimeIndex
+from .columns import CandleColumns, from_millis, to_millis
+from .compressed import (
+    DEFAULT_BUFFER_SIZE,
+    check_dependencies,
+    is_compressed, 
+    open_members
+)
 from .data_provider import (
     Candle,
     DataProvider, 
     DataProviderFactory, 
     DataProviderError,
-    ParsingError
+    ParsingError,
+    project_schema
 )
 
 
@@ -36,20 +52,22 @@ class DateNotFound(DataProviderError):
         super().__init__(message)
 
 
-def _parse_volume(candle, schema: CSVCandlesSchema) -> Decimal:
-    return Decimal(candle[schema.volume]) if schema.volume \
-        else Decimal('NaN')
+_NAN = Decimal('NaN')
+
+
+def _parse_price(candle, index: t.Optional[int]) -> Decimal:
+    return Decimal(candle[index]) if index is not None else _NAN
 
 
 def _parse_candle(candle, schema: CSVCandlesSchema, date_parser) -> Candle:
     """Parse candle from a sequence of strings."""
     try:
         return Candle(open_time=date_parser(candle[schema.open_time]),
-                      open=Decimal(candle[schema.open]),
-                      high=Decimal(candle[schema.high]),
-                      low=Decimal(candle[schema.low]),
-                      close=Decimal(candle[schema.close]),
-                      volume=_parse_volume(candle, schema),
+                      open=_parse_price(candle, schema.open),
+                      high=_parse_price(candle, schema.high),
+                      low=_parse_price(candle, schema.low),
+                      close=_parse_price(candle, schema.close),
+                      volume=_parse_price(candle, schema.volume),
                       close_time=date_parser(candle[schema.close_time]))
     except Exception as e:
         raise ParsingError(str(e))
@@ -59,8 +77,8 @@ def _skip_to_date(rows: t.Iterable[t.Iterable[str]],
                   column_index: int, 
                   date: datetime,
                   parse_date: t.Callable) -> t.Iterable[t.Iterable[str]]:
-    """Skip rows until date at `column_index` equals `date`."""
-    predicate = lambda row: parse_date(row[column_index]) != date
+    """Skip rows until date at `column_index` is at or after `date`."""
+    predicate = lambda row: parse_date(row[column_index]) < date
     return dropwhile(predicate, rows)
 
 
@@ -71,15 +89,314 @@ def _skip_headers(rows: t.Iterable[str]) -> t.Iterable[str]:
 
 def _csvrows(filename: str, 
              delimiter: str, 
-             quotechar: str) -> t.Generator[t.Iterable[str], None, None]:
-    """Return generator that will iterate over rows in CSV file."""
-    with open(filename, newline='') as csvfile:
+             quotechar: str,
+             offset: int = 0,
+             buffer_size: int = DEFAULT_BUFFER_SIZE,
+             encoding: str = 'utf-8'
+             ) -> t.Generator[t.Iterable[str], None, None]:
+    """
+    Return generator that will iterate over rows in CSV file,
+    starting from byte `offset`.
+    Compressed files are decompressed on the fly and can't be 
+    read from `offset`; headers of each archive member are skipped.
+    """
+    if is_compressed(filename):
+        for stream in open_members(filename, buffer_size, encoding):
+            reader = csv.reader(stream, delimiter=delimiter, 
+                                quotechar=quotechar)
+            yield from _skip_headers(reader)
+        return
+
+    with open(filename, 'rb') as rawfile:
+        rawfile.seek(offset)
+        csvfile = io.TextIOWrapper(rawfile, encoding=encoding, newline='')
         reader = csv.reader(csvfile, delimiter=delimiter, 
                             quotechar=quotechar)
         for row in reader:
             yield row
 
 
+def _parse_dates(dates: t.Sequence[str], 
+                 date_parser: t.Callable) -> numpy.ndarray:
+    """Parse dates to milliseconds timestamps."""
+    if date_parser is _parse_date:
+        # Default parser can handle all dates at once, 
+        # unless they are in different formats
+        try:
+            parsed = pd.to_datetime(list(dates), utc=True)
+        except ValueError:
+            pass
+        else:
+            return parsed.values.astype('datetime64[ms]').astype(numpy.int64)
+    return numpy.array([to_millis(date_parser(date)) for date in dates], 
+                       dtype=numpy.int64)
+
+
+def _parse_chunk(filename: str,
+                 start: int,
+                 end: int,
+                 schema: CSVCandlesSchema,
+                 delimiter: str,
+                 quotechar: str,
+                 date_parser: t.Callable,
+                 parse: t.Optional[t.Callable] = None,
+                 encoding: str = 'utf-8') -> t.Any:
+    """
+    Parse rows in [start, end) bytes range of CSV file
+    with `parse` (into columns by default).
+    """
+    parse = parse or _parse_text
+    with open(filename, 'rb') as csvfile:
+        csvfile.seek(start)
+        data = csvfile.read(end - start)
+    return parse(data.decode(encoding), schema, delimiter, quotechar, 
+                 date_parser)
+
+
+def _read_rows(text: str, 
+               delimiter: str, 
+               quotechar: str) -> t.List[t.List[str]]:
+    """Read CSV rows from `text`, skipping headers."""
+    lines = io.StringIO(text, newline='')
+    reader = csv.reader(lines, delimiter=delimiter, quotechar=quotechar)
+    return [ row for row in reader if row and not row[0][:1].isalpha() ]
+
+
+def _parse_candles(text: str,
+                   schema: CSVCandlesSchema,
+                   delimiter: str,
+                   quotechar: str,
+                   date_parser: t.Callable) -> t.List[Candle]:
+    """
+    Parse CSV rows from `text` into candles. Dates are parsed
+    all at once, prices are parsed to `Decimal` as they are.
+    """
+    rows = _read_rows(text, delimiter, quotechar)
+    if not rows:
+        return []
+
+    columns = list(zip(*rows))
+    price = lambda index: [ Decimal(value) for value in columns[index] ] \
+                            if index is not None else [_NAN]*len(rows)
+    try:
+        candles = zip(_parse_dates(columns[schema.open_time], 
+                                   date_parser).tolist(),
+                      _parse_dates(columns[schema.close_time], 
+                                   date_parser).tolist(),
+                      price(schema.open),
+                      price(schema.high),
+                      price(schema.low),
+                      price(schema.close),
+                      price(schema.volume))
+        return [
+            Candle(open_time=from_millis(open_time), open=open, 
+                   high=high, low=low, close=close, volume=volume,
+                   close_time=from_millis(close_time))
+                for open_time, close_time, open, high, low, close, volume
+                    in candles
+        ]
+    except Exception as e:
+        raise ParsingError(str(e))
+
+
+def _parse_text(text: str,
+                schema: CSVCandlesSchema,
+                delimiter: str,
+                quotechar: str,
+                date_parser: t.Callable) -> CandleColumns:
+    """Parse CSV rows from `text` into columns."""
+    rows = _read_rows(text, delimiter, quotechar)
+    if not rows:
+        return CandleColumns.empty()
+
+    columns = list(zip(*rows))
+    price = lambda index: \
+                numpy.array(columns[index], dtype=numpy.float64) \
+                    if index is not None else numpy.full(len(rows), numpy.nan)
+    try:
+        return CandleColumns(
+                    open_time=_parse_dates(columns[schema.open_time], 
+                                           date_parser),
+                    close_time=_parse_dates(columns[schema.close_time], 
+                                            date_parser),
+                    open=price(schema.open),
+                    high=price(schema.high),
+                    low=price(schema.low),
+                    close=price(schema.close),
+                    volume=price(schema.volume))
+    except Exception as e:
+        raise ParsingError(str(e))
+
+
+def _split_file(filename: str, 
+                start: int, 
+                end: int, 
+                chunks_count: int) -> t.List[t.Tuple[int, int]]:
+    """
+    Split [start, end) bytes range of a file into at most 
+    `chunks_count` chunks, each of which begins at a new line.
+    `start` and `end` must be at the beginning of a line.
+    """
+    step = max(1, math.ceil((end - start) / chunks_count))
+    bounds = [start]
+    with open(filename, 'rb') as file:
+        for offset in range(start + step, end, step):
+            # Move to the beginning of the next line
+            file.seek(offset - 1)
+            file.readline()
+            bound = min(file.tell(), end)
+            if bound > bounds[-1]:
+                bounds.append(bound)
+    if end > bounds[-1]:
+        bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _run_tasks(tasks: t.Iterable[t.Tuple], 
+               workers: int) -> t.Iterator[t.Any]:
+    """
+    Run `(function, *args)` tasks in `workers` processes and yield
+    their results in order. At most `workers` tasks are submitted
+    ahead of the one being consumed, so that results of a large file
+    are not all held at once.
+    """
+    if workers <= 1:
+        for function, *args in tasks:
+            yield function(*args)
+        return
+
+    with ProcessPoolExecutor(workers) as executor:
+        pending: t.Deque[Future] = deque()
+        for function, *args in tasks:
+            pending.append(executor.submit(function, *args))
+            if len(pending) > workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _iter_parts(filename: str,
+                schema: CSVCandlesSchema,
+                delimiter: str,
+                quotechar: str,
+                date_parser: t.Callable,
+                index: t.Optional[CSVTimeIndex],
+                since: t.Optional[datetime],
+                until: t.Optional[datetime],
+                workers: int,
+                chunk_size: int,
+                buffer_size: int,
+                parse: t.Callable,
+                encoding: str) -> t.Iterator[t.Any]:
+    """
+    Split the file into newline-aligned chunks, which are parsed
+    with `parse` in `workers` processes. Yield parsed chunks in 
+    the order of the file.
+    """
+    if is_compressed(filename):
+        args = (schema, delimiter, quotechar, date_parser)
+        tasks = ((parse, text, *args) 
+                    for text in _compressed_chunks(filename, chunk_size, 
+                                                   buffer_size, encoding))
+        yield from _run_tasks(tasks, workers)
+        return
+
+    start, end = 0, os.path.getsize(filename)
+    if index and since:
+        start = index.find_since(since)
+    if index and until:
+        end = max(start, index.find_until(until))
+
+    chunks_count = max(workers, math.ceil((end - start) / chunk_size))
+    chunks = _split_file(filename, start, end, chunks_count)
+    tasks = (
+        (_parse_chunk, filename, chunk_start, chunk_end, schema, 
+         delimiter, quotechar, date_parser, parse, encoding)
+            for chunk_start, chunk_end in chunks
+    )
+    yield from _run_tasks(tasks, workers if len(chunks) > 1 else 1)
+
+
+def _load_columns(filename: str,
+                  schema: CSVCandlesSchema,
+                  delimiter: str,
+                  quotechar: str,
+                  date_parser: t.Callable,
+                  index: t.Optional[CSVTimeIndex],
+                  since: t.Optional[datetime],
+                  until: t.Optional[datetime],
+                  workers: int,
+                  chunk_size: int,
+                  buffer_size: int,
+                  encoding: str) -> CandleColumns:
+    """
+    Parse candles with `since` <= open time < `until` into columns,
+    in `workers` processes, and join them in historical order.
+    """
+    parts = list(_iter_parts(filename, schema, delimiter, quotechar, 
+                             date_parser, index, since, until, 
+                             workers, chunk_size, buffer_size, 
+                             _parse_text, encoding))
+    columns = CandleColumns.concatenate(parts).sorted()
+    return _filter_columns(columns, since, until)
+
+
+def _load_candles(filename: str,
+                  schema: CSVCandlesSchema,
+                  delimiter: str,
+                  quotechar: str,
+                  date_parser: t.Callable,
+                  index: t.Optional[CSVTimeIndex],
+                  since: datetime,
+                  until: datetime,
+                  workers: int,
+                  chunk_size: int,
+                  buffer_size: int,
+                  encoding: str) -> t.List[Candle]:
+    """
+    Parse candles with `since` <= open time < `until`, in `workers`
+    processes, and join them in historical order. Unlike columns,
+    prices are kept exactly as they are in the file.
+    """
+    parts = _iter_parts(filename, schema, delimiter, quotechar, 
+                        date_parser, index, since, until, 
+                        workers, chunk_size, buffer_size, 
+                        _parse_candles, encoding)
+    candles = [ candle for part in parts for candle in part
+                    if since <= candle.open_time < until ]
+    # Stable, so equal times stay in the order of the file
+    candles.sort(key=lambda candle: candle.open_time)
+    return candles
+
+
+def _filter_columns(columns: CandleColumns,
+                    since: t.Optional[datetime],
+                    until: t.Optional[datetime]) -> CandleColumns:
+    """Get candles with `since` <= open time < `until`."""
+    if not since and not until:
+        return columns
+    limits = numpy.iinfo(numpy.int64)
+    since_ms = to_millis(since) if since else limits.min
+    until_ms = to_millis(until) if until else limits.max
+    open_time = columns.open_time
+    return columns.take((open_time >= since_ms) & (open_time < until_ms))
+
+
+def _compressed_chunks(filename: str, 
+                       chunk_size: int,
+                       buffer_size: int,
+                       encoding: str) -> t.Iterator[str]:
+    """
+    Yield decompressed text of compressed CSV file
+    in chunks of whole lines.
+    """
+    for stream in open_members(filename, buffer_size, encoding):
+        lines = stream.readlines(chunk_size)
+        while lines:
+            yield ''.join(lines)
+            lines = stream.readlines(chunk_size)
+
+
 class CSVCandles(DataProvider):
     def __init__(self, 
                  filename: str,
@@ -90,7 +407,12 @@ class CSVCandles(DataProvider):
                  quotechar: str,
                  since: datetime, 
                  until: datetime,
-                 date_parser: t.Callable):
+                 date_parser: t.Callable,
+                 index: t.Optional[CSVTimeIndex] = None,
+                 workers: int = 1,
+                 chunk_size: int = 32*1024**2,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 encoding: str = 'utf-8'):
         self._filename = filename
         self._symbol = symbol
         self._timeframe = timeframe
@@ -100,6 +422,11 @@ class CSVCandles(DataProvider):
         self._since = since
         self._until = until
         self._date_parser = date_parser
+        self._index = index
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self._buffer_size = buffer_size
+        self._encoding = encoding
 
     @property
     def title(self) -> str:
@@ -121,9 +448,44 @@ class CSVCandles(DataProvider):
     def until(self) -> datetime:
         return self._until
 
+    def read_columns(self) -> CandleColumns:
+        """
+        Parse candles in (since, until) into columns, 
+        using `workers` processes.
+        As iteration, raises `DateNotFound` if there are no candles.
+        """
+        if self._since >= self._until:
+            return CandleColumns.empty()
+        columns = _load_columns(self._filename, self._schema, 
+                                self._delimiter, self._quotechar, 
+                                self._date_parser, self._index, 
+                                self._since, self._until,
+                                self._workers, self._chunk_size, 
+                                self._buffer_size, self._encoding)
+        if not len(columns):
+            raise DateNotFound(self._since, self._filename)
+        return columns
+
     def __iter__(self) -> t.Iterator[Candle]:
         """Return generator that will yield one candle at a time."""
-        csvrows = _csvrows(self._filename, self._delimiter, self._quotechar)
+        if self._since >= self._until:
+            return      # nothing to look for, e.g. no prefetching needed
+        if self._workers > 1:
+            candles = _load_candles(self._filename, self._schema, 
+                                    self._delimiter, self._quotechar, 
+                                    self._date_parser, self._index, 
+                                    self._since, self._until,
+                                    self._workers, self._chunk_size, 
+                                    self._buffer_size, self._encoding)
+            if not candles:
+                raise DateNotFound(self._since, self._filename)
+            yield from candles
+            return
+        # Seek close to `since` if the file is indexed
+        offset = self._index.find_since(self._since) if self._index else 0
+        csvrows = _csvrows(self._filename, self._delimiter, 
+                           self._quotechar, offset, self._buffer_size,
+                           self._encoding)
         csvrows = _skip_headers(csvrows)
         csvrows = _skip_to_date(csvrows, self._schema.open_time, 
                                 self._since, self._date_parser)
@@ -135,7 +497,9 @@ class CSVCandles(DataProvider):
             raise DateNotFound(self._since, self._filename)
         else:
             candle = _parse_candle(row, self._schema, self._date_parser)
-            prev_open = candle.open_time
+            # (since, until) may fall into a gap in data
+            if candle.open_time >= self._until:
+                raise DateNotFound(self._since, self._filename)
             yield candle
 
         for row in csvrows:
@@ -150,6 +514,11 @@ def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _parse_date(date: str) -> datetime:
+    """Default date parser for CSV files."""
+    return pd.to_datetime(date, utc=True)
+
+
 def _default_schema() -> CSVCandlesSchema:
     return CSVCandlesSchema(open_time=0, open=1,
                             high=2, low=3, close=4,
@@ -164,7 +533,34 @@ class CSVCandlesFactory(DataProviderFactory):
                  schema: CSVCandlesSchema = _default_schema(),
                  delimiter=';',
                  quotechar='|',
-                 date_parser = lambda x: pd.to_datetime(x, utc=True)):
+                 date_parser: t.Callable = _parse_date,
+                 use_index: bool = False,
+                 index_stride: int = 1024,
+                 workers: int = 1,
+                 chunk_size: int = 32*1024**2,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 encoding: str = 'utf-8'):
+        """
+        If `use_index` is True, time index of the file is built on
+        the first use and stored next to the file as `<filename>.idx`,
+        or kept in memory only if it can't be written there.
+        It allows to start reading from `since` date without parsing
+        all preceding rows. Every `index_stride`-th row is indexed.
+
+        If `workers` > 1, the file is split into chunks of about
+        `chunk_size` bytes, which are parsed in a pool of `workers`
+        processes. In this case `date_parser` must be picklable
+        (i.e. not a lambda).
+
+        Compressed files (`.gz`, `.zst`, `.zip`) are decompressed 
+        on the fly with buffers of `buffer_size` bytes. Members of
+        `.zip` archive are read in the order of their names. 
+        Time index is not used for compressed files. `.zst` files
+        require `zstandard` package (`pip install backintime[zstd]`).
+
+        The file and its index are read with `encoding`.
+        """
+        check_dependencies(filename)
         self.filename = filename
         self.symbol = symbol
         self.tf = timeframe
@@ -172,6 +568,15 @@ class CSVCandlesFactory(DataProviderFactory):
         self.delimiter = delimiter
         self.quotechar = quotechar
         self.date_parser = date_parser
+        self.index = CSVTimeIndex(filename, schema.open_time, 
+                                  delimiter, quotechar, date_parser, 
+                                  index_stride, encoding=encoding) \
+                        if use_index and not is_compressed(filename) \
+                        else None
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.buffer_size = buffer_size
+        self.encoding = encoding
 
     @property
     def timeframe(self) -> Timeframes:
@@ -183,4 +588,60 @@ class CSVCandlesFactory(DataProviderFactory):
         return CSVCandles(self.filename, self.symbol, 
                           self.timeframe, self.schema, 
                           self.delimiter, self.quotechar, 
-                          since, until, self.date_parser)
+                          since, until, self.date_parser, self.index,
+                          self.workers, self.chunk_size, self.buffer_size,
+                          self.encoding)
+
+    def project(self, 
+                properties: t.AbstractSet[CandleProperties]
+                ) -> CSVCandlesFactory:
+        """Get factory that parses only price columns in `properties`."""
+        factory = copy.copy(self)
+        factory.schema = project_schema(self.schema, properties)
+        return factory
+
+    def load_columns(self, 
+                     since: t.Optional[datetime] = None, 
+                     until: t.Optional[datetime] = None) -> CandleColumns:
+        """
+        Parse the whole file, or candles with `since` <= open time
+        < `until`, into columns using `workers` processes.
+        The result can be stored as a binary cache 
+        with `CandleColumns.save`.
+        Raises `DateNotFound` if `since` is set and there are no 
+        candles in the range.
+        """
+        columns = _load_columns(self.filename, self.schema, 
+                                self.delimiter, self.quotechar, 
+                                self.date_parser, self.index, since, until,
+                                self.workers, self.chunk_size, 
+                                self.buffer_size, self.encoding)
+        if since is not None and not len(columns):
+            raise DateNotFound(since, self.filename)
+        return columns
+
+    def iter_columns(self, 
+                     since: t.Optional[datetime] = None, 
+                     until: t.Optional[datetime] = None
+                     ) -> t.Iterator[CandleColumns]:
+        """
+        Parse the whole file, or candles with `since` <= open time
+        < `until`, into columns using `workers` processes, and yield
+        them one chunk of about `chunk_size` bytes at a time, 
+        in the order of the file.
+        Raises `DateNotFound` if `since` is set and there are no 
+        candles in the range.
+        """
+        parts = _iter_parts(self.filename, self.schema, 
+                            self.delimiter, self.quotechar, 
+                            self.date_parser, self.index, since, until,
+                            self.workers, self.chunk_size, 
+                            self.buffer_size, _parse_text, self.encoding)
+        found = False
+        for columns in parts:
+            columns = _filter_columns(columns, since, until)
+            if len(columns):
+                found = True
+                yield columns
+        if since is not None and not found:
+            raise DateNotFound(since, self.filename)
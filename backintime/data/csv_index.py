@@ -0,0 +1,197 @@
+"""
+Sparse time index for CSV files with candles.
+
+Index holds open time and byte offset of every `stride`-th data row
+of a CSV file, so that the first row at or after some date can be
+found with binary search and `seek` instead of parsing
+all preceding rows.
+Index is stored in a sidecar file next to the CSV file
+(`<filename>.idx`) and is rebuilt once the size or modification
+time of the CSV file changes.
+"""
+import os
+import csv
+import struct
+import typing as t
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+
+_MAGIC = b'BTIMEIDX'
+_VERSION = 1
+# magic, version, file size, file mtime (ns), stride, is sorted, count
+_HEADER = struct.Struct('<8sBqqqBq')
+
+
+def _to_ms(time: datetime) -> int:
+    """Convert `datetime` to milliseconds timestamp."""
+    return round(time.timestamp()*1000)
+
+
+def _stat(filename: str) -> t.Tuple[int, int]:
+    """Get size and modification time (ns) of a file."""
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class CSVTimeIndex:
+    """
+    Sparse index of a CSV file: open time and byte offset of
+    every `stride`-th data row. Built lazily on the first lookup.
+    `encoding` must be the one the file is read with.
+
+    If the CSV file is not sorted by open time, binary search is
+    not applicable and lookups fall back to the first data row.
+    """
+    def __init__(self,
+                 filename: str,
+                 open_time_column: int,
+                 delimiter: str,
+                 quotechar: str,
+                 date_parser: t.Callable,
+                 stride: int = 1024,
+                 index_filename: t.Optional[str] = None,
+                 encoding: str = 'utf-8'):
+        assert stride > 0, "Index stride must be greater than zero"
+        self._filename = filename
+        self._index_filename = index_filename or f"{filename}.idx"
+        self._column = open_time_column
+        self._delimiter = delimiter
+        self._quotechar = quotechar
+        self._date_parser = date_parser
+        self._stride = stride
+        self._encoding = encoding
+        self._size = -1
+        self._mtime = -1
+        self._is_sorted = True
+        self._times = array('q')
+        self._offsets = array('q')
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    @property
+    def index_filename(self) -> str:
+        return self._index_filename
+
+    @property
+    def stride(self) -> int:
+        return self._stride
+
+    def __len__(self) -> int:
+        """Get the number of indexed rows."""
+        self._ensure_valid()
+        return len(self._offsets)
+
+    def find_since(self, since: datetime) -> int:
+        """
+        Get byte offset of a data row that is not later than the first
+        row with open time >= `since`. At most `stride` rows have
+        to be skipped from this offset to reach that row.
+        """
+        self._ensure_valid()
+        if not self._offsets:
+            return self._size
+        if not self._is_sorted:
+            return self._offsets[0]
+        idx = bisect_right(self._times, _to_ms(since)) - 1
+        return self._offsets[max(idx, 0)]
+
+    def find_until(self, until: datetime) -> int:
+        """
+        Get byte offset after which there are no rows
+        with open time < `until`.
+        """
+        self._ensure_valid()
+        if not self._is_sorted:
+            return self._size
+        idx = bisect_left(self._times, _to_ms(until))
+        return self._offsets[idx] if idx < len(self._offsets) \
+                else self._size
+
+    def _ensure_valid(self) -> None:
+        """Load or rebuild the index if the CSV file has changed."""
+        size, mtime = _stat(self._filename)
+        if (size, mtime) == (self._size, self._mtime):
+            return
+        if not self._load(size, mtime):
+            self._build(size, mtime)
+            self._save()
+
+    def _load(self, size: int, mtime: int) -> bool:
+        """Load index from the sidecar file if it is up to date."""
+        try:
+            with open(self._index_filename, 'rb') as idxfile:
+                header = idxfile.read(_HEADER.size)
+                if len(header) != _HEADER.size:
+                    return False
+                magic, version, idx_size, idx_mtime, stride, \
+                    is_sorted, count = _HEADER.unpack(header)
+                if magic != _MAGIC or version != _VERSION or \
+                        (idx_size, idx_mtime) != (size, mtime) or \
+                        stride != self._stride:
+                    return False
+                times, offsets = array('q'), array('q')
+                times.fromfile(idxfile, count)
+                offsets.fromfile(idxfile, count)
+        except (OSError, EOFError, struct.error):
+            return False
+
+        self._times, self._offsets = times, offsets
+        self._is_sorted = bool(is_sorted)
+        self._size, self._mtime = size, mtime
+        return True
+
+    def _save(self) -> None:
+        """
+        Store index to the sidecar file.
+        Failure to write (e.g. read-only location) is not an error:
+        the index will be kept in memory only.
+        """
+        header = _HEADER.pack(_MAGIC, _VERSION, self._size, self._mtime,
+                              self._stride, self._is_sorted,
+                              len(self._offsets))
+        try:
+            with open(self._index_filename, 'wb') as idxfile:
+                idxfile.write(header)
+                self._times.tofile(idxfile)
+                self._offsets.tofile(idxfile)
+        except OSError:
+            pass
+
+    def _build(self, size: int, mtime: int) -> None:
+        """Scan CSV file and parse open time of every `stride`-th row."""
+        times, offsets = array('q'), array('q')
+        is_sorted = True
+        rows_count = 0
+        offset = 0
+        headers = True
+
+        with open(self._filename, 'rb') as csvfile:
+            for line in csvfile:
+                line_offset = offset
+                offset += len(line)
+                text = line.decode(self._encoding)
+                if not text.strip():
+                    continue
+                # Skip leading rows that begin with non-numeric char
+                if headers and text[0].isalpha():
+                    continue
+                headers = False
+
+                if rows_count % self._stride == 0:
+                    row = next(csv.reader([text],
+                                          delimiter=self._delimiter,
+                                          quotechar=self._quotechar))
+                    time = _to_ms(self._date_parser(row[self._column]))
+                    if times and time < times[-1]:
+                        is_sorted = False
+                    times.append(time)
+                    offsets.append(line_offset)
+                rows_count += 1
+
+        self._times, self._offsets = times, offsets
+        self._is_sorted = is_sorted
+        self._size, self._mtime = size, mtime
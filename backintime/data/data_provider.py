@@ -3,10 +3,29 @@ import typing as t
 from collections import abc
 from abc import ABC, abstractmethod
 from datetime import datetime
+from dataclasses import replace
 from backintime.timeframes import Timeframes
+from backintime.analyser.indicators.constants import CandleProperties
 from .candle import Candle
 
 
+ALL_PROPERTIES = frozenset(CandleProperties)
+
+Schema = t.TypeVar('Schema')
+
+
+def project_schema(schema: Schema, 
+                   properties: t.AbstractSet[CandleProperties]) -> Schema:
+    """
+    Get schema without price columns not in `properties`,
+    so that they are not read (and set to NaN). `schema` must be
+    a dataclass with fields named after candle properties.
+    """
+    skipped = { prop.value.lower(): None 
+                    for prop in CandleProperties if prop not in properties }
+    return replace(schema, **skipped)
+
+
 class DataProvider(abc.Iterable):
     """
     Provides candles in historical order.
@@ -54,6 +73,16 @@ class DataProviderFactory(ABC):
     def create(self, since: datetime, until: datetime):
         pass
 
+    def project(self, 
+                properties: t.AbstractSet[CandleProperties]
+                ) -> 'DataProviderFactory':
+        """
+        Get factory of providers that may skip parsing candle 
+        properties not in `properties` (these are set to NaN).
+        By default, all properties are parsed.
+        """
+        return self
+
 
 class DataProviderError(Exception):
     """Base class for all data related errors."""
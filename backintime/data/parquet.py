@@ -0,0 +1,241 @@
+"""
+Candles from local Parquet files.
+
+Parquet support requires `pyarrow` package, which can be installed
+with `pip install backintime[parquet]`.
+"""
+from __future__ import annotations
+
+import copy
+import numpy
+import typing as t
+from datetime import datetime, timezone
+from dataclasses import dataclass
+from backintime.timeframes import Timeframes
+from backintime.analyser.indicators.constants import CandleProperties
+from .columns import CandleColumns, to_millis
+from .data_provider import (
+    Candle,
+    DataProvider,
+    DataProviderFactory,
+    ParsingError,
+    project_schema
+)
+
+if t.TYPE_CHECKING:
+    import pyarrow
+    import pyarrow.parquet as pq
+
+
+def _import_pyarrow():
+    """Import `pyarrow`, which is an optional dependency."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet support requires pyarrow package, "
+                          "install it with `pip install backintime[parquet]`")
+    return pyarrow
+
+
+@dataclass
+class ParquetCandlesSchema:
+    """
+    Schema specifies column names in Parquet file.
+    Time columns can be either of timestamp type or integers
+    (milliseconds since epoch).
+    """
+    open_time: str = 'open_time'
+    open: str = 'open'
+    high: str = 'high'
+    low: str = 'low'
+    close: str = 'close'
+    close_time: str = 'close_time'
+    volume: t.Optional[str] = 'volume'
+
+
+def _stat_to_millis(value: t.Union[datetime, int]) -> int:
+    """Convert row group statistics value to milliseconds timestamp."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return to_millis(value)
+    return int(value)
+
+
+def _select_row_groups(parquet_file: pq.ParquetFile,
+                       column: str,
+                       since: int,
+                       until: int) -> t.List[int]:
+    """
+    Get indexes of row groups that may contain rows with
+    `since` <= `column` < `until`, judging by row group statistics.
+    Row groups without statistics are always selected.
+    """
+    metadata = parquet_file.metadata
+    paths = [ metadata.schema.column(i).path
+                for i in range(metadata.num_columns) ]
+    try:
+        column_index = paths.index(column)
+    except ValueError:
+        raise ParsingError(f"Column {column} was not found in Parquet file")
+    row_groups = []
+
+    for row_group in range(metadata.num_row_groups):
+        stats = metadata.row_group(row_group).column(column_index).statistics
+        if stats is not None and stats.has_min_max:
+            min_time = _stat_to_millis(stats.min)
+            max_time = _stat_to_millis(stats.max)
+            if max_time < since or min_time >= until:
+                continue
+        row_groups.append(row_group)
+    return row_groups
+
+
+def _to_millis_array(column: pyarrow.Array) -> numpy.ndarray:
+    """Convert timestamp or integer column to milliseconds timestamps."""
+    pyarrow = _import_pyarrow()
+    if pyarrow.types.is_timestamp(column.type):
+        ms_type = pyarrow.timestamp('ms', tz=column.type.tz)
+        column = column.cast(ms_type, safe=False)
+    return column.cast(pyarrow.int64()).to_numpy(zero_copy_only=False)
+
+
+def _to_float_array(column: pyarrow.Array) -> numpy.ndarray:
+    pyarrow = _import_pyarrow()
+    column = column.cast(pyarrow.float64())
+    return column.to_numpy(zero_copy_only=False)
+
+
+def _parse_batch(batch: pyarrow.RecordBatch,
+                 schema: ParquetCandlesSchema) -> CandleColumns:
+    """Convert record batch into columns. Missing prices are NaN."""
+    pyarrow = _import_pyarrow()
+    column = lambda name: batch.column(batch.schema.get_field_index(name))
+    price = lambda name: _to_float_array(column(name)) if name \
+                            else numpy.full(batch.num_rows, numpy.nan)
+    try:
+        return CandleColumns(
+                    open_time=_to_millis_array(column(schema.open_time)),
+                    close_time=_to_millis_array(column(schema.close_time)),
+                    open=price(schema.open),
+                    high=price(schema.high),
+                    low=price(schema.low),
+                    close=price(schema.close),
+                    volume=price(schema.volume))
+    except (pyarrow.ArrowException, KeyError) as e:
+        raise ParsingError(str(e))
+
+
+class ParquetCandles(DataProvider):
+    def __init__(self,
+                 filename: str,
+                 symbol: str,
+                 timeframe: Timeframes,
+                 schema: ParquetCandlesSchema,
+                 since: datetime,
+                 until: datetime,
+                 batch_size: int):
+        self._filename = filename
+        self._symbol = symbol
+        self._timeframe = timeframe
+        self._schema = schema
+        self._since = since
+        self._until = until
+        self._batch_size = batch_size
+
+    @property
+    def title(self) -> str:
+        return f"local Parquet file {self._filename}"
+
+    @property
+    def symbol(self) -> str:
+        return self._symbol
+
+    @property
+    def timeframe(self) -> Timeframes:
+        return self._timeframe
+
+    @property
+    def since(self) -> datetime:
+        return self._since
+
+    @property
+    def until(self) -> datetime:
+        return self._until
+
+    def iter_columns(self) -> t.Iterator[CandleColumns]:
+        """
+        Yield candles in (since, until) as columns, one record batch
+        at a time. Row groups that can't contain such candles
+        are not read at all.
+        """
+        pyarrow = _import_pyarrow()
+        schema = self._schema
+        since, until = to_millis(self._since), to_millis(self._until)
+        parquet_file = pyarrow.parquet.ParquetFile(self._filename)
+        names = [ schema.open_time, schema.close_time, schema.open,
+                  schema.high, schema.low, schema.close, schema.volume ]
+        names = [ name for name in names if name ]
+        missing = set(names) - set(parquet_file.schema_arrow.names)
+        if missing:
+            raise ParsingError(f"Columns {', '.join(sorted(missing))} "
+                               f"were not found in {self._filename}")
+        row_groups = _select_row_groups(parquet_file, schema.open_time,
+                                        since, until)
+
+        batches = parquet_file.iter_batches(self._batch_size,
+                                            row_groups=row_groups,
+                                            columns=names)
+        for batch in batches:
+            columns = _parse_batch(batch, schema)
+            open_time = columns.open_time
+            columns = columns.take((open_time >= since) & (open_time < until))
+            if len(columns):
+                yield columns
+
+    def read_columns(self) -> CandleColumns:
+        """Read candles in (since, until) as columns."""
+        columns = CandleColumns.concatenate(list(self.iter_columns()))
+        return columns.sorted()
+
+    def __iter__(self) -> t.Iterator[Candle]:
+        """Return generator that will yield one candle at a time."""
+        for columns in self.iter_columns():
+            yield from columns
+
+
+class ParquetCandlesFactory(DataProviderFactory):
+    """
+    Creates providers of candles from a local Parquet file.
+    Time range filter is pushed down to row groups statistics,
+    so only row groups overlapping (since, until) are read.
+    Rows are expected to be in historical order.
+    """
+    def __init__(self,
+                 filename: str,
+                 symbol: str,
+                 timeframe: Timeframes,
+                 schema: ParquetCandlesSchema = ParquetCandlesSchema(),
+                 batch_size: int = 64*1024):
+        self.filename = filename
+        self.symbol = symbol
+        self.tf = timeframe
+        self.schema = schema
+        self.batch_size = batch_size
+
+    @property
+    def timeframe(self) -> Timeframes:
+        return self.tf
+
+    def project(self,
+                properties: t.AbstractSet[CandleProperties]
+                ) -> 'ParquetCandlesFactory':
+        """Get factory that reads only price columns in `properties`."""
+        factory = copy.copy(self)
+        factory.schema = project_schema(self.schema, properties)
+        return factory
+
+    def create(self, since: datetime, until: datetime) -> ParquetCandles:
+        return ParquetCandles(self.filename, self.symbol, self.timeframe,
+                              self.schema, since, until, self.batch_size)
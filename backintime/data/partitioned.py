@@ -0,0 +1,241 @@
+"""
+Dataset of CSV files, one file per calendar period (partition).
+
+Files are named after a `strftime` pattern, for instance
+`BTCUSDT-4h-%Y-%m.csv` for monthly partitions. Partition period
+(day, month or year) is inferred from the pattern.
+Only partitions that overlap (since, until) are opened,
+one at a time and in historical order.
+"""
+import os
+import copy
+import logging
+import typing as t
+from itertools import chain
+from datetime import datetime, timedelta, timezone
+from backintime.timeframes import Timeframes
+from backintime.analyser.indicators.constants import CandleProperties
+from .csv import (
+    CSVCandlesFactory,
+    CSVCandlesSchema,
+    DateNotFound,
+    _default_schema,
+    _parse_date,
+    _utcnow,
+    project_schema
+)
+from .data_provider import (
+    Candle,
+    DataProvider,
+    DataProviderFactory,
+    DataProviderError
+)
+
+
+DAY = 'day'
+MONTH = 'month'
+YEAR = 'year'
+
+
+class PartitionGap(DataProviderError):
+    def __init__(self, last_time: datetime, next_time: datetime, path: str):
+        message = (f"Gap between candles at {last_time} and {next_time} "
+                   f"at the beginning of partition {path}")
+        super().__init__(message)
+
+
+class PartitionOverlap(DataProviderError):
+    def __init__(self, last_time: datetime, next_time: datetime, path: str):
+        message = (f"Candle at {next_time} of partition {path} overlaps "
+                   f"previous partition, which ends at {last_time}")
+        super().__init__(message)
+
+
+def _get_period(pattern: str) -> str:
+    """Infer partition period from filename pattern."""
+    if '%d' in pattern or '%j' in pattern:
+        return DAY
+    elif '%m' in pattern or '%b' in pattern or '%B' in pattern:
+        return MONTH
+    elif '%Y' in pattern or '%y' in pattern:
+        return YEAR
+    raise ValueError(f"Can't infer partition period from `{pattern}`")
+
+
+def _partition_start(time: datetime, period: str) -> datetime:
+    """Get start of a partition containing `time` (UTC)."""
+    time = time.astimezone(timezone.utc)
+    start = time.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == MONTH:
+        start = start.replace(day=1)
+    elif period == YEAR:
+        start = start.replace(month=1, day=1)
+    return start
+
+
+def _next_partition_start(start: datetime, period: str) -> datetime:
+    if period == DAY:
+        return start + timedelta(days=1)
+    elif period == MONTH:
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    return start.replace(year=start.year + 1)
+
+
+def iter_partitions(since: datetime,
+                    until: datetime,
+                    period: str) -> t.Iterator[datetime]:
+    """Yield start times of partitions that overlap (since, until)."""
+    start = _partition_start(since, period)
+    while start < until:
+        yield start
+        start = _next_partition_start(start, period)
+
+
+class PartitionedCSVCandles(DataProvider):
+    def __init__(self,
+                 factory: 'PartitionedCSVCandlesFactory',
+                 since: datetime,
+                 until: datetime):
+        self._factory = factory
+        self._since = since
+        self._until = until
+
+    @property
+    def title(self) -> str:
+        factory = self._factory
+        pattern = os.path.join(factory.directory, factory.pattern)
+        return f"local CSV files {pattern}"
+
+    @property
+    def symbol(self) -> str:
+        return self._factory.symbol
+
+    @property
+    def timeframe(self) -> Timeframes:
+        return self._factory.timeframe
+
+    @property
+    def since(self) -> datetime:
+        return self._since
+
+    @property
+    def until(self) -> datetime:
+        return self._until
+
+    def _on_inconsistency(self, error: DataProviderError) -> None:
+        if self._factory.strict:
+            raise error
+        logger = logging.getLogger("backintime")
+        logger.warning(str(error))
+
+    def __iter__(self) -> t.Iterator[Candle]:
+        """
+        Return generator that will yield one candle at a time.
+        Candles of a partition that are not later than the last
+        candle of the previous partition are skipped.
+        """
+        factory = self._factory
+        timeframe = timedelta(seconds=self.timeframe.value)
+        last_time: t.Optional[datetime] = None
+
+        for start in iter_partitions(self._since, self._until,
+                                     factory.period):
+            path = factory.get_path(start)
+            if not os.path.exists(path):
+                logger = logging.getLogger("backintime")
+                logger.warning(f"Partition {path} was not found")
+                continue
+
+            candles = factory.get_partition(path).create(self._since,
+                                                         self._until)
+            try:
+                candles = iter(candles)
+                candle = next(candles)
+            except (StopIteration, DateNotFound):
+                continue
+
+            if last_time is not None:
+                if candle.open_time <= last_time:
+                    self._on_inconsistency(
+                        PartitionOverlap(last_time, candle.open_time, path))
+                elif candle.open_time - last_time > timeframe:
+                    self._on_inconsistency(
+                        PartitionGap(last_time, candle.open_time, path))
+
+            for candle in chain((candle,), candles):
+                if last_time is None or candle.open_time > last_time:
+                    last_time = candle.open_time
+                    yield candle
+
+
+class PartitionedCSVCandlesFactory(DataProviderFactory):
+    """
+    Creates providers of candles from a directory of CSV files,
+    one file per day, month or year. Files are named after
+    `pattern` with `strftime` placeholders,
+    e.g. `BTCUSDT-4h-%Y-%m.csv`.
+
+    Gaps and overlaps between adjacent partitions are logged,
+    or raised as `PartitionGap`/`PartitionOverlap` if `strict`.
+    """
+    def __init__(self,
+                 directory: str,
+                 pattern: str,
+                 symbol: str,
+                 timeframe: Timeframes,
+                 schema: CSVCandlesSchema = _default_schema(),
+                 delimiter=';',
+                 quotechar='|',
+                 date_parser: t.Callable = _parse_date,
+                 use_index: bool = False,
+                 strict: bool = False,
+                 encoding: str = 'utf-8'):
+        self.directory = directory
+        self.pattern = pattern
+        self.period = _get_period(pattern)
+        self.symbol = symbol
+        self.tf = timeframe
+        self.schema = schema
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.date_parser = date_parser
+        self.use_index = use_index
+        self.strict = strict
+        self.encoding = encoding
+        self._partitions: t.Dict[str, CSVCandlesFactory] = {}
+
+    @property
+    def timeframe(self) -> Timeframes:
+        return self.tf
+
+    def get_path(self, start: datetime) -> str:
+        """Get path to the partition that begins at `start`."""
+        return os.path.join(self.directory, start.strftime(self.pattern))
+
+    def get_partition(self, path: str) -> CSVCandlesFactory:
+        """Get factory for a partition file, reused across runs."""
+        partition = self._partitions.get(path)
+        if not partition:
+            partition = CSVCandlesFactory(path, self.symbol, self.tf,
+                                          self.schema, self.delimiter,
+                                          self.quotechar, self.date_parser,
+                                          self.use_index, 
+                                          encoding=self.encoding)
+            self._partitions[path] = partition
+        return partition
+
+    def project(self,
+                properties: t.AbstractSet[CandleProperties]
+                ) -> 'PartitionedCSVCandlesFactory':
+        """Get factory that parses only price columns in `properties`."""
+        factory = copy.copy(self)
+        factory.schema = project_schema(self.schema, properties)
+        factory._partitions = {}
+        return factory
+
+    def create(self,
+               since: datetime,
+               until: datetime = _utcnow()) -> PartitionedCSVCandles:
+        return PartitionedCSVCandles(self, since, until)
@@ -0,0 +1,211 @@
+"""
+Candles store in a local SQLite database.
+
+All candles are kept in one table with (symbol, timeframe, open_time)
+primary key, so that a date range of any symbol is read with
+an indexed range scan. Times are stored as milliseconds timestamps,
+prices as REAL (see `backintime.data.columns` on precision).
+"""
+import numpy
+import sqlite3
+import typing as t
+from pathlib import Path
+from contextlib import closing
+from datetime import datetime
+from backintime.timeframes import Timeframes
+from .columns import CandleColumns, to_millis, from_millis, to_decimal
+from .csv import CSVCandlesFactory
+from .data_provider import (
+    Candle,
+    DataProvider,
+    DataProviderFactory,
+    DataProviderError,
+    ParsingError
+)
+
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS candles (
+    symbol      TEXT    NOT NULL,
+    timeframe   TEXT    NOT NULL,
+    open_time   INTEGER NOT NULL,
+    close_time  INTEGER NOT NULL,
+    open        REAL    NOT NULL,
+    high        REAL    NOT NULL,
+    low         REAL    NOT NULL,
+    close       REAL    NOT NULL,
+    volume      REAL,
+    PRIMARY KEY (symbol, timeframe, open_time)
+) WITHOUT ROWID
+"""
+
+_SELECT_RANGE = """
+SELECT open_time, open, high, low, close, volume, close_time
+FROM candles
+WHERE symbol = ? AND timeframe = ? AND open_time >= ? AND open_time < ?
+ORDER BY open_time
+"""
+
+_INSERT = """
+INSERT OR REPLACE INTO candles
+    (symbol, timeframe, open_time, close_time,
+     open, high, low, close, volume)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _parse_volume(volume: t.Optional[float]) -> float:
+    return float('nan') if volume is None else volume
+
+
+def _parse_candle(row: tuple) -> Candle:
+    """Parse candle from a database row."""
+    open_time, open, high, low, close, volume, close_time = row
+    return Candle(open_time=from_millis(open_time),
+                  open=to_decimal(open),
+                  high=to_decimal(high),
+                  low=to_decimal(low),
+                  close=to_decimal(close),
+                  volume=to_decimal(_parse_volume(volume)),
+                  close_time=from_millis(close_time))
+
+
+def create_schema(connection: sqlite3.Connection) -> None:
+    """Create candles table if it does not exist."""
+    connection.execute(_CREATE_TABLE)
+
+
+def _validate(columns: CandleColumns) -> None:
+    """Check that candles have all prices but volume, which is optional."""
+    for name in ('open', 'high', 'low', 'close'):
+        missing = numpy.isnan(getattr(columns, name))
+        if missing.any():
+            open_time = from_millis(int(columns.open_time[missing.argmax()]))
+            raise ParsingError(f"Candle at {open_time} has no {name} price")
+
+
+def import_columns(database: str,
+                   symbol: str,
+                   timeframe: Timeframes,
+                   columns: CandleColumns,
+                   batch_size: int = 50_000) -> int:
+    """
+    Store candles in `database`, one transaction per `batch_size`
+    candles. Existing candles with the same open time are replaced.
+    Return the number of stored candles.
+    Candles without open, high, low or close price are not stored,
+    `ParsingError` is raised instead.
+    """
+    _validate(columns)
+    with closing(sqlite3.connect(database)) as connection:
+        create_schema(connection)
+        for start in range(0, len(columns), batch_size):
+            batch = columns.slice(start, start + batch_size)
+            volume = [ None if x != x else x for x in batch.volume.tolist() ]
+            rows = zip(batch.open_time.tolist(), batch.close_time.tolist(),
+                       batch.open.tolist(), batch.high.tolist(),
+                       batch.low.tolist(), batch.close.tolist(), volume)
+            with connection:    # commit or rollback
+                connection.executemany(_INSERT, (
+                    (symbol, timeframe.name, *row) for row in rows
+                ))
+    return len(columns)
+
+
+def import_csv(database: str,
+               csv_candles: CSVCandlesFactory,
+               batch_size: int = 50_000) -> int:
+    """
+    Import all candles from CSV file into `database` under symbol
+    and timeframe of `csv_candles`. The file is parsed with
+    `csv_candles.workers` processes and imported one chunk of
+    `csv_candles.chunk_size` bytes at a time, so that it's never 
+    loaded into memory at once.
+    Return the number of imported candles.
+    """
+    return sum(import_columns(database, csv_candles.symbol,
+                              csv_candles.timeframe, columns, batch_size)
+                    for columns in csv_candles.iter_columns())
+
+
+class SQLiteCandles(DataProvider):
+    def __init__(self,
+                 database: str,
+                 symbol: str,
+                 timeframe: Timeframes,
+                 since: datetime,
+                 until: datetime,
+                 batch_size: int):
+        self._database = database
+        self._symbol = symbol
+        self._timeframe = timeframe
+        self._since = since
+        self._until = until
+        self._batch_size = batch_size
+
+    @property
+    def title(self) -> str:
+        return f"local SQLite database {self._database}"
+
+    @property
+    def symbol(self) -> str:
+        return self._symbol
+
+    @property
+    def timeframe(self) -> Timeframes:
+        return self._timeframe
+
+    @property
+    def since(self) -> datetime:
+        return self._since
+
+    @property
+    def until(self) -> datetime:
+        return self._until
+
+    def __iter__(self) -> t.Iterator[Candle]:
+        """Return generator that will yield one candle at a time."""
+        params = (self._symbol, self._timeframe.name,
+                  to_millis(self._since), to_millis(self._until))
+        uri = f"{Path(self._database).absolute().as_uri()}?mode=ro"
+        try:
+            connection = sqlite3.connect(uri, uri=True)
+        except sqlite3.Error as e:
+            raise DataProviderError(str(e))
+
+        with closing(connection):
+            try:
+                cursor = connection.execute(_SELECT_RANGE, params)
+            except sqlite3.Error as e:
+                raise DataProviderError(str(e))
+
+            rows = cursor.fetchmany(self._batch_size)
+            while rows:
+                for row in rows:
+                    yield _parse_candle(row)
+                rows = cursor.fetchmany(self._batch_size)
+
+
+class SQLiteCandlesFactory(DataProviderFactory):
+    """
+    Creates providers of candles from a local SQLite database,
+    that can be shared across symbols and timeframes.
+    Use `import_csv` or `import_columns` to fill the database.
+    """
+    def __init__(self,
+                 database: str,
+                 symbol: str,
+                 timeframe: Timeframes,
+                 batch_size: int = 10_000):
+        self.database = database
+        self.symbol = symbol
+        self.tf = timeframe
+        self.batch_size = batch_size
+
+    @property
+    def timeframe(self) -> Timeframes:
+        return self.tf
+
+    def create(self, since: datetime, until: datetime) -> SQLiteCandles:
+        return SQLiteCandles(self.database, self.symbol, self.timeframe,
+                             since, until, self.batch_size)
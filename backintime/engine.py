@@ -0,0 +1,109 @@
+"""
+Backtesting loop. `Engine` feeds candles to broker, buffers and
+strategy, one candle at a time. `InstrumentedEngine` from
+`backintime.instrumentation` extends it to measure each phase.
+"""
+import typing as t
+from .trading_strategy import TradingStrategy
+from .analyser.analyser import AnalyserBuffer
+from .broker.default.broker import Broker
+from .candles import CandlesBuffer
+from .data.columns import CandleColumns
+
+
+class Engine:
+    """
+    Runs strategy over market data.
+    `is_tick` tells whether `tick` must be called after a candle,
+    if None, it is called after each one.
+    `on_candle` is called after each processed candle, if given.
+    """
+    def __init__(self,
+                 strategy: TradingStrategy,
+                 broker: Broker,
+                 candles_buffer: CandlesBuffer,
+                 analyser_buffer: AnalyserBuffer,
+                 is_tick: t.Optional[t.Callable[[t.Any], bool]] = None,
+                 on_candle: t.Optional[t.Callable[[t.Any], None]] = None):
+        self.strategy = strategy
+        self.broker = broker
+        self.candles_buffer = candles_buffer
+        self.analyser_buffer = analyser_buffer
+        self.is_tick = is_tick
+        self.on_candle = on_candle
+
+    def iterate(self, candles: t.Iterable) -> t.Iterator:
+        """Get iterator over input candles."""
+        return iter(candles)
+
+    def step(self, candle) -> None:
+        """Process one candle."""
+        self.broker.update(candle)          # Review whether orders can be executed
+        self.candles_buffer.update(candle)  # Update candles on required timeframes
+        self.analyser_buffer.update(candle) # Store data for indicators calculation
+        self.tick(candle)                   # Trading strategy logic here
+
+    def tick(self, candle) -> bool:
+        """
+        Run `tick` unless strategy sleeps or shouldn't tick on `candle`.
+        Return whether `tick` was called.
+        """
+        strategy = self.strategy
+        condition = strategy.wake_condition
+        if condition is not None:
+            if not condition.is_met(candle):
+                return False
+            strategy.wake_up()
+        if self.is_tick is None or self.is_tick(candle):
+            strategy.tick()
+            return True
+        return False
+
+    def skip(self, columns: CandleColumns, start: int) -> int:
+        """
+        Advance over candles of `columns` since `start` without
+        ticks, until the one to wake up strategy on. Return its index.
+        Broker is updated with each candle while it has orders to
+        review and then only with the last one, to keep current
+        price and time. Requires resampled buffers.
+        """
+        stop = self.strategy.wake_condition.find(columns, start)
+        broker = self.broker
+        position = start
+        while position < stop and broker.has_pending_orders:
+            broker.update(columns[position])
+            position += 1
+        if position < stop:
+            broker.update(columns[stop - 1])
+        self.candles_buffer.skip(stop - start)
+        self.analyser_buffer.skip(stop - start)
+        return stop
+
+    def run(self, market_data: t.Iterable) -> None:
+        """Run strategy over candles of `market_data`."""
+        on_candle = self.on_candle
+        for candle in self.iterate(market_data):
+            self.step(candle)
+            if on_candle is not None:
+                on_candle(candle)
+
+    def run_columns(self, columns: CandleColumns) -> None:
+        """
+        Run strategy over `columns` with resampled buffers.
+        While strategy sleeps, the candle to wake it up is found
+        with a vectorized search and candles before it are skipped.
+        """
+        strategy = self.strategy
+        on_candle = self.on_candle
+        position, count = 0, len(columns)
+        while position < count:
+            if strategy.is_sleeping:
+                position = self.skip(columns, position)
+
+            for candle in self.iterate(columns.slice(position, count)):
+                position += 1
+                self.step(candle)
+                if on_candle is not None:
+                    on_candle(candle)
+                if strategy.is_sleeping:
+                    break
@@ -0,0 +1,32 @@
+"""
+Opt-in instrumentation of backtesting runs.
+Pass instruments to `run_backtest`, for instance:
+
+    result = run_backtest(..., instruments=[PhaseProfiler()])
+    print(result.reports['profile'])
+
+Candles are processed without any measurements if no
+instruments are passed.
+"""
+from .base import Instrument, Instruments, Phase, RunContext
+from .analyser import InstrumentedAnalyser
+from .broker import BrokerMonitor, BrokerStats, InstrumentedBroker
+from .engine import InstrumentedEngine
+from .indicators import AnalyserStats, IndicatorStats, IndicatorsReport
+from .latency import (
+    LatencyHistogram, 
+    LatencyMonitor, 
+    LatencyReport, 
+    SlowCandle
+)
+from .memory import MemoryMonitor, MemoryReport, MemorySample, estimate_size
+from .prometheus import (
+    MetricsRegistry,
+    MetricsServer,
+    PrometheusMonitor,
+    get_default_registry,
+    write_textfile
+)
+from .progress import Progress, ProgressMonitor, log_progress
+from .profiling import PhaseProfiler, PhaseStats, ProfileReport
+from .tracing import ChromeTracer, TraceReport
@@ -0,0 +1,44 @@
+import typing as t
+from decimal import Decimal
+from time import perf_counter_ns
+from backintime.timeframes import Timeframes
+from backintime.analyser.analyser import (
+    Analyser, 
+    AnalyserBuffer, 
+    MarketDataInfo
+)
+from backintime.analyser.indicators.constants import CandleProperties
+from .base import Instrument
+
+
+class _CountingMarketData(MarketDataInfo):
+    """Counts values provided to indicators."""
+    def __init__(self, data: AnalyserBuffer):
+        super().__init__(data)
+        self.values = 0
+
+    def get_values(self, 
+                   timeframe: Timeframes, 
+                   candle_property: CandleProperties, 
+                   limit: int) -> t.Sequence[Decimal]:
+        values = super().get_values(timeframe, candle_property, limit)
+        self.values += len(values)
+        return values
+
+
+class InstrumentedAnalyser(Analyser):
+    """`Analyser` that reports each indicator calculation to `instrument`."""
+    def __init__(self, buffer: AnalyserBuffer, instrument: Instrument):
+        super().__init__(buffer)
+        self._market_data = _CountingMarketData(buffer)
+        self.instrument = instrument
+
+    def _calculate(self, indicator: t.Callable, *args) -> t.Any:
+        market_data = self._market_data
+        market_data.values = 0
+        start = perf_counter_ns()
+        result = indicator(market_data, *args)
+        end = perf_counter_ns()
+        self.instrument.on_indicator(indicator.__name__, args, 
+                                     market_data.values, start, end)
+        return result
@@ -0,0 +1,134 @@
+import typing as t
+from enum import Enum
+from dataclasses import dataclass
+from datetime import datetime
+from backintime.trading_strategy import TradingStrategy
+from backintime.analyser.analyser import AnalyserBuffer
+from backintime.broker.default.broker import Broker
+from backintime.candles import CandlesBuffer
+from backintime.data.data_provider import DataProvider
+
+
+class Phase(Enum):
+    PREFETCH = 'prefetch'   # Reading data for prefetching
+    DATA = 'data'           # Getting the next candle from data provider
+    BROKER = 'broker'       # `Broker.update`
+    CANDLES = 'candles'     # `CandlesBuffer.update`
+    ANALYSER = 'analyser'   # `AnalyserBuffer.update`
+    TICK = 'tick'           # `TradingStrategy.tick`
+    SKIP = 'skip'           # Skipping candles while strategy sleeps
+
+    def __str__(self) -> str:
+        return self.value
+
+
+@dataclass
+class RunContext:
+    """Components of a backtesting run, available to instruments."""
+    strategy: TradingStrategy
+    broker: Broker
+    candles_buffer: CandlesBuffer
+    analyser_buffer: AnalyserBuffer
+    market_data: DataProvider
+    since: datetime
+    until: datetime
+
+
+class Instrument:
+    """
+    Base class for instruments of `run_backtest`.
+    Instruments are notified of the run start and finish, each
+    phase of candle processing, each processed candle and each
+    indicator calculation requested by strategy, along with 
+    the number of input `values` it took.
+    All time values are in nanoseconds, as of `perf_counter_ns`.
+    What `report` returns is added to `BacktestingResult.reports`
+    with `name` as a key.
+    Instruments that read stats of `InstrumentedBroker` or rely on
+    `on_indicator` must set `uses_broker` or `uses_analyser`, 
+    otherwise plain broker and analyser are used.
+    """
+    name = ''
+    uses_broker = False
+    uses_analyser = False
+
+    def on_start(self, context: RunContext) -> None:
+        pass
+
+    def on_phase(self, phase: Phase, start: int, end: int) -> None:
+        pass
+
+    def on_candle(self, candle, start: int, end: int) -> None:
+        pass
+
+    def on_indicator(self, 
+                     indicator: str, 
+                     args: t.Tuple, 
+                     values: int,
+                     start: int, 
+                     end: int) -> None:
+        pass
+
+    def on_error(self, error: Exception) -> None:
+        """
+        Called if the run is stopped by `error`. `on_finish` is
+        called afterwards, unless `error` is raised further.
+        """
+        pass
+
+    def on_finish(self) -> None:
+        pass
+
+    def report(self) -> t.Any:
+        return None
+
+
+class Instruments(Instrument):
+    """Notifies all of `instruments`."""
+    def __init__(self, instruments: t.Iterable[Instrument]):
+        self.instruments = list(instruments)
+
+    @property
+    def uses_broker(self) -> bool:
+        return any(instrument.uses_broker for instrument in self.instruments)
+
+    @property
+    def uses_analyser(self) -> bool:
+        return any(instrument.uses_analyser 
+                    for instrument in self.instruments)
+
+    def on_start(self, context: RunContext) -> None:
+        for instrument in self.instruments:
+            instrument.on_start(context)
+
+    def on_phase(self, phase: Phase, start: int, end: int) -> None:
+        for instrument in self.instruments:
+            instrument.on_phase(phase, start, end)
+
+    def on_candle(self, candle, start: int, end: int) -> None:
+        for instrument in self.instruments:
+            instrument.on_candle(candle, start, end)
+
+    def on_indicator(self, 
+                     indicator: str, 
+                     args: t.Tuple, 
+                     values: int,
+                     start: int, 
+                     end: int) -> None:
+        for instrument in self.instruments:
+            instrument.on_indicator(indicator, args, values, start, end)
+
+    def on_error(self, error: Exception) -> None:
+        for instrument in self.instruments:
+            instrument.on_error(error)
+
+    def on_finish(self) -> None:
+        for instrument in self.instruments:
+            instrument.on_finish()
+
+    def report(self) -> t.Dict[str, t.Any]:
+        """Get reports of all instruments by their names."""
+        return {
+            instrument.name: instrument.report()
+                for instrument in self.instruments
+        }
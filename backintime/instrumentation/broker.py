@@ -0,0 +1,125 @@
+import typing as t
+from dataclasses import dataclass, replace
+from time import perf_counter_ns
+from backintime.broker.default.broker import Broker
+from .base import Instrument, RunContext
+
+
+@dataclass
+class BrokerStats:
+    """
+    Stats of `Broker.update` calls. 
+        - `scanned` - total number of orders reviewed on updates.
+        - `matching_ns` - time spent on matching orders to prices.
+        - `execution_ns` - time spent on executing orders: 
+            balance updates, trades and TP/SL handling.
+        - `cancellations` - orders cancelled by strategy.
+        - `system_cancellations` - TP/SL orders cancelled 
+            because position was modified.
+    """
+    updates: int = 0
+    scanned: int = 0
+    max_scanned: int = 0
+    activations: int = 0
+    executions: int = 0
+    cancellations: int = 0
+    system_cancellations: int = 0
+    peak_open_orders: int = 0
+    matching_ns: int = 0
+    execution_ns: int = 0
+
+    @property
+    def mean_scanned(self) -> float:
+        """Average number of orders reviewed per candle."""
+        return self.scanned / self.updates if self.updates else 0.0
+
+    def __repr__(self) -> str:
+        return (f"updates: {self.updates}\n"
+                f"orders scanned per candle: mean {self.mean_scanned:.2f}, "
+                f"max {self.max_scanned}\n"
+                f"activations: {self.activations}\n"
+                f"executions: {self.executions}\n"
+                f"cancellations: {self.cancellations} "
+                f"(system: {self.system_cancellations})\n"
+                f"peak open orders: {self.peak_open_orders}\n"
+                f"matching: {self.matching_ns/1e9:.3f}s, "
+                f"execution: {self.execution_ns/1e9:.3f}s")
+
+
+class InstrumentedBroker(Broker):
+    """`Broker` that collects `stats` of orders matching."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = BrokerStats()
+        # Time of executions within the current update
+        self._execution_ns = 0
+
+    @property
+    def open_orders(self) -> int:
+        """Number of orders that are neither executed nor cancelled."""
+        return self._orders.count_open_orders()
+
+    def update(self, candle) -> None:
+        stats = self.stats
+        scanned = self._orders.count_pending_orders()
+        stats.updates += 1
+        stats.scanned += scanned
+        stats.max_scanned = max(stats.max_scanned, scanned)
+        self._execution_ns = 0
+        start = perf_counter_ns()
+        try:
+            super().update(candle)
+        finally:
+            elapsed = perf_counter_ns() - start
+            stats.execution_ns += self._execution_ns
+            stats.matching_ns += elapsed - self._execution_ns
+            stats.peak_open_orders = self._orders.peak_open_orders
+
+    def _timed_execution(self, execute: t.Callable, *args) -> None:
+        start = perf_counter_ns()
+        try:
+            execute(*args)
+        finally:
+            self._execution_ns += perf_counter_ns() - start
+        self.stats.executions += 1
+
+    def _execute_market_order(self, *args) -> None:
+        self._timed_execution(super()._execute_market_order, *args)
+
+    def _execute_limit_order(self, *args) -> None:
+        self._timed_execution(super()._execute_limit_order, *args)
+
+    def _execute_strategy_market_order(self, *args) -> None:
+        self._timed_execution(super()._execute_strategy_market_order, *args)
+
+    def _execute_strategy_limit_order(self, *args) -> None:
+        self._timed_execution(super()._execute_strategy_limit_order, *args)
+
+    def _activate_strategy_order(self, *args) -> None:
+        super()._activate_strategy_order(*args)
+        self.stats.activations += 1
+
+    def _cancel_strategy_orders(self) -> None:
+        self.stats.system_cancellations += \
+                    sum(1 for _ in self._orders.get_strategy_orders())
+        super()._cancel_strategy_orders()
+
+    def cancel_order(self, order_id: int) -> None:
+        super().cancel_order(order_id)
+        self.stats.cancellations += 1
+
+
+class BrokerMonitor(Instrument):
+    """Reports `BrokerStats` of the run."""
+    name = 'broker'
+    uses_broker = True
+
+    def __init__(self):
+        self._broker: t.Optional[Broker] = None
+
+    def on_start(self, context: RunContext) -> None:
+        self._broker = context.broker
+
+    def report(self) -> t.Optional[BrokerStats]:
+        stats = getattr(self._broker, 'stats', None)
+        return replace(stats) if stats is not None else None
@@ -0,0 +1,51 @@
+import typing as t
+from time import perf_counter_ns
+from backintime.engine import Engine
+from backintime.data.columns import CandleColumns
+from .base import Instrument, Phase
+
+
+class InstrumentedEngine(Engine):
+    """`Engine` that reports time of each phase to `instrument`."""
+    def __init__(self, *args, instrument: Instrument, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instrument = instrument
+
+    def iterate(self, candles: t.Iterable) -> t.Iterator:
+        candles = iter(candles)
+        on_phase = self.instrument.on_phase
+        while True:
+            start = perf_counter_ns()
+            try:
+                candle = next(candles)
+            except StopIteration:
+                return
+            on_phase(Phase.DATA, start, perf_counter_ns())
+            yield candle
+
+    def step(self, candle) -> None:
+        # Timestamps are taken first and reported afterwards,
+        # so that instruments don't affect measurements
+        start = perf_counter_ns()
+        self.broker.update(candle)
+        broker_end = perf_counter_ns()
+        self.candles_buffer.update(candle)
+        candles_end = perf_counter_ns()
+        self.analyser_buffer.update(candle)
+        analyser_end = perf_counter_ns()
+        ticked = self.tick(candle)
+        end = perf_counter_ns()
+
+        instrument = self.instrument
+        instrument.on_phase(Phase.BROKER, start, broker_end)
+        instrument.on_phase(Phase.CANDLES, broker_end, candles_end)
+        instrument.on_phase(Phase.ANALYSER, candles_end, analyser_end)
+        if ticked:
+            instrument.on_phase(Phase.TICK, analyser_end, end)
+        instrument.on_candle(candle, start, end)
+
+    def skip(self, columns: CandleColumns, start: int) -> int:
+        started = perf_counter_ns()
+        stop = super().skip(columns, start)
+        self.instrument.on_phase(Phase.SKIP, started, perf_counter_ns())
+        return stop
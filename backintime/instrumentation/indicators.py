@@ -0,0 +1,87 @@
+import typing as t
+from dataclasses import dataclass
+from .base import Instrument
+
+
+@dataclass
+class IndicatorStats:
+    """
+    Number of calculations of an indicator, total number
+    of input values they took and total time in nanoseconds.
+    """
+    calls: int = 0
+    values: int = 0
+    total_ns: int = 0
+
+    @property
+    def mean_values(self) -> float:
+        """Average input window length."""
+        return self.values / self.calls if self.calls else 0.0
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+
+IndicatorKey = t.Tuple[str, t.Tuple]
+
+
+class IndicatorsReport:
+    """
+    Stats of indicator calculations by indicator name 
+    and call arguments (timeframe first).
+    """
+    def __init__(self, indicators: t.Dict[IndicatorKey, IndicatorStats]):
+        self._indicators = indicators
+
+    @property
+    def indicators(self) -> t.Dict[IndicatorKey, IndicatorStats]:
+        return dict(self._indicators)
+
+    def get(self, indicator: str, *args) -> IndicatorStats:
+        """Get stats of `indicator` calculated with `args`."""
+        return self._indicators.get((indicator, args), IndicatorStats())
+
+    def __repr__(self) -> str:
+        lines = [ f"{'indicator':<40}{'calls':>10}{'mean values':>14}"
+                  f"{'total, s':>12}{'mean, us':>12}" ]
+        ordered = sorted(self._indicators.items(), 
+                         key=lambda item: item[1].total_ns, reverse=True)
+        for (name, args), stats in ordered:
+            title = f"{name}({', '.join(map(str, args))})"
+            lines.append(f"{title:<40}{stats.calls:>10}"
+                         f"{stats.mean_values:>14.1f}"
+                         f"{stats.total_ns/1e9:>12.3f}"
+                         f"{stats.mean_ns/1000:>12.2f}")
+        return '\n'.join(lines)
+
+
+class AnalyserStats(Instrument):
+    """
+    Counts calculations of each indicator with the same 
+    arguments, their input window length and time.
+    Stats are available via `report` during the run as well,
+    e.g. from strategy.
+    """
+    name = 'indicators'
+    uses_analyser = True
+
+    def __init__(self):
+        self._indicators: t.Dict[IndicatorKey, IndicatorStats] = {}
+
+    def on_indicator(self, 
+                     indicator: str, 
+                     args: t.Tuple, 
+                     values: int,
+                     start: int, 
+                     end: int) -> None:
+        key = (indicator, args)
+        stats = self._indicators.get(key)
+        if stats is None:
+            stats = self._indicators[key] = IndicatorStats()
+        stats.calls += 1
+        stats.values += values
+        stats.total_ns += end - start
+
+    def report(self) -> IndicatorsReport:
+        return IndicatorsReport(self._indicators)
@@ -0,0 +1,172 @@
+import heapq
+import logging
+import typing as t
+from dataclasses import dataclass
+from datetime import datetime
+from .base import Instrument, Phase
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies in nanoseconds.
+    Values are counted in log-linear buckets, so that relative
+    error doesn't exceed 1/2**`precision_bits` at any scale,
+    while memory is bounded by the number of binary orders.
+    """
+    def __init__(self, precision_bits: int = 7):
+        self._precision_bits = precision_bits
+        self._sub_buckets = 1 << precision_bits
+        self._counts: t.List[int] = []
+        self._count = 0
+        self._total = 0
+        self._min: t.Optional[int] = None
+        self._max: t.Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        shift = max(0, value.bit_length() - self._precision_bits - 1)
+        return shift*self._sub_buckets + (value >> shift)
+
+    def _highest_value(self, index: int) -> int:
+        """Get the highest value counted in bucket `index`."""
+        shift = max(0, index // self._sub_buckets - 1)
+        mantissa = index - shift*self._sub_buckets
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        value = max(0, value)
+        index = self._index(value)
+        if index >= len(self._counts):
+            self._counts.extend([0]*(index + 1 - len(self._counts)))
+        self._counts[index] += 1
+        self._count += 1
+        self._total += value
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def min(self) -> int:
+        return self._min or 0
+
+    @property
+    def max(self) -> int:
+        return self._max or 0
+
+    @property
+    def mean(self) -> float:
+        return self._total / self._count if self._count else 0.0
+
+    def percentile(self, percent: float) -> int:
+        """Get value that `percent` of recorded values don't exceed."""
+        if not self._count:
+            return 0
+        rank = max(1, round(self._count*percent/100))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+    @property
+    def p50(self) -> int:
+        return self.percentile(50)
+
+    @property
+    def p99(self) -> int:
+        return self.percentile(99)
+
+    @property
+    def p999(self) -> int:
+        return self.percentile(99.9)
+
+    def __repr__(self) -> str:
+        us = lambda value: f"{value/1000:.2f}us"
+        return (f"count={self.count} mean={us(self.mean)} "
+                f"p50={us(self.p50)} p99={us(self.p99)} "
+                f"p999={us(self.p999)} max={us(self.max)}")
+
+
+@dataclass
+class SlowCandle:
+    """Candle whose processing took `duration` nanoseconds."""
+    open_time: datetime
+    close_time: datetime
+    duration: int
+
+
+@dataclass
+class LatencyReport:
+    """
+    Latency of `strategy.tick` calls and of the whole
+    processing of each candle, and the slowest candles.
+    """
+    tick: LatencyHistogram
+    candle: LatencyHistogram
+    slowest: t.List[SlowCandle]
+
+    def __repr__(self) -> str:
+        slowest = '\n'.join(f"  {candle.open_time}: "
+                            f"{candle.duration/1000:.2f}us"
+                                for candle in self.slowest)
+        return (f"tick:   {self.tick}\n"
+                f"candle: {self.candle}\n"
+                f"slowest candles:\n{slowest}")
+
+
+class LatencyMonitor(Instrument):
+    """
+    Collects latency histograms of `strategy.tick` and of
+    the whole processing of each candle, including getting it
+    from data provider. Keeps `slowest` candles, which
+    are logged when the run is finished.
+    """
+    name = 'latency'
+
+    def __init__(self, slowest: int = 10, precision_bits: int = 7):
+        self.slowest = slowest
+        self._tick = LatencyHistogram(precision_bits)
+        self._candle = LatencyHistogram(precision_bits)
+        self._slowest: t.List[t.Tuple[int, int, SlowCandle]] = []
+        self._data_duration = 0
+
+    def on_phase(self, phase: Phase, start: int, end: int) -> None:
+        if phase is Phase.TICK:
+            self._tick.record(end - start)
+        elif phase is Phase.DATA:
+            self._data_duration = end - start
+
+    def on_candle(self, candle, start: int, end: int) -> None:
+        duration = end - start + self._data_duration
+        self._data_duration = 0
+        self._candle.record(duration)
+        if not self.slowest:
+            return
+        # Min-heap of the slowest candles, count breaks ties
+        if len(self._slowest) < self.slowest:
+            item = (duration, self._candle.count,
+                    SlowCandle(candle.open_time, candle.close_time, duration))
+            heapq.heappush(self._slowest, item)
+        elif duration > self._slowest[0][0]:
+            item = (duration, self._candle.count,
+                    SlowCandle(candle.open_time, candle.close_time, duration))
+            heapq.heapreplace(self._slowest, item)
+
+    def _get_slowest(self) -> t.List[SlowCandle]:
+        return [ item[2] for item in sorted(self._slowest, reverse=True) ]
+
+    def on_finish(self) -> None:
+        logger = logging.getLogger("backintime")
+        logger.info(f"Tick latency: {self._tick}")
+        logger.info(f"Candle latency: {self._candle}")
+        for candle in self._get_slowest():
+            logger.info(f"Slow candle {candle.open_time} - "
+                        f"{candle.close_time}: {candle.duration/1000:.2f}us")
+
+    def report(self) -> LatencyReport:
+        return LatencyReport(self._tick, self._candle, self._get_slowest())
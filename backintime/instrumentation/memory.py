@@ -0,0 +1,213 @@
+import sys
+import numpy
+import logging
+import tracemalloc
+import typing as t
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import FunctionType, ModuleType
+from .base import Instrument, RunContext
+
+
+def estimate_size(obj: t.Any, seen: t.Optional[t.Set[int]] = None) -> int:
+    """
+    Estimate size of `obj` and everything it references, in bytes.
+    Objects referenced more than once are counted once.
+    NumPy views are counted as their base arrays.
+    """
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, numpy.ndarray):
+            while isinstance(obj.base, numpy.ndarray):
+                obj = obj.base
+        if id(obj) in seen or \
+                isinstance(obj, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(obj))
+        # Includes data of arrays that own it
+        size += sys.getsizeof(obj)
+        if isinstance(obj, numpy.ndarray):
+            continue
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        else:
+            attrs = getattr(obj, '__dict__', None)
+            if attrs is not None:
+                stack.append(attrs)
+            for cls in type(obj).__mro__:
+                for name in getattr(cls, '__slots__', ()):
+                    if hasattr(obj, name):
+                        stack.append(getattr(obj, name))
+    return size
+
+
+def _get_analyser_series(buffer) -> t.Dict[str, t.Any]:
+    """Get series of analyser buffer by timeframe and property."""
+    series = {}
+    resampled = getattr(buffer, '_resampled', None)
+    if resampled is not None:
+        # Resampled buffer keeps whole timeframes
+        for timeframe, candles in resampled.items():
+            series[f"analyser:{timeframe}"] = candles
+        return series
+    for timeframe, tf_data in getattr(buffer, '_data', {}).items():
+        for candle_property, values in tf_data.items():
+            if not isinstance(candle_property, str):
+                name = f"analyser:{timeframe}:{candle_property.value}"
+                series[name] = values
+    return series
+
+
+@dataclass
+class MemorySample:
+    """
+    Memory usage after `candles` were processed.
+        - `components` - estimated size of each component, in bytes.
+        - `traced`, `traced_peak` - memory allocated by Python,
+            as traced by `tracemalloc`, if enabled.
+        - `top` - files with the largest allocations, if enabled.
+    """
+    candles: int
+    time: t.Optional[datetime]
+    components: t.Dict[str, int]
+    traced: t.Optional[int] = None
+    traced_peak: t.Optional[int] = None
+    top: t.List[t.Tuple[str, int]] = field(default_factory=list)
+
+
+@dataclass
+class MemoryReport:
+    """Memory samples and warnings about components that grow."""
+    samples: t.List[MemorySample]
+    warnings: t.List[str]
+
+    def __repr__(self) -> str:
+        if not self.samples:
+            return "No memory samples"
+        last = self.samples[-1]
+        lines = [ f"after {last.candles} candles:" ]
+        for name, size in sorted(last.components.items(),
+                                 key=lambda item: item[1], reverse=True):
+            lines.append(f"  {name:<32}{size/1024**2:>10.2f} MiB")
+        if last.traced is not None:
+            lines.append(f"  {'traced (peak)':<32}"
+                         f"{last.traced/1024**2:>10.2f} MiB "
+                         f"({last.traced_peak/1024**2:.2f} MiB)")
+        lines.extend(self.warnings)
+        return '\n'.join(lines)
+
+
+class MemoryMonitor(Instrument):
+    """
+    Samples memory usage each `every` candles and when the run
+    is finished. Size of each component - analyser buffer series,
+    candles buffer, orders, trades and data provider - is estimated
+    by traversing its objects. If `trace` is True, memory allocated
+    by Python is also traced with `tracemalloc`, which slows down
+    the run considerably, and `top` files with the largest
+    allocations are reported.
+
+    If a component grows in each of the last `window` samples by
+    `min_growth` bytes in total or more, a warning is logged,
+    since it may grow unboundedly.
+    """
+    name = 'memory'
+
+    def __init__(self,
+                 every: int = 10_000,
+                 trace: bool = False,
+                 top: int = 10,
+                 window: int = 5,
+                 min_growth: int = 1024**2):
+        self.every = every
+        self.trace = trace
+        self.top = top
+        self.window = window
+        self.min_growth = min_growth
+        self._context: t.Optional[RunContext] = None
+        self._samples: t.List[MemorySample] = []
+        self._warnings: t.List[str] = []
+        self._warned: t.Set[str] = set()
+        self._candles = 0
+        self._time: t.Optional[datetime] = None
+        self._started_tracing = False
+
+    def _get_components(self) -> t.Dict[str, t.Any]:
+        context = self._context
+        broker = context.broker
+        components = _get_analyser_series(context.analyser_buffer)
+        components.update({
+            'candles_buffer': context.candles_buffer,
+            'orders': getattr(broker, '_orders', None),
+            'trades': getattr(broker, '_trades', None),
+            'data_provider': context.market_data
+        })
+        return components
+
+    def sample(self) -> MemorySample:
+        """Take memory sample now."""
+        components = {
+            name: estimate_size(component)
+                for name, component in self._get_components().items()
+        }
+        sample = MemorySample(self._candles, self._time, components)
+        if tracemalloc.is_tracing():
+            sample.traced, sample.traced_peak = \
+                tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+            ))
+            sample.top = [
+                (str(stat.traceback), stat.size)
+                    for stat in snapshot.statistics('filename')[:self.top]
+            ]
+        self._samples.append(sample)
+        self._check_growth()
+        return sample
+
+    def _check_growth(self) -> None:
+        samples = self._samples[-self.window:]
+        if len(samples) < self.window:
+            return
+        for name in samples[-1].components:
+            sizes = [ sample.components.get(name, 0) for sample in samples ]
+            grows = all(x < y for x, y in zip(sizes, sizes[1:]))
+            if grows and sizes[-1] - sizes[0] >= self.min_growth and \
+                    not name in self._warned:
+                message = (f"Memory of {name} has grown in each of the "
+                           f"last {self.window} samples, from {sizes[0]} "
+                           f"to {sizes[-1]} bytes; it may be unbounded")
+                self._warned.add(name)
+                self._warnings.append(message)
+                logging.getLogger("backintime").warning(message)
+
+    def on_start(self, context: RunContext) -> None:
+        self._context = context
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.sample()
+
+    def on_candle(self, candle, start: int, end: int) -> None:
+        self._candles += 1
+        self._time = candle.close_time
+        if self._candles % self.every == 0:
+            self.sample()
+
+    def on_finish(self) -> None:
+        if self._samples[-1].candles != self._candles:
+            self.sample()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self) -> MemoryReport:
+        return MemoryReport(list(self._samples), list(self._warnings))
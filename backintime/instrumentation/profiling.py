@@ -0,0 +1,69 @@
+import typing as t
+from dataclasses import dataclass
+from .base import Instrument, Phase
+
+
+@dataclass
+class PhaseStats:
+    """Number of calls and total time of a phase, in nanoseconds."""
+    calls: int = 0
+    total_ns: int = 0
+
+    @property
+    def total_seconds(self) -> float:
+        return self.total_ns / 1e9
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+
+class ProfileReport:
+    """Cumulative time and number of calls per phase."""
+    def __init__(self, phases: t.Dict[Phase, PhaseStats]):
+        self._phases = phases
+
+    @property
+    def phases(self) -> t.Dict[Phase, PhaseStats]:
+        return dict(self._phases)
+
+    @property
+    def total_ns(self) -> int:
+        """Total time of all phases."""
+        return sum(stats.total_ns for stats in self._phases.values())
+
+    def __getitem__(self, phase: Phase) -> PhaseStats:
+        return self._phases.get(phase, PhaseStats())
+
+    def __repr__(self) -> str:
+        total = self.total_ns or 1
+        lines = [ f"{'phase':<10}{'calls':>12}{'total, s':>12}"
+                  f"{'mean, us':>12}{'share':>8}" ]
+        for phase, stats in self._phases.items():
+            lines.append(f"{str(phase):<10}{stats.calls:>12}"
+                         f"{stats.total_seconds:>12.3f}"
+                         f"{stats.mean_ns/1000:>12.2f}"
+                         f"{stats.total_ns/total:>8.1%}")
+        return '\n'.join(lines)
+
+
+class PhaseProfiler(Instrument):
+    """
+    Accumulates time and number of calls per phase of
+    candle processing: data provider, broker, buffers and ticks.
+    """
+    name = 'profile'
+
+    def __init__(self):
+        self._phases = { phase: PhaseStats() for phase in Phase }
+
+    def on_phase(self, phase: Phase, start: int, end: int) -> None:
+        stats = self._phases[phase]
+        stats.calls += 1
+        stats.total_ns += end - start
+
+    def report(self) -> ProfileReport:
+        return ProfileReport({
+            phase: stats for phase, stats in self._phases.items()
+                if stats.calls
+        })
@@ -0,0 +1,106 @@
+import logging
+import typing as t
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from time import perf_counter_ns
+from .base import Instrument, RunContext
+
+
+@dataclass
+class Progress:
+    """
+    Progress of a run.
+        - `time` - close time of the last processed candle.
+        - `candles` - number of processed candles. Candles
+            skipped in bulk while strategy sleeps aren't counted.
+        - `fraction` - part of (since, until) range processed.
+        - `eta` - estimated time left, None if unknown yet.
+    """
+    time: datetime
+    candles: int
+    candles_per_second: float
+    elapsed: timedelta
+    fraction: float
+    eta: t.Optional[timedelta]
+    equity: Decimal
+
+
+def log_progress(progress: Progress) -> None:
+    """Log progress with `backintime` logger."""
+    eta = str(progress.eta).split('.')[0] if progress.eta else 'unknown'
+    logging.getLogger("backintime").info(
+        f"{progress.time}: {progress.fraction:.1%}, "
+        f"{progress.candles} candles, "
+        f"{progress.candles_per_second:.0f} candles/s, ETA {eta}, "
+        f"equity {progress.equity}")
+
+
+class ProgressMonitor(Instrument):
+    """
+    Calls `callback` with progress of the run each `every` candles,
+    if set, or each `interval` seconds, and when it's finished.
+    Besides being an instrument, it can be updated directly with
+    `update`, as `run_backtest` does for `on_progress`.
+    """
+    name = 'progress'
+
+    def __init__(self,
+                 callback: t.Callable[[Progress], None] = log_progress,
+                 every: t.Optional[int] = None,
+                 interval: t.Optional[float] = 60.0):
+        self.callback = callback
+        self.every = every
+        self.interval = interval
+        self._interval_ns = int(interval*1e9) if interval else None
+        self._context: t.Optional[RunContext] = None
+        self._candles = 0
+        self._time: t.Optional[datetime] = None
+        self._start = 0
+        self._last = 0
+        self._last_progress: t.Optional[Progress] = None
+
+    def on_start(self, context: RunContext) -> None:
+        self._context = context
+        self._start = self._last = perf_counter_ns()
+
+    def on_candle(self, candle, start: int, end: int) -> None:
+        self._candles += 1
+        self._time = candle.close_time
+        if (self.every and self._candles % self.every == 0) or \
+                (self._interval_ns and end - self._last >= self._interval_ns):
+            self._notify(end)
+
+    def update(self, candle) -> None:
+        """Count processed `candle`."""
+        self.on_candle(candle, 0, perf_counter_ns())
+
+    def on_finish(self) -> None:
+        if self._time is not None:
+            self._notify(perf_counter_ns())
+
+    def _get_progress(self, now: int) -> Progress:
+        context = self._context
+        elapsed = (now - self._start)/1e9
+        total = (context.until - context.since).total_seconds()
+        done = (self._time - context.since).total_seconds()
+        fraction = min(1.0, max(0.0, done/total)) if total > 0 else 1.0
+        eta = timedelta(seconds=elapsed*(1 - fraction)/fraction) \
+                if fraction > 0 else None
+        return Progress(time=self._time,
+                        candles=self._candles,
+                        candles_per_second=self._candles/elapsed
+                                                if elapsed else 0.0,
+                        elapsed=timedelta(seconds=elapsed),
+                        fraction=fraction,
+                        eta=eta,
+                        equity=context.broker.current_equity)
+
+    def _notify(self, now: int) -> None:
+        self._last = now
+        self._last_progress = self._get_progress(now)
+        self.callback(self._last_progress)
+
+    def report(self) -> t.Optional[Progress]:
+        """Get the last reported progress."""
+        return self._last_progress
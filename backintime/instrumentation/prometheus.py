@@ -0,0 +1,289 @@
+"""
+Metrics of backtesting runs in Prometheus text format.
+
+`PrometheusMonitor` feeds metrics of runs to a `MetricsRegistry`,
+which is shared by all runs of the process by default. Metrics can
+be exposed with `MetricsServer` on a local HTTP endpoint, or written
+to a file for the textfile collector of node exporter with
+`write_textfile`.
+"""
+import os
+import sys
+import threading
+import typing as t
+from itertools import count
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter_ns
+from backintime.broker.base import BrokerException
+from backintime.data.data_provider import DataProviderError
+from .base import Instrument, Phase, RunContext
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = t.Tuple[t.Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"') \
+                .replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return f'{{{pairs}}}'
+
+
+class _Metric:
+    def __init__(self, name: str, kind: str, description: str):
+        self.name = name
+        self.kind = kind
+        self.description = description
+        self.values: t.Dict[Labels, float] = {}
+
+
+class MetricsRegistry:
+    """Thread-safe collection of counters and gauges."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: t.Dict[str, _Metric] = {}
+
+    def _get(self, name: str, kind: str, description: str) -> _Metric:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = _Metric(name, kind, description)
+        return metric
+
+    def inc(self,
+            name: str,
+            description: str,
+            value: float = 1,
+            **labels: str) -> None:
+        """Increase counter `name` with `labels` by `value`."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            values = self._get(name, 'counter', description).values
+            values[key] = values.get(key, 0) + value
+
+    def set(self,
+            name: str,
+            description: str,
+            value: float,
+            **labels: str) -> None:
+        """Set gauge `name` with `labels` to `value`."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._get(name, 'gauge', description).values[key] = value
+
+    def remove(self, name: str, **labels: str) -> None:
+        """Remove series of metric `name` with `labels`, if any."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric:
+                metric.values.pop(key, None)
+
+    def get(self, name: str, **labels: str) -> t.Optional[float]:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            metric = self._metrics.get(name)
+            return metric.values.get(key) if metric else None
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format."""
+        lines = []
+        with self._lock:
+            for metric in self._metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.description}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                for labels, value in metric.values.items():
+                    lines.append(f"{metric.name}{_format_labels(labels)} "
+                                 f"{float(value)!r}")
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by all monitors and servers unless a dedicated one is passed
+_default_registry = MetricsRegistry()
+# Runs of the same strategy may go concurrently in one process
+_run_ids = count(1)
+
+
+def get_default_registry() -> MetricsRegistry:
+    return _default_registry
+
+
+def write_textfile(path: str,
+                   registry: t.Optional[MetricsRegistry] = None) -> None:
+    """
+    Write metrics to `path` atomically, as expected by
+    the textfile collector of node exporter.
+    """
+    registry = registry or _default_registry
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as file:
+        file.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+class MetricsServer:
+    """
+    Serves metrics of `registry` over HTTP on `host`:`port`,
+    from a daemon thread. Port 0 means any free port.
+    """
+    def __init__(self,
+                 port: int = 9464,
+                 host: str = '127.0.0.1',
+                 registry: t.Optional[MetricsRegistry] = None):
+        registry = registry or _default_registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: t.Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> 'MetricsServer':
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def _get_rss() -> int:
+    """Get resident set size of the current process in bytes."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1])*os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:     # Not available on Windows
+        return 0
+    # Peak RSS, reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak*1024
+
+
+class PrometheusMonitor(Instrument):
+    """
+    Feeds metrics of the run to `registry`: candles processed,
+    runs completed, stopped by broker or data provider errors
+    (which `run_backtest` doesn't raise) and failed, seconds 
+    per phase, open orders and RSS of the worker process. 
+    Metrics are accumulated locally and flushed each `interval` 
+    seconds and when the run is finished, then also written to 
+    `textfile`, if given. The monitor can be reused for several runs.
+    Open orders are labelled with `run` as well, which is unique 
+    within the process (see `run_id`), so that concurrent runs of 
+    the same strategy don't overwrite each other. The series is 
+    removed when the run is finished.
+    """
+    name = 'prometheus'
+    uses_broker = True
+
+    def __init__(self,
+                 registry: t.Optional[MetricsRegistry] = None,
+                 textfile: t.Optional[str] = None,
+                 interval: float = 5.0):
+        self.registry = registry or _default_registry
+        self.textfile = textfile
+        self.interval = interval
+        self._interval_ns = int(interval*1e9)
+        self._context: t.Optional[RunContext] = None
+        self._strategy = ''
+        self._run_id = ''
+        self._candles = 0
+        self._phases: t.Dict[Phase, int] = { phase: 0 for phase in Phase }
+        self._last = 0
+        self._finished = False
+
+    def on_start(self, context: RunContext) -> None:
+        self._context = context
+        self._strategy = context.strategy.get_title()
+        self._run_id = f"{os.getpid()}-{next(_run_ids)}"
+        self._candles = 0
+        self._phases = { phase: 0 for phase in Phase }
+        self._last = perf_counter_ns()
+        self._finished = False
+        self.registry.inc('backintime_runs_started_total',
+                          'Backtesting runs started.',
+                          strategy=self._strategy)
+        self._flush()
+
+    @property
+    def run_id(self) -> str:
+        """Identifier of the current run, used as `run` label."""
+        return self._run_id
+
+    def on_phase(self, phase: Phase, start: int, end: int) -> None:
+        self._phases[phase] += end - start
+
+    def on_candle(self, candle, start: int, end: int) -> None:
+        self._candles += 1
+        if end - self._last >= self._interval_ns:
+            self._last = end
+            self._flush()
+
+    def _flush(self) -> None:
+        registry, strategy = self.registry, self._strategy
+        registry.inc('backintime_candles_processed_total',
+                     'Candles processed.',
+                     self._candles, strategy=strategy)
+        self._candles = 0
+        for phase, elapsed in self._phases.items():
+            registry.inc('backintime_phase_seconds_total',
+                         'Time spent in each phase of candle processing.',
+                         elapsed/1e9, strategy=strategy, phase=str(phase))
+            self._phases[phase] = 0
+        open_orders = getattr(self._context.broker, 'open_orders', None)
+        if self._finished:
+            # Open orders of a finished run are no longer relevant
+            registry.remove('backintime_open_orders', 
+                            strategy=strategy, run=self._run_id)
+        elif open_orders is not None:
+            registry.set('backintime_open_orders', 'Open orders.',
+                         open_orders, strategy=strategy, run=self._run_id)
+        registry.set('backintime_worker_resident_memory_bytes',
+                     'Resident set size of the worker process.',
+                     _get_rss(), worker=str(os.getpid()))
+        if self.textfile:
+            write_textfile(self.textfile, registry)
+
+    def _finish(self, status: str) -> None:
+        self._finished = True
+        self.registry.inc('backintime_runs_total',
+                          'Backtesting runs finished, by status.',
+                          strategy=self._strategy, status=status)
+        self._flush()
+
+    def on_error(self, error: Exception) -> None:
+        if isinstance(error, (BrokerException, DataProviderError)):
+            self._finish('stopped')
+        else:
+            self._finish('failed')
+
+    def on_finish(self) -> None:
+        if not self._finished:
+            self._finish('completed')
@@ -0,0 +1,135 @@
+import json
+import typing as t
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter_ns
+from .base import Instrument, Phase, RunContext
+
+
+@dataclass
+class TraceReport:
+    """Where the trace was saved and how many events it has."""
+    path: t.Optional[str]
+    events: int
+    dropped: int
+
+
+class ChromeTracer(Instrument):
+    """
+    Records spans of a run in Chrome Trace Event format,
+    which can be opened in Perfetto or `chrome://tracing`.
+
+    Only every `sample_every`-th candle is recorded, along with
+    its phases and indicator calculations, so that the size of
+    trace is bounded on long runs. Prefetching, skipping and
+    spans opened with `span` are always recorded. No more than
+    `max_events` events are kept, the rest are dropped.
+    The trace is saved to `path` when the run is finished,
+    if `path` is given, or can be saved with `save` at any time.
+    """
+    name = 'trace'
+    uses_analyser = True
+
+    def __init__(self,
+                 path: t.Optional[str] = None,
+                 sample_every: int = 1,
+                 max_events: t.Optional[int] = 1_000_000):
+        self.path = path
+        self.sample_every = sample_every
+        self.max_events = max_events
+        self._events: t.List[dict] = []
+        self._metadata: t.List[dict] = []
+        self._dropped = 0
+        self._candles = 0
+        self._origin = perf_counter_ns()
+
+    @property
+    def events(self) -> t.List[dict]:
+        return self._metadata + self._events
+
+    def _add(self,
+             name: str,
+             category: str,
+             start: int,
+             end: int,
+             args: t.Optional[dict] = None) -> None:
+        if self.max_events is not None and \
+                len(self._events) >= self.max_events:
+            self._dropped += 1
+            return
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - self._origin)/1000,  # In microseconds
+            'dur': (end - start)/1000,
+            'pid': 1,
+            'tid': 1
+        }
+        if args:
+            event['args'] = args
+        self._events.append(event)
+
+    def _is_sampled(self) -> bool:
+        return self._candles % self.sample_every == 0
+
+    @contextmanager
+    def span(self, name: str, **args) -> t.Iterator[None]:
+        """
+        Record a span around the block, e.g. result export:
+            with tracer.span('export'):
+                result.export()
+        """
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._add(name, 'user', start, perf_counter_ns(), args)
+
+    def on_start(self, context: RunContext) -> None:
+        title = context.strategy.get_title()
+        self._metadata = [
+            { 'name': 'process_name', 'ph': 'M', 'pid': 1,
+              'args': { 'name': f"backintime: {title}" } },
+            { 'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 1,
+              'args': { 'name': 'backtesting' } }
+        ]
+
+    def on_phase(self, phase: Phase, start: int, end: int) -> None:
+        if phase is Phase.PREFETCH or phase is Phase.SKIP or \
+                self._is_sampled():
+            self._add(str(phase), 'phase', start, end)
+
+    def on_indicator(self,
+                     indicator: str,
+                     args: t.Tuple,
+                     values: int,
+                     start: int,
+                     end: int) -> None:
+        if self._is_sampled():
+            params = { 'params': [ str(arg) for arg in args ], 
+                       'values': values }
+            self._add(indicator, 'indicator', start, end, params)
+
+    def on_candle(self, candle, start: int, end: int) -> None:
+        if self._is_sampled():
+            args = { 'open_time': str(candle.open_time) }
+            self._add('candle', 'candle', start, end, args)
+        self._candles += 1
+
+    def on_finish(self) -> None:
+        if self.path:
+            self.save(self.path)
+
+    def save(self, path: str) -> None:
+        """Save the trace to JSON file."""
+        trace = {
+            'traceEvents': self.events,
+            'displayTimeUnit': 'ms',
+            'otherData': { 'dropped_events': self._dropped }
+        }
+        with open(path, 'w') as file:
+            json.dump(trace, file)
+
+    def report(self) -> TraceReport:
+        return TraceReport(self.path, len(self._events), self._dropped)
@@ -0,0 +1,128 @@
+"""
+Vectorized resampling of base candles to higher timeframes.
+
+When all candles are available up front, every required timeframe
+is built in one pass with NumPy instead of aggregating candles
+one at a time. Bars are aligned to multiples of timeframe
+since the epoch, as in `estimate_open_time`, but open time of
+a bar is that of its first candle, as in `CandlesBuffer`.
+Volumes are summed exactly, as integer multiples of the least
+decimal unit of source values, whenever they fit float precision.
+"""
+import numpy
+import typing as t
+from dataclasses import dataclass
+from backintime.timeframes import Timeframes, get_millis_duration
+from backintime.data.columns import CandleColumns
+
+
+# Decimal places of values that are summed exactly
+_MAX_DECIMAL_PLACES = 15
+# Integers up to this value are represented exactly as float64
+_MAX_EXACT_INTEGER = 2**53
+
+@dataclass
+class ResampledCandles:
+    """
+    Candles of `timeframe` built from base candles.
+        - `bars` - final state of each bar.
+        - `partial` - for each base candle, state of its bar
+            right after the base candle was closed.
+        - `bar_index` - for each base candle, index of its bar.
+        - `is_closed` - for each base candle, whether its bar
+            closes along with it.
+    """
+    timeframe: Timeframes
+    bars: CandleColumns
+    partial: CandleColumns
+    bar_index: numpy.ndarray
+    is_closed: numpy.ndarray
+
+
+def _accumulate(ufunc: numpy.ufunc,
+                values: numpy.ndarray,
+                bar_index: numpy.ndarray,
+                position: numpy.ndarray,
+                shape: t.Tuple[int, int],
+                fill: float) -> numpy.ndarray:
+    """
+    Accumulate `values` with `ufunc` within each bar.
+    Values are laid out in a grid, one row per bar,
+    so that all bars are accumulated at once.
+    """
+    grid = numpy.full(shape, fill)
+    grid[bar_index, position] = values
+    ufunc.accumulate(grid, axis=1, out=grid)
+    return grid[bar_index, position]
+
+
+def _to_units(values: numpy.ndarray) -> t.Tuple[numpy.ndarray, float]:
+    """
+    Get `values` as integer multiples of their least decimal unit 
+    and the number of units in 1, so that any sums of them are exact. 
+    If there is no such unit within float precision, 
+    `values` are returned as is.
+    """
+    if not len(values) or not numpy.isfinite(values).all():
+        return values, 1.0
+    limit = float(numpy.abs(values).max())*len(values)
+    for places in range(_MAX_DECIMAL_PLACES + 1):
+        scale = 10.0**places
+        if limit*scale >= _MAX_EXACT_INTEGER:
+            break
+        units = numpy.round(values*scale)
+        if numpy.array_equal(units/scale, values):
+            return units, scale
+    return values, 1.0
+
+
+def resample(columns: CandleColumns,
+             timeframe: Timeframes) -> ResampledCandles:
+    """
+    Build candles of `timeframe` from `columns` of shorter one,
+    which must be in historical order.
+    """
+    if not len(columns):
+        empty = numpy.empty(0, dtype=numpy.int64)
+        return ResampledCandles(timeframe, CandleColumns.empty(),
+                                CandleColumns.empty(), empty,
+                                numpy.empty(0, dtype=bool))
+
+    timeframe_ms = timeframe.value*1000
+    bar_ids = columns.open_time // timeframe_ms
+    is_first = numpy.empty(len(columns), dtype=bool)
+    is_first[0] = True
+    numpy.not_equal(bar_ids[1:], bar_ids[:-1], out=is_first[1:])
+    starts = numpy.flatnonzero(is_first)
+    ends = numpy.append(starts[1:], len(columns))
+
+    bar_index = numpy.cumsum(is_first) - 1
+    position = numpy.arange(len(columns)) - starts[bar_index]
+    shape = (len(starts), int((ends - starts).max()))
+
+    open_time = columns.open_time[starts]
+    close_time = bar_ids[starts]*timeframe_ms + get_millis_duration(timeframe)
+    # Division of exact sums is rounded as conversion from `Decimal`
+    volume, scale = _to_units(columns.volume)
+    bars = CandleColumns(
+                open_time=open_time,
+                close_time=close_time,
+                open=columns.open[starts],
+                high=numpy.maximum.reduceat(columns.high, starts),
+                low=numpy.minimum.reduceat(columns.low, starts),
+                close=columns.close[ends - 1],
+                volume=numpy.add.reduceat(volume, starts)/scale)
+
+    accumulate = lambda ufunc, values, fill: \
+                    _accumulate(ufunc, values, bar_index,
+                                position, shape, fill)
+    partial = CandleColumns(
+                open_time=open_time[bar_index],
+                close_time=close_time[bar_index],
+                open=bars.open[bar_index],
+                high=accumulate(numpy.maximum, columns.high, -numpy.inf),
+                low=accumulate(numpy.minimum, columns.low, numpy.inf),
+                close=columns.close,
+                volume=accumulate(numpy.add, volume, 0.0)/scale)
+    is_closed = columns.close_time == partial.close_time
+    return ResampledCandles(timeframe, bars, partial, bar_index, is_closed)
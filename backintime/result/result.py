@@ -153,7 +153,8 @@ class BacktestingResult:
                  result_balance: Decimal,
                  result_equity: Decimal,
                  trades: t.Sequence[TradeInfo],
-                 orders: t.Sequence[OrderInfo]):
+                 orders: t.Sequence[OrderInfo],
+                 reports: t.Optional[t.Dict[str, t.Any]] = None):
         self._data_provider = data_provider
         self._data_title = data_provider.title
         self._data_timeframe = data_provider.timeframe
@@ -171,6 +172,7 @@ class BacktestingResult:
         self._orders = orders
         self._trades_count = len(trades)
         self._orders_count = len(orders)
+        self._reports = reports or {}
         self._date = datetime.now()
 
     @property
@@ -209,6 +211,11 @@ class BacktestingResult:
     def orders_count(self) -> int:
         return self._orders_count
 
+    @property
+    def reports(self) -> t.Dict[str, t.Any]:
+        """Reports of instruments passed to `run_backtest`, by names."""
+        return self._reports
+
     def get_stats(self, algorithm: str) -> BacktestingStats:
         """
         Get stats such as Win Rate, Profit/Loss, Average Profit, etc.
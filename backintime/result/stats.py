@@ -8,6 +8,8 @@ from backintime.broker.base import TradeInfo as Trade
 
 @dataclass
 class TradeProfit:
+    __slots__ = ('trade_id', 'order_id', 'relative_profit', 'absolute_profit')
+
     trade_id: int
     order_id: int
     relative_profit: Decimal
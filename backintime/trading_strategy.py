@@ -1,8 +1,11 @@
+import numpy
 import typing as t
 
 from abc import ABC, abstractmethod
+from datetime import datetime
 from decimal import Decimal
 from .candles import Candles
+from .data.columns import CandleColumns, to_millis
 from .timeframes import Timeframes
 from .analyser.analyser import Analyser
 from .analyser.indicators.base import IndicatorParam
@@ -18,6 +21,51 @@ from .broker.base import (
 )
 
 
+class WakeCondition:
+    """
+    Condition to resume ticks of a sleeping strategy. 
+    Met on the first candle whose high reaches `price_above`,
+    low reaches `price_below` or close time reaches `time`.
+    """
+    __slots__ = ('price_above', 'price_below', 'time')
+
+    def __init__(self,
+                 price_above: t.Optional[Decimal] = None,
+                 price_below: t.Optional[Decimal] = None,
+                 time: t.Optional[datetime] = None):
+        self.price_above = price_above
+        self.price_below = price_below
+        self.time = time
+
+    def is_met(self, candle) -> bool:
+        """Whether the condition is met on `candle`."""
+        return (self.price_above is not None and \
+                    candle.high >= self.price_above) or \
+               (self.price_below is not None and \
+                    candle.low <= self.price_below) or \
+               (self.time is not None and candle.close_time >= self.time)
+
+    def find(self, columns: CandleColumns, start: int = 0) -> int:
+        """
+        Get index of the first candle of `columns` since `start`
+        on which the condition is met, or `len(columns)` if none.
+        """
+        columns = columns.slice(start, len(columns))
+        is_met = numpy.zeros(len(columns), dtype=bool)
+        if self.price_above is not None:
+            is_met |= columns.high >= float(self.price_above)
+        if self.price_below is not None:
+            is_met |= columns.low <= float(self.price_below)
+        if self.time is not None:
+            is_met |= columns.close_time >= to_millis(self.time)
+        return start + int(is_met.argmax()) if is_met.any() \
+                    else start + len(columns)
+
+    def __repr__(self) -> str:
+        return (f"WakeCondition(price_above={self.price_above}, "
+                f"price_below={self.price_below}, time={self.time})")
+
+
 class TradingStrategy(ABC):
     """
     Base class for trading strategies. 
@@ -40,14 +88,29 @@ class TradingStrategy(ABC):
             This is useful to infer how many market data is needed to store 
             to be able to calculate indicators at any time.
         - `candle_timeframes` - Set of timeframes whose candles may be
-            requested during strategy run.
+            requested during strategy run. It can also be a dict that
+            maps timeframes to the number of last closed candles
+            available through `candles.history`.
+        - `tick_timeframes` - Set of timeframes on whose candle close 
+            `tick` is called. If empty, `tick` is called on every 
+            candle of input data. Broker and buffers are updated on 
+            every candle anyway. A candle closes a candle of these 
+            timeframes if the next one opens at its boundary, so 
+            close time of input candles may be either the last ms 
+            of the candle or open time of the next one.
+
+    Strategy that waits for the price to reach a level or for some 
+    time to pass may call `sleep_until`, so that candles are skipped
+    without ticks until then.
 
     There is no need to access or modify these class attributes
     from inside the strategy, normally.
     """
     title = ''
     indicators: t.Set[t.Tuple[IndicatorParam]] = set()
-    candle_timeframes: t.Set[Timeframes] = set()
+    candle_timeframes: t.Union[t.Set[Timeframes], 
+                               t.Dict[Timeframes, int]] = set()
+    tick_timeframes: t.Set[Timeframes] = set()
 
     def __init__(self, 
                  broker: AbstractBroker,
@@ -56,6 +119,7 @@ class TradingStrategy(ABC):
         self.broker=broker
         self.analyser=analyser
         self.candles=candles
+        self.wake_condition: t.Optional[WakeCondition] = None
 
     @classmethod
     def get_title(cls) -> str:
@@ -65,6 +129,28 @@ class TradingStrategy(ABC):
     def position(self) -> Decimal:
         return self.broker.balance.available_crypto_balance
 
+    @property
+    def is_sleeping(self) -> bool:
+        return self.wake_condition is not None
+
+    def sleep_until(self, 
+                    price_above: t.Optional[Decimal] = None,
+                    price_below: t.Optional[Decimal] = None,
+                    time: t.Optional[datetime] = None) -> None:
+        """
+        Stop ticking until the price reaches `price_above` or 
+        `price_below`, or until `time`, whichever comes first.
+        Ticks resume with the candle that meets the condition.
+        Orders are still reviewed by broker while sleeping.
+        """
+        if price_above is None and price_below is None and time is None:
+            raise ValueError("At least one wake up condition is required")
+        self.wake_condition = WakeCondition(price_above, price_below, time)
+
+    def wake_up(self) -> None:
+        """Resume ticking."""
+        self.wake_condition = None
+
     def buy(self, amount: t.Optional[Decimal] = None) -> MarketOrderInfo:
         """Shortcut for submitting market buy order."""
         order_amount = amount or self.broker.max_fiat_for_taker
@@ -107,5 +193,8 @@ class TradingStrategy(ABC):
 
     @abstractmethod
     def tick(self) -> None:
-        """The lands of user code. Runs each time a new candle closes."""
+        """
+        The lands of user code. Runs each time a new candle closes
+        (on one of `tick_timeframes`, if specified).
+        """
         pass
\ No newline at end of file
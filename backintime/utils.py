@@ -4,16 +4,36 @@ from enum import Enum
 from itertools import chain
 from decimal import Decimal
 from datetime import datetime, timedelta
+from time import perf_counter_ns
 
 from .trading_strategy import TradingStrategy
 from .analyser.indicators.base import IndicatorParam
-from .analyser.indicators.constants import CandleProperties
-from .analyser.analyser import Analyser, AnalyserBuffer
+from .analyser.indicators.constants import (
+    CandleProperties,
+    OPEN, HIGH, LOW, CLOSE
+)
+from .analyser.analyser import (
+    Analyser, 
+    AnalyserBuffer, 
+    ResampledAnalyserBuffer
+)
 from .broker.base import BrokerException
 from .broker.default.fees import FeesEstimator
 from .broker.default.proxy import BrokerProxy
 from .broker.default.broker import Broker
-from .candles import Candles, CandlesBuffer
+from .candles import Candles, CandlesBuffer, ResampledCandlesBuffer
+from .engine import Engine
+from .instrumentation import (
+    Instrument,
+    Instruments,
+    InstrumentedAnalyser,
+    InstrumentedBroker,
+    InstrumentedEngine,
+    Phase,
+    Progress,
+    ProgressMonitor,
+    RunContext
+)
 from .result.result import BacktestingResult
 from .timeframes import (
     Timeframes, 
@@ -21,6 +41,11 @@ from .timeframes import (
     estimate_open_time, 
     estimate_close_time
 )
+from .data.columns import (
+    ColumnarCandles, 
+    read_columns, 
+    to_millis
+)
 from .data.data_provider import (
     DataProvider, 
     DataProviderFactory,
@@ -45,6 +70,23 @@ def _get_indicators_params(
     return list(chain.from_iterable(strategy_t.indicators))
 
 
+# Prices used by `Broker.update` to execute orders
+BROKER_CANDLE_PROPERTIES = frozenset({ OPEN, HIGH, LOW, CLOSE })
+
+
+def get_required_properties(
+        strategy_t: t.Type[TradingStrategy]) -> t.FrozenSet[CandleProperties]:
+    """
+    Get candle properties used by the strategy and broker. 
+    Strategies with `candle_timeframes` may read any property.
+    """
+    if strategy_t.candle_timeframes:
+        return frozenset(CandleProperties)
+    indicator_params = _get_indicators_params(strategy_t)
+    indicator_properties = { x.candle_property for x in indicator_params }
+    return BROKER_CANDLE_PROPERTIES | indicator_properties
+
+
 def _reserve_space(analyser_buffer: AnalyserBuffer, 
                    indicator_params: t.Iterable[IndicatorParam]) -> None:
     """Reserve space in `analyser_buffer` for all `indicator_params`."""
@@ -132,6 +174,55 @@ def prefetch_values(strategy_t: t.Type[TradingStrategy],
         return analyser_buffer, start_date
 
 
+def prefetch_resampled(
+        strategy_t: t.Type[TradingStrategy],
+        data_provider_factory: DataProviderFactory,
+        prefetch_option: PrefetchOptions,
+        start_date: datetime,
+        end_date: datetime
+        ) -> t.Tuple[ResampledAnalyserBuffer, 
+                     ResampledCandlesBuffer, 
+                     ColumnarCandles]:
+    """
+    Read all candles for prefetching and backtesting at once
+    and resample them to all required timeframes up front.
+    Return buffers for `Analyser` and `Candles`, 
+    and market data for backtesting.
+    """
+    base_timeframe = data_provider_factory.timeframe
+    indicator_params = _get_indicators_params(strategy_t)
+    count = _get_prefetch_count(base_timeframe, indicator_params)
+
+    if prefetch_option is PREFETCH_SINCE:
+        since = start_date
+        start_date = estimate_open_time(since, base_timeframe, count)
+    elif prefetch_option is PREFETCH_UNTIL:
+        since = estimate_open_time(start_date, base_timeframe, -count)
+    else:   # `PREFETCH_NONE` or any other
+        since = start_date
+
+    logger = logging.getLogger("backintime")
+    logger.info("Start reading and resampling...")
+    logger.info(f"since: {since}")
+    logger.info(f"until: {end_date}")
+
+    data = data_provider_factory.create(since, end_date)
+    columns = read_columns(data)
+    analyser_buffer = ResampledAnalyserBuffer(since, columns)
+    _reserve_space(analyser_buffer, indicator_params)
+    # Prefetched candles are consumed by `Analyser` only
+    prefetched = int((columns.open_time < to_millis(start_date)).sum())
+    analyser_buffer.skip(prefetched)
+
+    market_data = ColumnarCandles(columns, data.title, data.symbol, 
+                                  base_timeframe, start_date, end_date)
+    candles_buffer = ResampledCandlesBuffer(start_date, 
+                                            strategy_t.candle_timeframes,
+                                            market_data.columns)
+    logger.info("Resampling is done")
+    return analyser_buffer, candles_buffer, market_data
+
+
 class IncompatibleTimeframe(Exception):
     def __init__(self, 
                  timeframe: Timeframes, 
@@ -152,8 +243,9 @@ def validate_timeframes(strategy_t: t.Type[TradingStrategy],
     """
     indicator_params = _get_indicators_params(strategy_t)
     indicator_timeframes = { x.timeframe for x in indicator_params }
-    candle_timeframes = strategy_t.candle_timeframes
-    timeframes = indicator_timeframes | candle_timeframes
+    candle_timeframes = set(strategy_t.candle_timeframes)
+    tick_timeframes = strategy_t.tick_timeframes
+    timeframes = indicator_timeframes | candle_timeframes | tick_timeframes
     base_timeframe = data_provider_factory.timeframe
     # Timeframes are incompatible if there is non zero remainder
     is_incompatible = lambda tf: get_timeframes_ratio(tf, base_timeframe)[1]
@@ -163,6 +255,27 @@ def validate_timeframes(strategy_t: t.Type[TradingStrategy],
                                     incompatibles, strategy_t)
 
 
+def _get_tick_condition(
+        strategy_t: t.Type[TradingStrategy],
+        base_timeframe: Timeframes
+        ) -> t.Optional[t.Callable[[t.Any], bool]]:
+    """
+    Get predicate that tells whether `tick` must be called
+    after a candle, or None if it must be called after each one.
+    """
+    if not strategy_t.tick_timeframes:
+        return None
+    durations = [ x.value*1000 for x in strategy_t.tick_timeframes ]
+    base_duration = base_timeframe.value*1000
+    # Candle closes a bar of the timeframe if the next candle opens
+    # at a multiple of timeframe duration. Close time isn't used,
+    # since data sources differ in whether it is the last ms 
+    # of the candle or the open time of the next one
+    return lambda candle: any(
+                (to_millis(candle.open_time) + base_duration) % x == 0
+                    for x in durations)
+
+
 UNTIL = PrefetchOptions.PREFETCH_UNTIL
 
 
@@ -173,47 +286,109 @@ def run_backtest(strategy_t: t.Type[TradingStrategy],
                  until: datetime,
                  maker_fee: str,
                  taker_fee: str,
-                 prefetch_option: PrefetchOptions = UNTIL) -> BacktestingResult:
-    """Run backtesting."""
+                 prefetch_option: PrefetchOptions = UNTIL,
+                 resample: bool = False,
+                 instruments: t.Iterable[Instrument] = (),
+                 on_progress: t.Optional[t.Callable[[Progress], None]] = None
+                 ) -> BacktestingResult:
+    """
+    Run backtesting.
+    If `resample` is True, all candles are read at once and 
+    resampled to required timeframes up front, instead of 
+    aggregating them one at a time. This also lets candles 
+    be skipped in bulk while strategy sleeps.
+    `instruments` are notified of each phase of the run,
+    their reports are available in `BacktestingResult.reports`.
+    `on_progress` is called with progress of the run once a minute,
+    `log_progress` from `backintime.instrumentation` may be used
+    to just log it. Use `ProgressMonitor` instrument to configure
+    how often it is called. Unlike instruments, it doesn't
+    require measuring each phase of the run.
+    """
+    instruments = Instruments(instruments)
+    progress = ProgressMonitor(on_progress) \
+                    if on_progress is not None else None
+    prefetch_start = perf_counter_ns()
     validate_timeframes(strategy_t, data_provider_factory)
+    # Let data provider skip parsing of unused properties
+    properties = get_required_properties(strategy_t)
+    data_provider_factory = data_provider_factory.project(properties)
     # Create shared `Broker` for `BrokerProxy`
     start_money = Decimal(start_money)
     fees = FeesEstimator(Decimal(maker_fee), Decimal(taker_fee))
-    broker = Broker(start_money, fees)
+    if instruments.uses_broker:
+        broker = InstrumentedBroker(start_money, fees)
+    else:
+        broker = Broker(start_money, fees)
     broker_proxy = BrokerProxy(broker)
-    # Create shared buffer for `Analyser`
-    analyser_buffer, since = prefetch_values(strategy_t, 
-                                             data_provider_factory,
-                                             prefetch_option,
-                                             since)
-    analyser = Analyser(analyser_buffer)
-    # Create shared buffer for `Candles`
-    timeframes = strategy_t.candle_timeframes
-    candles_buffer = CandlesBuffer(since, timeframes)
-    candles = Candles(candles_buffer)
 
+    if resample:
+        analyser_buffer, candles_buffer, market_data = \
+            prefetch_resampled(strategy_t, data_provider_factory,
+                               prefetch_option, since, until)
+    else:
+        # Create shared buffer for `Analyser`
+        analyser_buffer, since = prefetch_values(strategy_t, 
+                                                 data_provider_factory,
+                                                 prefetch_option,
+                                                 since)
+        # Create shared buffer for `Candles`
+        timeframes = strategy_t.candle_timeframes
+        candles_buffer = CandlesBuffer(since, timeframes)
+        market_data = data_provider_factory.create(since, until)
+    prefetch_end = perf_counter_ns()
+
+    if instruments.uses_analyser:
+        analyser = InstrumentedAnalyser(analyser_buffer, instruments)
+    else:
+        analyser = Analyser(analyser_buffer)
+    candles = Candles(candles_buffer)
     strategy = strategy_t(broker_proxy, analyser, candles)
-    market_data = data_provider_factory.create(since, until)
+    is_tick = _get_tick_condition(strategy_t, 
+                                  data_provider_factory.timeframe)
+    on_candle = progress.update if progress is not None else None
+    context = RunContext(strategy, broker, candles_buffer, 
+                         analyser_buffer, market_data, since, until)
+    if progress is not None:
+        progress.on_start(context)
+    if instruments.instruments:
+        engine = InstrumentedEngine(strategy, broker, candles_buffer, 
+                                    analyser_buffer, is_tick, on_candle,
+                                    instrument=instruments)
+        instruments.on_start(context)
+        instruments.on_phase(Phase.PREFETCH, prefetch_start, prefetch_end)
+    else:
+        engine = Engine(strategy, broker, candles_buffer, 
+                        analyser_buffer, is_tick, on_candle)
     logger = logging.getLogger("backintime")
     logger.info("Start backtesting...")
 
     try:
-        for candle in market_data:
-            broker.update(candle)           # Review whether orders can be executed
-            candles_buffer.update(candle)   # Update candles on required timeframes
-            analyser_buffer.update(candle)  # Store data for indicators calculation
-            strategy.tick()                 # Trading strategy logic here
+        if resample:
+            engine.run_columns(market_data.columns)
+        else:
+            engine.run(market_data)
 
     except (BrokerException, DataProviderError) as e:
         # These are more or less expected, so don't raise
         name = e.__class__.__name__
         logger.error(f"{name}: {str(e)}\nStop backtesting...")
+        instruments.on_error(e)
+    except Exception as e:
+        instruments.on_error(e)
+        raise
 
     logger.info("Backtesting is done")
+    instruments.on_finish()
+    reports = instruments.report()
+    if progress is not None:
+        progress.on_finish()
+        reports[progress.name] = progress.report()
     return BacktestingResult(strategy_t.get_title(),
                              market_data,
                              start_money,
                              broker.balance.fiat_balance,
                              broker.current_equity,
                              broker.get_trades(),
-                             broker.get_orders())
\ No newline at end of file
+                             broker.get_orders(),
+                             reports)
\ No newline at end of file
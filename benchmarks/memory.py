@@ -0,0 +1,122 @@
+"""
+Memory benchmark: peak RSS growth while keeping candles
+and orders alive, as in long backtests.
+
+Each scenario is run in a separate process, so that
+peak RSS of one scenario doesn't affect the others.
+
+Usage:
+    python benchmarks/memory.py [scenario ...]
+"""
+import os
+import sys
+import json
+import resource
+import subprocess
+import typing as t
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# Make `backintime` of this checkout importable (in scenario processes
+# as well), as the script's own directory is put on `sys.path` instead
+# of the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CANDLES_COUNT = 1_000_000
+ORDERS_COUNT = 100_000
+
+
+def _peak_rss() -> int:
+    """Get peak RSS of the current process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak*1024
+
+
+def _times(count: int) -> t.List[datetime]:
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    return [ start + timedelta(minutes=i) for i in range(count) ]
+
+
+def input_candles() -> t.Tuple[list, int]:
+    """Candles as yielded by data providers."""
+    from backintime.data.candle import Candle
+    times = _times(CANDLES_COUNT)
+    price = Decimal('17165.53')
+    return [
+        Candle(open=price, high=price, low=price, close=price,
+               volume=price, open_time=time, close_time=time)
+            for time in times
+    ], CANDLES_COUNT
+
+
+def candles() -> t.Tuple[list, int]:
+    """Candles as provided to strategies."""
+    from backintime.candles import Candle
+    times = _times(CANDLES_COUNT)
+    price = Decimal('17165.53')
+    return [
+        Candle(open_time=time, close_time=time, open=price, high=price,
+               low=price, close=price, volume=price, is_closed=True)
+            for time in times
+    ], CANDLES_COUNT
+
+
+def orders() -> t.Tuple[list, int]:
+    """Limit orders with TP/SL and their info wrappers."""
+    from backintime.broker.base import OrderSide
+    from backintime.broker.default.orders import (
+        LimitOrder,
+        LimitOrderInfo,
+        StopLossOrder,
+        StrategyOrders,
+        TakeProfitOrder
+    )
+    created = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    min_fiat, min_crypto = Decimal('0.01'), Decimal('0.00000001')
+    amount, price = Decimal('100'), Decimal('17165.53')
+    result = []
+    for order_id in range(ORDERS_COUNT):
+        order = LimitOrder(OrderSide.BUY, amount, price,
+                           min_fiat, min_crypto, created)
+        order.take_profit = TakeProfitOrder(OrderSide.SELL, amount, price,
+                                            min_fiat, min_crypto, created)
+        order.stop_loss = StopLossOrder(OrderSide.SELL, amount, price,
+                                        min_fiat, min_crypto, created)
+        strategy_orders = StrategyOrders(order_id + 1, order_id + 2)
+        result.append(LimitOrderInfo(order_id, order, strategy_orders))
+    return result, ORDERS_COUNT
+
+
+SCENARIOS = {
+    'input_candles': (input_candles, 1_000_000, "per 1M candles"),
+    'candles': (candles, 1_000_000, "per 1M candles"),
+    'orders': (orders, 100_000, "per 100k orders"),
+}
+
+
+def _run_scenario(name: str) -> None:
+    """Run scenario in the current process and print results as JSON."""
+    scenario, _, _ = SCENARIOS[name]
+    import backintime.broker.default.orders
+    import backintime.candles
+    baseline = _peak_rss()
+    objects, count = scenario()
+    print(json.dumps({ 'rss': _peak_rss() - baseline, 'count': count }))
+
+
+def main(names: t.Sequence[str]) -> None:
+    for name in names or SCENARIOS:
+        _, scale, unit = SCENARIOS[name]
+        output = subprocess.run([sys.executable, __file__, '--run', name],
+                                check=True, capture_output=True, text=True)
+        result = json.loads(output.stdout)
+        rss = result['rss'] * scale / result['count'] / 1024**2
+        print(f"{name:<16} peak RSS: {rss:8.1f} MiB {unit}")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--run']:
+        _run_scenario(sys.argv[2])
+    else:
+        main(sys.argv[1:])
@@ -0,0 +1,440 @@
+"""
+Micro-benchmarks of hot components: analyser buffer, indicators,
+candles buffer, broker, data providers and profit/loss algorithms.
+
+Each benchmark is prepared anew for each of `--repeat` runs and only
+the run itself is timed, with `perf_counter_ns`. The best run is
+reported in nanoseconds per operation, so that noise of other
+processes is mostly excluded. Input data is synthetic and seeded,
+so it's the same on each commit.
+
+Results can be saved as JSON along with the commit, Python and
+library versions they were taken with, and compared with results
+saved on another commit. Benchmarks use APIs that older commits
+don't have (history depths of `CandlesBuffer`, `url` and `limiter`
+of `BinanceCandles`, `use_index` of `CSVCandlesFactory`), so
+baselines can only be taken starting with the commit that added
+this script. Run on an older package, such benchmarks are reported
+as failed, while the rest are still measured.
+
+Usage:
+    python benchmarks/micro.py [benchmark ...] [--repeat N]
+                               [--save results.json]
+                               [--compare baseline.json]
+
+Benchmark names may be given as prefixes, e.g. `indicators`.
+"""
+import os
+import sys
+import gc
+import json
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import typing as t
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter_ns
+from urllib.parse import parse_qs, urlparse
+
+# Make `backintime` of this checkout importable, as the script's
+# own directory is put on `sys.path` instead of the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+CANDLES_COUNT = 100_000
+INDICATOR_CALLS = 200
+GET_VALUES_CALLS = 10_000
+BROKER_UPDATES = 1_000
+CSV_ROWS = 10_000
+BINANCE_ROWS = 100_000
+TRADES_COUNT = 10_000
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+# Setup returns function to time and number of operations it performs
+Setup = t.Callable[[], t.Tuple[t.Callable[[], t.Any], int]]
+
+
+@lru_cache(maxsize=None)
+def _prices(count: int) -> t.Tuple[t.Tuple[Decimal, ...], ...]:
+    """Seeded random walk of (open, high, low, close, volume)."""
+    rng = random.Random(42)
+    price = 20_000.0
+    result = []
+    for _ in range(count):
+        open = price
+        price = max(1.0, price*(1 + rng.gauss(0, 0.002)))
+        high = max(open, price)*(1 + rng.random()*0.001)
+        low = min(open, price)*(1 - rng.random()*0.001)
+        volume = rng.random()*100
+        result.append(tuple(Decimal(f"{value:.2f}")
+                                for value in (open, high, low, price, volume)))
+    return tuple(result)
+
+
+def _input_candles(count: int, minutes: int = 1) -> list:
+    """Candles as yielded by data providers."""
+    from backintime.data.candle import Candle
+    duration = timedelta(minutes=minutes)
+    candles = []
+    for i, (open, high, low, close, volume) in enumerate(_prices(count)):
+        open_time = START + i*duration
+        candles.append(Candle(open_time=open_time, open=open, high=high,
+                              low=low, close=close, volume=volume,
+                              close_time=open_time + duration - \
+                                            timedelta(milliseconds=1)))
+    return candles
+
+
+def analyser_buffer_update():
+    from backintime.analyser.analyser import AnalyserBuffer
+    from backintime.analyser.indicators.constants import CandleProperties
+    from backintime.timeframes import Timeframes as tf
+    buffer = AnalyserBuffer(START)
+    for timeframe in (tf.M1, tf.H1, tf.H4):
+        for candle_property in CandleProperties:
+            buffer.reserve(timeframe, candle_property, 200)
+    candles = _input_candles(CANDLES_COUNT)
+
+    def run():
+        for candle in candles:
+            buffer.update(candle)
+    return run, len(candles)
+
+
+def analyser_buffer_get_values():
+    from backintime.analyser.analyser import AnalyserBuffer
+    from backintime.analyser.indicators.constants import CLOSE
+    from backintime.timeframes import Timeframes as tf
+    buffer = AnalyserBuffer(START)
+    buffer.reserve(tf.H1, CLOSE, 200)
+    for candle in _input_candles(1000, 60):
+        buffer.update(candle)
+
+    def run():
+        for _ in range(GET_VALUES_CALLS):
+            buffer.get_values(tf.H1, CLOSE, 100)
+    return run, GET_VALUES_CALLS
+
+
+def _indicator(name: str) -> Setup:
+    def setup():
+        from backintime.analyser import indicators
+        from backintime.analyser.analyser import (
+            AnalyserBuffer,
+            MarketDataInfo
+        )
+        from backintime.timeframes import Timeframes as tf
+        module = name.split('_')[0]
+        package = __import__(f"{indicators.__name__}.{module}",
+                             fromlist=[name])
+        indicator = getattr(package, name)
+        params = getattr(package, f"{module}_params")
+        buffer = AnalyserBuffer(START)
+        for param in params(tf.H1):
+            buffer.reserve(param.timeframe, param.candle_property,
+                           param.quantity)
+        for candle in _input_candles(1000, 60):
+            buffer.update(candle)
+        market_data = MarketDataInfo(buffer)
+
+        def run():
+            for _ in range(INDICATOR_CALLS):
+                indicator(market_data, tf.H1)
+        return run, INDICATOR_CALLS
+    return setup
+
+
+def candles_buffer_update():
+    from backintime.candles import CandlesBuffer
+    from backintime.timeframes import Timeframes as tf
+    buffer = CandlesBuffer(START, { tf.M1: 0, tf.H1: 50,
+                                    tf.H4: 0, tf.D1: 0 })
+    candles = _input_candles(CANDLES_COUNT)
+
+    def run():
+        for candle in candles:
+            buffer.update(candle)
+    return run, len(candles)
+
+
+def _broker_update(orders_count: int) -> Setup:
+    def setup():
+        from backintime.broker.base import LimitOrderOptions, OrderSide
+        from backintime.broker.default.broker import Broker
+        from backintime.broker.default.fees import FeesEstimator
+        fees = FeesEstimator(Decimal('0.001'), Decimal('0.001'))
+        broker = Broker(Decimal(10_000_000), fees)
+        # Resting orders, far below the price, are never executed
+        for _ in range(orders_count):
+            broker.submit_limit_order(
+                LimitOrderOptions(OrderSide.BUY, Decimal(1), Decimal(10)))
+        candles = _input_candles(BROKER_UPDATES)
+
+        def run():
+            for candle in candles:
+                broker.update(candle)
+        return run, len(candles)
+    return setup
+
+
+def _write_csv(path: str, count: int) -> None:
+    """Write candles in the default schema of `CSVCandles`."""
+    with open(path, 'w') as file:
+        for candle in _input_candles(count):
+            file.write(f"{candle.open_time};{candle.open};{candle.high};"
+                       f"{candle.low};{candle.close};{candle.close_time};"
+                       f"{candle.volume}\n")
+
+
+def csv_parse():
+    from backintime.data.csv import CSVCandlesFactory
+    from backintime.timeframes import Timeframes as tf
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'candles.csv')
+    _write_csv(path, CSV_ROWS)
+    factory = CSVCandlesFactory(path, 'BTCUSDT', tf.M1, use_index=False)
+    candles = factory.create(START, START + timedelta(minutes=CSV_ROWS))
+
+    def run():
+        try:
+            for _ in candles:
+                pass
+        finally:
+            os.remove(path)
+            os.rmdir(directory)
+    return run, CSV_ROWS
+
+
+class _KlinesHandler(BaseHTTPRequestHandler):
+    """Local stub of Binance klines endpoint with prebuilt pages."""
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        body = self.server.pages[int(params['startTime'][0])]
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@lru_cache(maxsize=None)
+def _klines_server(count: int) -> ThreadingHTTPServer:
+    tf_ms = 3600_000
+    start = int(START.timestamp()*1000)
+    klines = [
+        [ start + i*tf_ms, str(open), str(high), str(low), str(close),
+          str(volume), start + (i + 1)*tf_ms - 1 ]
+            for i, (open, high, low, close, volume)
+                in enumerate(_prices(count))
+    ]
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _KlinesHandler)
+    server.pages = {
+        page[0][0]: json.dumps(page).encode()
+            for page in (klines[i:i + 1000]
+                            for i in range(0, count, 1000))
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def binance_decode():
+    from backintime.data.binance import BinanceCandlesFactory, TokenBucket
+    from backintime.timeframes import Timeframes as tf
+    server = _klines_server(BINANCE_ROWS)
+    host, port = server.server_address
+    # Don't throttle requests to the stub
+    limiter = TokenBucket(1e9, 1e9)
+    factory = BinanceCandlesFactory('BTCUSDT', tf.H1,
+                                    url=f"http://{host}:{port}/api/v3/klines",
+                                    limiter=limiter)
+    candles = factory.create(START, START + timedelta(hours=BINANCE_ROWS))
+
+    def run():
+        for _ in candles:
+            pass
+    return run, BINANCE_ROWS
+
+
+@lru_cache(maxsize=None)
+def _trades(count: int) -> tuple:
+    """Trades of two BUYs followed by SELL of the whole position."""
+    from backintime.broker.base import MarketOrderOptions, OrderSide
+    from backintime.broker.default.broker import Broker
+    from backintime.broker.default.fees import FeesEstimator
+    fees = FeesEstimator(Decimal('0.001'), Decimal('0.001'))
+    broker = Broker(Decimal(10_000), fees)
+    for i, candle in enumerate(_input_candles(count)):
+        if i % 3 == 2:
+            options = MarketOrderOptions(OrderSide.SELL,
+                                         percentage_amount=Decimal(100))
+        else:
+            options = MarketOrderOptions(OrderSide.BUY,
+                                         percentage_amount=Decimal(50))
+        broker.submit_market_order(options)
+        broker.update(candle)
+    return tuple(broker.get_trades())
+
+
+def _stats(algorithm: str) -> Setup:
+    def setup():
+        from backintime.result.stats import get_stats
+        trades = _trades(TRADES_COUNT)
+        return lambda: get_stats(algorithm, trades), len(trades)
+    return setup
+
+
+# `atr` is not measured: it fails with `Decimal` input in `ta`
+# (see `test_atr`), which would look like a regression on each run
+INDICATORS = ('adx', 'bbands', 'dmi', 'ema', 'macd',
+              'pivot', 'pivot_fib', 'pivot_classic', 'rsi', 'sma')
+
+# name: (setup, scale, unit) - if `scale` is given, time of `scale`
+# operations is also reported in seconds
+BENCHMARKS: t.Dict[str, t.Tuple[Setup, t.Optional[int], str]] = {
+    'analyser_buffer.update': (analyser_buffer_update, None, 'candle'),
+    'analyser_buffer.get_values':
+        (analyser_buffer_get_values, None, 'call'),
+    **{
+        f"indicators.{name}": (_indicator(name), None, 'call')
+            for name in INDICATORS
+    },
+    'candles_buffer.update': (candles_buffer_update, None, 'candle'),
+    'broker.update[0]': (_broker_update(0), None, 'update'),
+    'broker.update[100]': (_broker_update(100), None, 'update'),
+    'broker.update[10k]': (_broker_update(10_000), None, 'update'),
+    'csv.parse': (csv_parse, 1_000_000, 'row'),
+    'binance.decode': (binance_decode, 1_000_000, 'row'),
+    'stats.fifo': (_stats('FIFO'), None, 'trade'),
+    'stats.lifo': (_stats('LIFO'), None, 'trade'),
+    'stats.avco': (_stats('AVCO'), None, 'trade'),
+}
+
+
+def _run_benchmark(name: str, repeat: int) -> dict:
+    """Run benchmark `repeat` times and get ns per operation."""
+    setup, _, _ = BENCHMARKS[name]
+    runs = []
+    for _ in range(repeat):
+        run, ops = setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start = perf_counter_ns()
+            run()
+            end = perf_counter_ns()
+        finally:
+            gc.enable()
+        runs.append((end - start)/ops)
+    return { 'ns_per_op': min(runs), 'runs': runs, 'ops': ops }
+
+
+def _git(*args: str) -> t.Optional[str]:
+    try:
+        output = subprocess.run(['git', *args],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                check=True, capture_output=True, text=True)
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _get_environment() -> dict:
+    import numpy
+    import pandas
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        # Uncommitted changes make results not attributable to commit
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'date': datetime.now(timezone.utc).isoformat()
+    }
+
+
+def _select(patterns: t.Sequence[str]) -> t.List[str]:
+    if not patterns:
+        return list(BENCHMARKS)
+    names = [ name for name in BENCHMARKS
+                if any(name.startswith(pattern) for pattern in patterns) ]
+    if not names:
+        raise SystemExit(f"No benchmarks match {', '.join(patterns)}. "
+                         f"Available: {', '.join(BENCHMARKS)}")
+    return names
+
+
+def _format(name: str, result: dict,
+            baseline: t.Optional[dict] = None) -> str:
+    if 'error' in result:
+        return f"{name:<30} failed: {result['error']}"
+    _, scale, unit = BENCHMARKS[name]
+    ns = result['ns_per_op']
+    line = f"{name:<30}{ns:>14,.0f} ns/{unit:<8}"
+    if scale:
+        line += f"{ns*scale/1e9:>8.2f} s per {scale:,} {unit}s"
+    base = (baseline or {}).get(name)
+    if base and 'ns_per_op' in base:
+        ratio = ns/base['ns_per_op']
+        line += f"  x{ratio:.2f} " + \
+                    ('slower' if ratio > 1 else 'faster')
+    return line
+
+
+def main(argv: t.Sequence[str]) -> None:
+    parser = argparse.ArgumentParser(
+                description="Micro-benchmarks of backintime components.")
+    parser.add_argument('benchmarks', nargs='*',
+                        help="names or prefixes of benchmarks to run")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="runs of each benchmark, the best is reported")
+    parser.add_argument('--save', help="save results to JSON file")
+    parser.add_argument('--compare',
+                        help="compare with results saved to JSON file")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            saved = json.load(file)
+        baseline = saved['results']
+        commit = saved['environment'].get('commit') or 'unknown commit'
+        print(f"Compared with {commit[:12]} "
+              f"(Python {saved['environment']['python']})")
+
+    results = {}
+    for name in _select(args.benchmarks):
+        try:
+            results[name] = _run_benchmark(name, args.repeat)
+        except Exception as e:
+            results[name] = { 'error': f"{type(e).__name__}: {e}" }
+        print(_format(name, results[name], baseline), flush=True)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({ 'environment': _get_environment(),
+                        'sizes': {
+                            'candles': CANDLES_COUNT,
+                            'indicator_calls': INDICATOR_CALLS,
+                            'get_values_calls': GET_VALUES_CALLS,
+                            'broker_updates': BROKER_UPDATES,
+                            'csv_rows': CSV_ROWS,
+                            'binance_rows': BINANCE_ROWS,
+                            'trades': TRADES_COUNT
+                        },
+                        'results': results }, file, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
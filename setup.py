@@ -19,6 +19,7 @@ setup(
         'backintime/broker',
         'backintime/broker/default',
         'backintime/data',
+        'backintime/instrumentation',
         'backintime/result'
         ],
     install_requires = [
@@ -34,6 +35,10 @@ setup(
         'ta==0.9.0',
         'urllib3==1.26.8'
         ],
+    extras_require = {
+        'parquet': ['pyarrow'],
+        'zstd': ['zstandard']
+        },
     classifiers = [
         "Programming Language :: Python",
         "Programming Language :: Python :: 3",
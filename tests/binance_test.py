@@ -1,8 +1,19 @@
+import json
+import time
+import pytest
+import socket
+import threading
 import typing as t
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
 from backintime.data.data_provider import DataProviderError
-from backintime.data.binance import BinanceCandles, Candle
+from backintime.data.binance import BinanceCandles, Candle, TokenBucket
+from backintime.data.binance_cache import (
+    KlineCache, 
+    CachedBinanceCandlesFactory
+)
 from backintime.timeframes import Timeframes as tf
 
 
@@ -122,3 +133,234 @@ def test_invalid_symbol_will_rase():
     except DataProviderError:
         data_provider_error_raised = True
     assert data_provider_error_raised
+
+
+class _KlinesHandler(BaseHTTPRequestHandler):
+    """Local stand-in for Binance klines endpoint."""
+    def do_GET(self):
+        params = { k: v[0] for k, v in 
+                    parse_qs(urlparse(self.path).query).items() }
+        if params["symbol"] == "--":
+            self.send_response(400)
+            self.end_headers()
+            return
+        self.server.requests += 1
+        self.server.in_flight += 1
+        self.server.max_in_flight = max(self.server.max_in_flight,
+                                        self.server.in_flight)
+        time.sleep(0.01)    # let concurrent requests overlap
+        tf_ms = 3600_000
+        start, end = int(params["startTime"]), int(params["endTime"])
+        klines = [
+            [ open_time, "1.5", "2.5", "0.5", "2.0", "10.0", 
+              open_time + tf_ms - 1 ]
+                for open_time in range(start, end + 1, tf_ms)
+        ][:int(params["limit"])]
+        self.server.in_flight -= 1
+
+        body = json.dumps(klines).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def klines_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KlinesHandler)
+    server.requests = 0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _local_url(server) -> str:
+    host, port = server.server_address
+    return f"http://{host}:{port}/api/v3/klines"
+
+
+def test_concurrent_pages_are_yielded_in_order(klines_server):
+    """
+    Ensure that pages downloaded concurrently are yielded 
+    in historical order, without missing candles.
+    """
+    since = datetime.fromisoformat("2020-01-01 00:00+00:00")
+    until = datetime.fromisoformat("2020-12-01 00:00+00:00")
+    expected_len = int((until - since).total_seconds() // 3600)
+    limiter = TokenBucket(1000, 1000)
+    candles = BinanceCandles("BTCUSDT", tf.H1, since, until, 
+                             url=_local_url(klines_server), 
+                             workers=4, limiter=limiter)
+    open_times = [ candle.open_time for candle in candles ]
+
+    assert len(open_times) == expected_len
+    assert open_times[0] == since
+    assert all(x < y for x, y in zip(open_times, open_times[1:]))
+    assert klines_server.max_in_flight > 1
+
+
+def test_http_error_will_raise_from_worker(klines_server):
+    """
+    Ensure that HTTP error in a download thread raises 
+    `DataProviderError` in the consumer.
+    """
+    since = datetime.fromisoformat("2022-12-01 00:00+00:00")
+    until = datetime.fromisoformat("2022-12-01 01:00+00:00")
+    candles = BinanceCandles("--", tf.H1, since, until, 
+                             url=_local_url(klines_server))
+    with pytest.raises(DataProviderError):
+        next(iter(candles))
+
+
+def test_token_bucket_limits_rate():
+    """
+    Ensure that `TokenBucket` blocks once its capacity is spent, 
+    until tokens are refilled.
+    """
+    bucket = TokenBucket(capacity=10, refill_rate=100)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire(2)
+    assert time.monotonic() - start < 0.05
+    bucket.acquire(5)   # needs 50ms of refill
+    assert time.monotonic() - start >= 0.04
+
+
+def test_token_bucket_waits_without_lock():
+    """
+    Ensure that a caller waiting for refill doesn't hold 
+    the lock of `TokenBucket`.
+    """
+    bucket = TokenBucket(capacity=1, refill_rate=2)
+    bucket.acquire()
+    waiter = threading.Thread(target=bucket.acquire)
+    waiter.start()
+    time.sleep(0.05)
+    acquired = bucket._lock.acquire(timeout=0.1)
+    if acquired:
+        bucket._lock.release()
+    waiter.join()
+    assert acquired
+
+
+def test_stalled_request_will_time_out():
+    """
+    Ensure that a request to a server that never responds 
+    raises `DataProviderError` after `timeout`.
+    """
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    host, port = listener.getsockname()
+    since = datetime.fromisoformat("2022-12-01 00:00+00:00")
+    until = datetime.fromisoformat("2022-12-01 01:00+00:00")
+    candles = BinanceCandles("BTCUSDT", tf.H1, since, until, 
+                             url=f"http://{host}:{port}/api/v3/klines", 
+                             timeout=0.2)
+    start = time.monotonic()
+    try:
+        with pytest.raises(DataProviderError):
+            next(iter(candles))
+    finally:
+        listener.close()
+    assert time.monotonic() - start < 5
+
+
+def test_cached_klines_never_touch_network(klines_server, tmp_path):
+    """
+    Ensure that klines of closed chunks are downloaded once 
+    and then read from the cache.
+    """
+    since = datetime.fromisoformat("2020-01-15 00:00+00:00")
+    until = datetime.fromisoformat("2020-03-10 00:00+00:00")
+    cache = KlineCache(str(tmp_path))
+    factory = CachedBinanceCandlesFactory("BTCUSDT", tf.H1, cache,
+                                          url=_local_url(klines_server),
+                                          limiter=TokenBucket(1000, 1000))
+    downloaded = list(factory.create(since, until))
+    requests_made = klines_server.requests
+    cached = list(factory.create(since, until))
+
+    assert klines_server.requests == requests_made
+    assert cache.stats.misses == 3 and cache.stats.hits == 3
+    assert len(cached) == int((until - since).total_seconds() // 3600)
+    assert cached[0].open_time == since
+    assert all(_candles_equal(x, y) for x, y in zip(downloaded, cached))
+
+
+def test_open_chunk_is_refetched(klines_server, tmp_path):
+    """Ensure that the chunk that is not closed yet is not cached."""
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, 
+                                             microsecond=0)
+    since = now - timedelta(hours=3)
+    cache = KlineCache(str(tmp_path), chunk="day")
+    factory = CachedBinanceCandlesFactory("BTCUSDT", tf.H1, cache,
+                                          url=_local_url(klines_server),
+                                          limiter=TokenBucket(1000, 1000))
+    list(factory.create(since, now))
+    requests_made = klines_server.requests
+    list(factory.create(now - timedelta(hours=1), now))
+
+    assert klines_server.requests > requests_made
+    assert cache.stats.refetches >= 2
+
+
+def test_cache_evicts_least_recently_used(klines_server, tmp_path):
+    """Ensure that cache size is kept within `max_bytes`."""
+    since = datetime.fromisoformat("2020-01-01 00:00+00:00")
+    until = datetime.fromisoformat("2020-01-05 00:00+00:00")
+    cache = KlineCache(str(tmp_path), chunk="day", max_bytes=7000)
+    factory = CachedBinanceCandlesFactory("BTCUSDT", tf.H1, cache,
+                                          url=_local_url(klines_server),
+                                          limiter=TokenBucket(1000, 1000))
+    list(factory.create(since, until))
+
+    assert cache.stats.evictions > 0
+    assert cache.size() <= 7000
+    # The last chunk is still cached
+    assert cache.get(factory.host, "BTCUSDT", "1h", 
+                     until - timedelta(days=1)) is not None
+
+
+def test_broken_chunk_is_downloaded_again(klines_server, tmp_path):
+    """
+    Ensure that a truncated chunk is treated as a cache miss 
+    and replaced with a downloaded one.
+    """
+    since = datetime.fromisoformat("2020-01-01 00:00+00:00")
+    until = datetime.fromisoformat("2020-01-02 00:00+00:00")
+    cache = KlineCache(str(tmp_path), chunk="day")
+    factory = CachedBinanceCandlesFactory("BTCUSDT", tf.H1, cache,
+                                          url=_local_url(klines_server),
+                                          limiter=TokenBucket(1000, 1000))
+    expected = list(factory.create(since, until))
+    path = cache.get_path(factory.host, "BTCUSDT", "1h", since)
+    with open(path, 'r+b') as file:
+        file.truncate(100)
+    candles = list(factory.create(since, until))
+
+    assert cache.stats.misses == 2 and cache.stats.hits == 0
+    assert all(_candles_equal(x, y) for x, y in zip(expected, candles))
+    assert cache.get(factory.host, "BTCUSDT", "1h", since) is not None
+
+
+def test_cache_is_separate_per_host(klines_server, tmp_path):
+    """Ensure that klines of different API hosts are cached separately."""
+    since = datetime.fromisoformat("2020-01-01 00:00+00:00")
+    until = datetime.fromisoformat("2020-01-02 00:00+00:00")
+    cache = KlineCache(str(tmp_path), chunk="day")
+    local = CachedBinanceCandlesFactory("BTCUSDT", tf.H1, cache,
+                                        url=_local_url(klines_server))
+    mainnet = CachedBinanceCandlesFactory("BTCUSDT", tf.H1, cache)
+    list(local.create(since, until))
+
+    assert cache.get(local.host, "BTCUSDT", "1h", since) is not None
+    assert cache.get(mainnet.host, "BTCUSDT", "1h", since) is None
@@ -0,0 +1,82 @@
+import numpy
+import typing as t
+from datetime import datetime, timedelta
+from pytest import fixture
+from backintime.timeframes import Timeframes as tf
+from backintime.data.columns import CandleColumns, CandleColumnsFactory
+from backintime.data.cache import CachedDataProviderFactory, DatasetCache
+
+
+class _CountingFactory(CandleColumnsFactory):
+    """Records date ranges of all created providers."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests: t.List[t.Tuple[datetime, datetime]] = []
+
+    def create(self, since: datetime, until: datetime):
+        self.requests.append((since, until))
+        return super().create(since, until)
+
+
+@fixture
+def h1_columns() -> CandleColumns:
+    """100 H1 candles since 2022-12-01."""
+    start = round(datetime.fromisoformat('2022-12-01 00:00+00:00')
+                    .timestamp()*1000)
+    open_time = start + numpy.arange(100, dtype=numpy.int64)*3600_000
+    prices = numpy.arange(100, dtype=numpy.float64)
+    return CandleColumns(open_time, open_time + 3600_000 - 1,
+                         prices, prices + 1, prices - 1, prices, prices)
+
+
+def test_sub_ranges_are_served_from_cache(h1_columns):
+    """
+    Ensure that sub-ranges of a cached range are served
+    without reading the source and without copying.
+    """
+    source = _CountingFactory(h1_columns, 'BTCUSDT', tf.H1)
+    factory = CachedDataProviderFactory(source, DatasetCache())
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    until = since + timedelta(hours=100)
+
+    full = factory.create(since, until).columns
+    part = factory.create(since + timedelta(hours=10),
+                          since + timedelta(hours=20))
+
+    assert source.requests == [(since, until)]
+    assert len(part.columns) == 10
+    assert numpy.shares_memory(part.columns.close, full.close)
+    assert next(iter(part)).open_time == since + timedelta(hours=10)
+
+
+def test_only_missing_range_is_read(h1_columns):
+    """Ensure that extending cached range reads only the missing parts."""
+    source = _CountingFactory(h1_columns, 'BTCUSDT', tf.H1)
+    factory = CachedDataProviderFactory(source, DatasetCache())
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    start = since + timedelta(hours=30)
+    until = since + timedelta(hours=100)
+
+    factory.create(since, start)
+    candles = list(factory.create(start, until))
+
+    assert source.requests == [(since, start), (start, until)]
+    assert len(candles) == 70
+    assert len(factory.create(since, until).columns) == 100
+
+
+def test_least_recently_used_dataset_is_evicted(h1_columns):
+    """Ensure that datasets over memory budget are dropped."""
+    cache = DatasetCache(max_bytes=h1_columns.nbytes)
+    first = CachedDataProviderFactory(
+                CandleColumnsFactory(h1_columns, 'BTCUSDT', tf.H1), cache)
+    second = CachedDataProviderFactory(
+                CandleColumnsFactory(h1_columns, 'ETHUSDT', tf.H1), cache)
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    until = since + timedelta(hours=100)
+
+    first.create(since, until)
+    second.create(since, until)
+
+    assert len(cache) == 1
+    assert cache.get(second.factory) is not None
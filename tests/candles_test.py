@@ -1,7 +1,7 @@
 import typing as t
 from datetime import datetime
 from decimal import Decimal
-from pytest import fixture
+from pytest import fixture, raises
 from backintime.timeframes import Timeframes as tf
 from backintime.data.candle import Candle
 from backintime.candles import (
@@ -150,3 +150,52 @@ def test_unexpected_timeframe_will_raise():
         candle_not_found_raised = True
     assert candle_not_found_raised
 
+
+
+def test_candle_view_is_read_only(sample_h1_candles):
+    """
+    Ensure that candle view reflects updates of the buffer, 
+    can't be modified and that snapshots are not affected 
+    by further updates.
+    """
+    since = sample_h1_candles[0].open_time
+    candles_buffer = CandlesBuffer(since, {tf.H4})
+    candles = Candles(candles_buffer)
+    candles_buffer.update(sample_h1_candles[0])
+    view = candles.get(tf.H4)
+    snapshot = candles.snapshot(tf.H4)
+
+    for candle in sample_h1_candles[1:]:
+        candles_buffer.update(candle)
+
+    assert candles.get(tf.H4) is view
+    assert view.close == sample_h1_candles[-1].close
+    assert view.is_closed
+    assert snapshot.close == sample_h1_candles[0].close
+    assert not snapshot.is_closed
+    assert _candles_equal(view.snapshot(), view)
+    with raises(AttributeError):
+        view.close = Decimal('0')
+
+
+def test_candles_history(sample_h1_candles):
+    """
+    Ensure that history keeps at most `depth` last closed candles
+    in historical order, as read-only arrays.
+    """
+    since = sample_h1_candles[0].open_time
+    candles_buffer = CandlesBuffer(since, { tf.H1: 3, tf.H4: 0 })
+    candles = Candles(candles_buffer)
+
+    for candle in sample_h1_candles:
+        candles_buffer.update(candle)
+    history = candles.history(tf.H1, 5)
+    expected = sample_h1_candles[-3:]
+
+    assert len(history) == 3
+    assert history.close.tolist() == [ float(x.close) for x in expected ]
+    assert all(_candles_equal(x, y) for x, y in zip(history, expected))
+    assert len(candles.history(tf.H1, 2)) == 2
+    assert not history.close.flags.writeable
+    with raises(CandleNotFound):
+        candles.history(tf.H4, 1)
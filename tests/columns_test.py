@@ -0,0 +1,76 @@
+import typing as t
+from datetime import datetime
+from decimal import Decimal
+from pytest import fixture
+from backintime.timeframes import Timeframes as tf
+from backintime.data.candle import Candle
+from backintime.data.columns import CandleColumns, CandleColumnsFactory
+
+
+@fixture
+def sample_h1_candles() -> t.List[Candle]:
+    """Three valid H1 candles collected manually."""
+    return [
+        Candle(open_time=datetime.fromisoformat('2022-12-01 00:00+00:00'),
+               open=Decimal('17165.53'),
+               high=Decimal('17236.29'),
+               low=Decimal('17122.65'),
+               close=Decimal('17161.55'),
+               close_time=datetime.fromisoformat('2022-12-01 00:59:59.999000+00:00'),
+               volume=Decimal('14452.68614')),
+
+        Candle(open_time=datetime.fromisoformat('2022-12-01 01:00+00:00'),
+               open=Decimal('17161.55'),
+               high=Decimal('17170.32'),
+               low=Decimal('17105.37'),
+               close=Decimal('17117.13'),
+               close_time=datetime.fromisoformat('2022-12-01 01:59:59.999000+00:00'),
+               volume=Decimal('8650.00000000')),
+
+        Candle(open_time=datetime.fromisoformat('2022-12-01 02:00+00:00'),
+               open=Decimal('17117.13'),
+               high=Decimal('17142.99'),
+               low=Decimal('17088.01'),
+               close=Decimal('17123.98'),
+               close_time=datetime.fromisoformat('2022-12-01 02:59:59.999000+00:00'),
+               volume=Decimal('NaN')),
+    ]
+
+
+def _candles_equal(first_candle: Candle, second_candle: Candle) -> bool:
+    return (first_candle.open_time == second_candle.open_time and \
+            first_candle.open == second_candle.open and \
+            first_candle.high == second_candle.high and \
+            first_candle.low == second_candle.low and \
+            first_candle.close == second_candle.close and \
+            first_candle.close_time == second_candle.close_time and \
+            (first_candle.volume == second_candle.volume or \
+                first_candle.volume.is_nan() and second_candle.volume.is_nan()))
+
+
+def test_columns_round_trip(sample_h1_candles, tmp_path):
+    """
+    Ensure that candles converted to columns, saved and loaded back
+    are equal to the original ones.
+    """
+    filename = str(tmp_path / 'candles.npz')
+    CandleColumns.from_candles(sample_h1_candles).save(filename)
+    columns = CandleColumns.load(filename)
+
+    assert len(columns) == len(sample_h1_candles)
+    assert all(map(_candles_equal, columns, sample_h1_candles))
+
+
+def test_columns_factory_date_range(sample_h1_candles):
+    """
+    Ensure that provider created by `CandleColumnsFactory` yields 
+    only candles with `since` <= open_time < `until`.
+    """
+    columns = CandleColumns.from_candles(sample_h1_candles)
+    factory = CandleColumnsFactory(columns, "BTCUSDT", tf.H1)
+    since = datetime.fromisoformat('2022-12-01 00:30+00:00')
+    until = datetime.fromisoformat('2022-12-01 02:00+00:00')
+
+    candles = list(factory.create(since, until))
+    assert len(candles) == 1
+    assert _candles_equal(candles[0], sample_h1_candles[1])
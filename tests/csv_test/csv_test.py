@@ -1,9 +1,15 @@
 import os
+import sys
+import gzip
+import shutil
+import zipfile
 import typing as t
 from datetime import datetime
 from decimal import Decimal
+from pytest import importorskip, mark, raises
 from backintime.data.data_provider import DataProviderError
 from backintime.timeframes import Timeframes as tf
+from backintime.analyser.indicators.constants import HIGH, LOW, CLOSE
 from backintime.data.csv import (
     CSVCandlesFactory, 
     Candle, 
@@ -95,3 +101,340 @@ def test_not_found_date_will_raise():
         date_not_found_raised = True
     assert date_not_found_raised
 
+
+
+def test_indexed_candles_match_full_scan(tmp_path):
+    """
+    Ensure that reading with time index yields the same candles
+    as reading without it.
+    """
+    dirname = os.path.dirname(__file__)
+    test_file = tmp_path / 'test_h4_candles.csv'
+    shutil.copy(os.path.join(dirname, 'test_h4_candles.csv'), test_file)
+    since = datetime.fromisoformat("2018-01-04 08:00+00:00")
+    until = datetime.fromisoformat("2018-01-06 16:00+00:00")
+
+    expected = CSVCandlesFactory(str(test_file), "BTCUSDT", tf.H4, 
+                                 use_index=False)
+    factory = CSVCandlesFactory(str(test_file), "BTCUSDT", tf.H4, 
+                                use_index=True, index_stride=4)
+    expected = list(expected.create(since, until))
+    candles = list(factory.create(since, until))
+
+    assert os.path.exists(f"{test_file}.idx")
+    assert len(candles) == len(expected)
+    assert all(map(_candles_equal, candles, expected))
+
+
+def test_index_is_rebuilt_on_file_change(tmp_path):
+    """Ensure that time index is rebuilt when the file is modified."""
+    dirname = os.path.dirname(__file__)
+    with open(os.path.join(dirname, 'test_h4_candles.csv')) as csvfile:
+        rows = csvfile.readlines()
+    test_file = tmp_path / 'candles.csv'
+    test_file.write_text(''.join(rows[:11]))
+    since = datetime.fromisoformat("2018-01-01 00:00+00:00")
+    until = datetime.fromisoformat("2019-01-01 00:00+00:00")
+
+    factory = CSVCandlesFactory(str(test_file), "BTCUSDT", tf.H4, 
+                                use_index=True, index_stride=4)
+    assert len(list(factory.create(since, until))) == 10
+    assert len(factory.index) == 3
+
+    test_file.write_text(''.join(rows))
+    # Index must be reloaded from the sidecar file or rebuilt
+    factory = CSVCandlesFactory(str(test_file), "BTCUSDT", tf.H4, 
+                                use_index=True, index_stride=4)
+    assert len(list(factory.create(since, until))) == len(rows) - 1
+    assert len(factory.index) == (len(rows) - 1 + 3) // 4
+
+
+def test_missing_since_date_starts_from_next_candle():
+    """
+    Ensure that the first candle is the first one after `since`
+    if there is no candle with open time equal to `since`.
+    """
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, 'test_h4_candles.csv')
+    since = datetime.fromisoformat("2018-01-03 01:30+00:00")
+    until = datetime.fromisoformat("2018-01-04 00:00+00:00")
+    expected_open_time = datetime.fromisoformat("2018-01-03 04:00+00:00")
+    candles = CSVCandlesFactory(test_file, "BTCUSDT", tf.H4, 
+                                use_index=True, index_stride=2)
+    candles = candles.create(since, until)
+
+    first_candle = next(iter(candles))
+    assert first_candle.open_time == expected_open_time
+
+
+@mark.parametrize('workers', [1, 2])
+def test_range_in_data_gap_will_raise(workers, tmp_path):
+    """
+    Ensure that no candles are yielded and `DateNotFound` is raised
+    if (since, until) falls into a gap in data.
+    """
+    dirname = os.path.dirname(__file__)
+    with open(os.path.join(dirname, 'test_h4_candles.csv')) as csvfile:
+        rows = csvfile.readlines()
+    test_file = tmp_path / 'candles.csv'
+    # Drop candles of 2018-01-03
+    test_file.write_text(''.join(row for row in rows 
+                                    if not row.startswith('2018-01-03')))
+    since = datetime.fromisoformat("2018-01-03 04:00+00:00")
+    until = datetime.fromisoformat("2018-01-03 12:00+00:00")
+    factory = CSVCandlesFactory(str(test_file), "BTCUSDT", tf.H4, 
+                                workers=workers, chunk_size=256)
+    candles = []
+    date_not_found_raised = False
+
+    try:
+        for candle in factory.create(since, until):
+            candles.append(candle)
+    except DateNotFound:
+        date_not_found_raised = True
+    assert date_not_found_raised
+    assert not candles
+
+
+@mark.parametrize('workers', [1, 2])
+def test_range_without_rows_raises_for_columns(workers):
+    """
+    Ensure that reading columns of a range without rows raises
+    `DateNotFound`, as iteration does, regardless of `workers`.
+    """
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, 'test_h4_candles.csv')
+    since = datetime.fromisoformat("2030-01-01 00:00+00:00")
+    until = datetime.fromisoformat("2030-02-01 00:00+00:00")
+    factory = CSVCandlesFactory(test_file, "BTCUSDT", tf.H4, 
+                                workers=workers, chunk_size=256)
+    candles = factory.create(since, until)
+
+    with raises(DateNotFound):
+        list(candles)
+    with raises(DateNotFound):
+        candles.read_columns()
+    with raises(DateNotFound):
+        factory.load_columns(since, until)
+    with raises(DateNotFound):
+        list(factory.iter_columns(since, until))
+
+
+@mark.parametrize('workers', [1, 2])
+def test_empty_range_yields_nothing(workers):
+    """Ensure that no candles are yielded if `since` equals `until`."""
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, 'test_h4_candles.csv')
+    since = datetime.fromisoformat("2018-01-03 04:00+00:00")
+    factory = CSVCandlesFactory(test_file, "BTCUSDT", tf.H4, workers=workers)
+
+    assert list(factory.create(since, since)) == []
+    assert len(factory.create(since, since).read_columns()) == 0
+
+
+@mark.parametrize('workers', [1, 2])
+def test_file_is_read_with_encoding(workers, tmp_path):
+    """
+    Ensure that the file, its index and chunks are all read 
+    with `encoding`.
+    """
+    dirname = os.path.dirname(__file__)
+    with open(os.path.join(dirname, 'test_h4_candles.csv')) as csvfile:
+        rows = csvfile.read()
+    test_file = tmp_path / 'candles.csv'
+    test_file.write_bytes(("Öffnungszeit;Eröffnung\n" + rows)
+                            .encode('latin-1'))
+    since = datetime.fromisoformat("2018-01-02 00:00+00:00")
+    until = datetime.fromisoformat("2018-01-03 00:00+00:00")
+    factory = CSVCandlesFactory(str(test_file), "BTCUSDT", tf.H4, 
+                                use_index=True, index_stride=2,
+                                workers=workers, encoding='latin-1')
+
+    assert len(list(factory.create(since, until))) == 6
+    assert len(factory.load_columns(since, until)) == 6
+
+
+def test_index_is_not_written_by_default(tmp_path):
+    """Ensure that time index isn't stored next to the file by default."""
+    dirname = os.path.dirname(__file__)
+    test_file = tmp_path / 'candles.csv'
+    shutil.copy(os.path.join(dirname, 'test_h4_candles.csv'), test_file)
+    since = datetime.fromisoformat("2018-01-02 00:00+00:00")
+    until = datetime.fromisoformat("2018-01-03 00:00+00:00")
+
+    factory = CSVCandlesFactory(str(test_file), "BTCUSDT", tf.H4)
+    assert len(list(factory.create(since, until))) == 6
+    assert not os.path.exists(f"{test_file}.idx")
+
+
+def test_parallel_parsing_matches_sequential():
+    """
+    Ensure that parsing file in chunks with a pool of processes
+    yields the same candles as sequential parsing, 
+    including rows that cross chunk borders.
+    """
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, 'test_h4_candles.csv')
+    since = datetime.fromisoformat("2018-01-02 00:00+00:00")
+    until = datetime.fromisoformat("2018-01-07 00:00+00:00")
+
+    expected = CSVCandlesFactory(test_file, "BTCUSDT", tf.H4)
+    factory = CSVCandlesFactory(test_file, "BTCUSDT", tf.H4, 
+                                workers=2, chunk_size=100)
+    expected = list(expected.create(since, until))
+    candles = list(factory.create(since, until))
+
+    assert len(candles) == len(expected)
+    assert all(map(_candles_equal, candles, expected))
+
+
+def test_parallel_parsing_keeps_exact_prices(tmp_path):
+    """
+    Ensure that parsing in a pool of processes yields exactly 
+    the same prices as sequential parsing, including trailing zeros
+    and values with more than 15 significant digits.
+    """
+    test_file = tmp_path / 'candles.csv'
+    rows = [ 'open_time;open;high;low;close;close_time;volume\n' ]
+    for day in range(1, 29):
+        rows.append(f"2018-02-{day:02d} 00:00:00+00:00;100.50000000;"
+                    f"12345.678901234567891;0.000000012345678901;"
+                    f"{day}.10;2018-02-{day:02d} 23:59:59.999000+00:00;"
+                    f"98765432109876.54321\n")
+    test_file.write_text(''.join(rows))
+    since = datetime.fromisoformat("2018-02-01 00:00+00:00")
+    until = datetime.fromisoformat("2018-03-01 00:00+00:00")
+
+    expected = CSVCandlesFactory(str(test_file), "BTCUSDT", tf.D1)
+    factory = CSVCandlesFactory(str(test_file), "BTCUSDT", tf.D1, 
+                                workers=4, chunk_size=256)
+    expected = list(expected.create(since, until))
+    candles = list(factory.create(since, until))
+
+    assert len(candles) == len(expected) == 28
+    for candle, expected_candle in zip(candles, expected):
+        assert candle.open_time == expected_candle.open_time
+        assert candle.close_time == expected_candle.close_time
+        for name in ('open', 'high', 'low', 'close', 'volume'):
+            assert str(getattr(candle, name)) == \
+                    str(getattr(expected_candle, name))
+
+
+def test_load_columns_of_whole_file():
+    """Ensure that all rows of a file are loaded into columns."""
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, 'test_h4_candles.csv')
+    with open(test_file) as csvfile:
+        expected_len = len(csvfile.readlines()) - 1
+    factory = CSVCandlesFactory(test_file, "BTCUSDT", tf.H4, 
+                                workers=2, chunk_size=256)
+
+    columns = factory.load_columns()
+    assert len(columns) == expected_len
+    assert columns.is_sorted()
+
+
+@mark.parametrize('workers', [1, 2])
+def test_buffer_size_is_used_for_archives(workers, tmp_path, monkeypatch):
+    """
+    Ensure that archives are decompressed with buffers of 
+    `buffer_size`, whether candles are parsed in one process or more.
+    """
+    from backintime.data import csv as csv_module
+    dirname = os.path.dirname(__file__)
+    filename = _compress(os.path.join(dirname, 'test_h4_candles.csv'),
+                         tmp_path, '.gz')
+    buffer_sizes = []
+    open_members = csv_module.open_members
+
+    def spy(filename: str, buffer_size: int, encoding: str):
+        buffer_sizes.append(buffer_size)
+        return open_members(filename, buffer_size, encoding)
+
+    monkeypatch.setattr(csv_module, 'open_members', spy)
+    since = datetime.fromisoformat("2018-01-02 00:00+00:00")
+    until = datetime.fromisoformat("2018-01-03 00:00+00:00")
+    factory = CSVCandlesFactory(filename, "BTCUSDT", tf.H4, 
+                                workers=workers, buffer_size=4096)
+    assert len(list(factory.create(since, until))) == 6
+    assert len(factory.load_columns(since, until)) == 6
+    assert buffer_sizes and set(buffer_sizes) == {4096}
+
+
+def _compress(test_file: str, directory, suffix: str) -> str:
+    """Write content of `test_file` to an archive of type `suffix`."""
+    with open(test_file, 'rb') as csvfile:
+        data = csvfile.read()
+    filename = str(directory / f"candles.csv{suffix}")
+    if suffix == '.gz':
+        with gzip.open(filename, 'wb') as archive:
+            archive.write(data)
+    elif suffix == '.zst':
+        zstandard = importorskip('zstandard')
+        with open(filename, 'wb') as archive:
+            archive.write(zstandard.ZstdCompressor().compress(data))
+    elif suffix == '.zip':
+        # Split into two members, each with header, in reversed order
+        header, *rows = data.decode().splitlines(keepends=True)
+        half = len(rows) // 2
+        with zipfile.ZipFile(filename, 'w') as archive:
+            archive.writestr('candles-2.csv', ''.join([header, *rows[half:]]))
+            archive.writestr('candles-1.csv', ''.join([header, *rows[:half]]))
+    return filename
+
+
+@mark.parametrize('suffix', ['.gz', '.zst', '.zip'])
+@mark.parametrize('workers', [1, 2])
+def test_compressed_candles_match_plain(suffix, workers, tmp_path):
+    """
+    Ensure that candles read from compressed file match candles 
+    read from plain CSV file.
+    """
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, 'test_h4_candles.csv')
+    compressed_file = _compress(test_file, tmp_path, suffix)
+    since = datetime.fromisoformat("2018-01-02 00:00+00:00")
+    until = datetime.fromisoformat("2018-01-06 00:00+00:00")
+
+    expected = CSVCandlesFactory(test_file, "BTCUSDT", tf.H4)
+    factory = CSVCandlesFactory(compressed_file, "BTCUSDT", tf.H4, 
+                                workers=workers, chunk_size=512)
+    expected = list(expected.create(since, until))
+    candles = list(factory.create(since, until))
+
+    assert factory.index is None
+    assert len(candles) == len(expected)
+    assert all(map(_candles_equal, candles, expected))
+
+
+def test_missing_zstandard_will_raise_with_hint(monkeypatch):
+    """
+    Ensure that `.zst` file without `zstandard` installed raises
+    `ImportError` with install hint when the factory is created.
+    """
+    monkeypatch.setitem(sys.modules, 'zstandard', None)
+    with raises(ImportError, match=r'backintime\[zstd\]'):
+        CSVCandlesFactory('candles.csv.zst', "BTCUSDT", tf.H4)
+
+@mark.parametrize('workers', [1, 2])
+def test_projected_factory_skips_unused_columns(workers):
+    """
+    Ensure that projected factory parses only required prices
+    and sets the others to NaN.
+    """
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, 'test_h4_candles.csv')
+    since = datetime.fromisoformat("2018-01-02 00:00+00:00")
+    until = datetime.fromisoformat("2018-01-06 00:00+00:00")
+
+    factory = CSVCandlesFactory(test_file, "BTCUSDT", tf.H4, 
+                                workers=workers, chunk_size=512)
+    projected = factory.project({ HIGH, LOW, CLOSE })
+    expected = list(factory.create(since, until))
+    candles = list(projected.create(since, until))
+
+    assert len(candles) == len(expected)
+    assert all(candle.open.is_nan() and candle.volume.is_nan()
+                    for candle in candles)
+    assert all(x.close == y.close and x.high == y.high and x.low == y.low
+                    for x, y in zip(candles, expected))
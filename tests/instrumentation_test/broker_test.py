@@ -0,0 +1,116 @@
+import numpy
+from decimal import Decimal
+from datetime import datetime, timedelta
+from backintime.data.candle import Candle
+from backintime.broker.default.fees import FeesEstimator
+from backintime.broker.base import (
+    OrderSide,
+    LimitOrderOptions,
+    TakeProfitOptions,
+    StopLossOptions
+)
+from backintime.trading_strategy import TradingStrategy
+from backintime.timeframes import Timeframes as tf
+from backintime.data.columns import CandleColumns, CandleColumnsFactory
+from backintime.utils import run_backtest
+from backintime.instrumentation import BrokerMonitor, InstrumentedBroker
+
+
+def _candle(open: int, high: int, low: int, close: int) -> Candle:
+    return Candle(open_time=datetime.now(),
+                  open=Decimal(open),
+                  high=Decimal(high),
+                  low=Decimal(low),
+                  close=Decimal(close),
+                  close_time=datetime.now(),
+                  volume=Decimal(10_000))
+
+
+def test_broker_stats():
+    """
+    Ensure that orders scanned, activations, executions
+    and cancellations are counted.
+    """
+    fees = FeesEstimator(Decimal('0.001'), Decimal('0.001'))
+    broker = InstrumentedBroker(Decimal(10_000), fees)
+    # Won't be executed
+    far_buy = broker.submit_limit_order(
+                LimitOrderOptions(OrderSide.BUY, Decimal(100), Decimal(10)))
+    take_profit = TakeProfitOptions(trigger_price=Decimal(1200), 
+                                    percentage_amount=Decimal(100))
+    stop_loss = StopLossOptions(trigger_price=Decimal(500), 
+                                percentage_amount=Decimal(100))
+    broker.submit_limit_order(
+        LimitOrderOptions(OrderSide.BUY, Decimal(1000), Decimal(1000),
+                          take_profit=take_profit, stop_loss=stop_loss))
+    # Limit BUY is executed, TP/SL are submitted
+    broker.update(_candle(1050, 1100, 950, 1000))
+    # TP is activated
+    broker.update(_candle(1100, 1250, 1050, 1200))
+    broker.cancel_order(far_buy.order_id)
+    # TP is executed as market order, SL is cancelled
+    broker.update(_candle(1200, 1250, 1150, 1200))
+    stats = broker.stats
+
+    assert stats.updates == 3
+    assert stats.scanned == 2 + 3 + 3
+    assert stats.max_scanned == 3
+    assert stats.mean_scanned == 8/3
+    assert stats.peak_open_orders == 3
+    assert stats.activations == 1
+    assert stats.executions == 2
+    assert stats.cancellations == 1
+    assert stats.system_cancellations == 1
+    assert stats.matching_ns > 0 and stats.execution_ns > 0
+
+
+def test_open_orders_are_tracked_between_updates():
+    """
+    Ensure that open orders are counted as they are submitted
+    and cancelled, including the peak between updates.
+    """
+    fees = FeesEstimator(Decimal('0.001'), Decimal('0.001'))
+    broker = InstrumentedBroker(Decimal(10_000), fees)
+    take_profit = TakeProfitOptions(trigger_price=Decimal(1200), 
+                                    percentage_amount=Decimal(100))
+    orders = [ broker.submit_limit_order(
+                    LimitOrderOptions(OrderSide.BUY, Decimal(100), 
+                                      Decimal(10), take_profit=take_profit))
+                for _ in range(3) ]
+    for order in orders[1:]:
+        broker.cancel_order(order.order_id)
+    assert broker.open_orders == 1
+
+    broker.update(_candle(1050, 1100, 950, 1000))
+    assert broker.stats.peak_open_orders == 3
+    # Limit BUY is executed, TP is submitted and then activated
+    broker.update(_candle(150, 150, 50, 100))
+    broker.update(_candle(1100, 1250, 1050, 1200))
+    assert broker.open_orders == 1
+
+
+def test_broker_stats_are_reported():
+    """Ensure that broker stats are added to backtesting result."""
+    class MyStrategy(TradingStrategy):
+        def tick(self):
+            if not self.position:
+                self.buy()
+            else:
+                self.sell()
+
+    start = round(datetime.fromisoformat('2022-12-01 00:00+00:00')
+                    .timestamp()*1000)
+    open_time = start + numpy.arange(10, dtype=numpy.int64)*3600_000
+    prices = numpy.full(10, 100.0)
+    columns = CandleColumns(open_time, open_time + 3600_000 - 1,
+                            prices, prices + 1, prices - 1, prices, prices)
+    factory = CandleColumnsFactory(columns, 'BTCUSDT', tf.H1)
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    result = run_backtest(MyStrategy, factory, 10_000, since, 
+                          since + timedelta(hours=10), '0.001', '0.001',
+                          instruments=[BrokerMonitor()])
+    stats = result.reports['broker']
+
+    assert stats.updates == 10
+    assert stats.executions == result.trades_count == 9
+    assert stats.max_scanned == 1
@@ -0,0 +1,57 @@
+import numpy
+from datetime import datetime, timedelta
+from pytest import fixture
+from backintime.trading_strategy import TradingStrategy
+from backintime.timeframes import Timeframes as tf
+from backintime.analyser.indicators.constants import CLOSE
+from backintime.analyser.indicators.sma import sma_params as sma
+from backintime.analyser.indicators.rsi import rsi_params as rsi
+from backintime.data.columns import CandleColumns, CandleColumnsFactory
+from backintime.utils import run_backtest, PREFETCH_SINCE
+from backintime.instrumentation import AnalyserStats
+
+
+@fixture
+def h1_candles() -> CandleColumnsFactory:
+    """500 H1 candles since 2022-12-01."""
+    start = round(datetime.fromisoformat('2022-12-01 00:00+00:00')
+                    .timestamp()*1000)
+    open_time = start + numpy.arange(500, dtype=numpy.int64)*3600_000
+    prices = 100 + numpy.sin(numpy.arange(500)/10)
+    columns = CandleColumns(open_time, open_time + 3600_000 - 1,
+                            prices, prices + 1, prices - 1, prices, prices)
+    return CandleColumnsFactory(columns, 'BTCUSDT', tf.H1)
+
+
+def test_indicator_calls_are_counted(h1_candles):
+    """
+    Ensure that calls, input values and time are counted 
+    per indicator and arguments.
+    """
+    stats = AnalyserStats()
+
+    class MyStrategy(TradingStrategy):
+        indicators = { sma(tf.H4, period=5), rsi(tf.H1, period=14) }
+        calls_seen = []
+
+        def tick(self):
+            self.analyser.sma(tf.H4, period=5)
+            self.analyser.sma(tf.H4, period=5)
+            self.analyser.rsi(tf.H1, period=14)
+            self.calls_seen.append(
+                    stats.report().get('rsi', tf.H1, 14).calls)
+
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    result = run_backtest(MyStrategy, h1_candles, 10_000, since, 
+                          since + timedelta(hours=500), '0.001', '0.001',
+                          PREFETCH_SINCE, instruments=[stats])
+    report = result.reports['indicators']
+    ticks = len(MyStrategy.calls_seen)
+    sma_stats = report.get('sma', tf.H4, CLOSE, 5)
+
+    assert ticks > 0
+    assert MyStrategy.calls_seen == list(range(1, ticks + 1))
+    assert sma_stats.calls == 2*ticks
+    assert sma_stats.mean_values == 5
+    assert sma_stats.total_ns > 0
+    assert len(report.indicators) == 2
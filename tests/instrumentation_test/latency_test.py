@@ -0,0 +1,63 @@
+import numpy
+import time
+from datetime import datetime, timedelta
+from pytest import fixture
+from backintime.trading_strategy import TradingStrategy
+from backintime.timeframes import Timeframes as tf
+from backintime.data.columns import CandleColumns, CandleColumnsFactory
+from backintime.utils import run_backtest
+from backintime.instrumentation import LatencyHistogram, LatencyMonitor
+
+
+@fixture
+def h1_candles() -> CandleColumnsFactory:
+    """100 H1 candles since 2022-12-01."""
+    start = round(datetime.fromisoformat('2022-12-01 00:00+00:00')
+                    .timestamp()*1000)
+    open_time = start + numpy.arange(100, dtype=numpy.int64)*3600_000
+    prices = numpy.full(100, 100.0)
+    columns = CandleColumns(open_time, open_time + 3600_000 - 1,
+                            prices, prices + 1, prices - 1, prices, prices)
+    return CandleColumnsFactory(columns, 'BTCUSDT', tf.H1)
+
+
+def test_histogram_percentiles():
+    """
+    Ensure that percentiles are estimated within precision 
+    of the histogram.
+    """
+    histogram = LatencyHistogram(precision_bits=7)
+    for value in range(1, 100_001):
+        histogram.record(value*1000)
+
+    assert histogram.count == 100_000
+    assert histogram.min == 1000 and histogram.max == 100_000_000
+    for percent, expected in ((50, 50_000_000), (99, 99_000_000),
+                              (99.9, 99_900_000)):
+        assert abs(histogram.percentile(percent) - expected) \
+                    <= expected / 2**7
+
+
+def test_slowest_candles_are_reported(h1_candles):
+    """Ensure that the slowest candles are kept in descending order."""
+    slow_hours = { 10: 0.02, 42: 0.03, 77: 0.01 }
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+
+    class SlowStrategy(TradingStrategy):
+        ticks = 0
+
+        def tick(self):
+            time.sleep(slow_hours.get(self.ticks, 0))
+            self.ticks += 1
+
+    result = run_backtest(SlowStrategy, h1_candles, 10_000, since,
+                          since + timedelta(hours=100), '0.001', '0.001',
+                          instruments=[LatencyMonitor(slowest=3)])
+    report = result.reports['latency']
+    slowest = [ candle.open_time for candle in report.slowest ]
+
+    assert report.tick.count == report.candle.count == 100
+    assert slowest == [ since + timedelta(hours=hour) 
+                            for hour in (42, 10, 77) ]
+    assert report.tick.p999 >= 10_000_000
+    assert report.candle.p50 < report.tick.max
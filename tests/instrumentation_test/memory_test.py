@@ -0,0 +1,70 @@
+import numpy
+from decimal import Decimal
+from datetime import datetime, timedelta
+from pytest import fixture
+from backintime.trading_strategy import TradingStrategy
+from backintime.timeframes import Timeframes as tf
+from backintime.analyser.indicators.sma import sma_params as sma
+from backintime.data.columns import CandleColumns, CandleColumnsFactory
+from backintime.utils import run_backtest, PREFETCH_SINCE
+from backintime.instrumentation import MemoryMonitor, estimate_size
+
+
+@fixture
+def h1_candles() -> CandleColumnsFactory:
+    """200 H1 candles since 2022-12-01."""
+    start = round(datetime.fromisoformat('2022-12-01 00:00+00:00')
+                    .timestamp()*1000)
+    open_time = start + numpy.arange(200, dtype=numpy.int64)*3600_000
+    prices = numpy.full(200, 100.0)
+    columns = CandleColumns(open_time, open_time + 3600_000 - 1,
+                            prices, prices + 1, prices - 1, prices, prices)
+    return CandleColumnsFactory(columns, 'BTCUSDT', tf.H1)
+
+
+def test_estimate_size():
+    """Ensure that shared objects and array views are counted once."""
+    array = numpy.zeros(1000)
+    assert estimate_size([array, array[10:], array]) < 2*array.nbytes
+    assert estimate_size({ 'a': array }) > array.nbytes
+
+
+def test_growing_component_is_reported(h1_candles):
+    """
+    Ensure that components are sampled each `every` candles 
+    and that growing one is warned about.
+    """
+    class PilingStrategy(TradingStrategy):
+        indicators = { sma(tf.H4, period=5) }
+
+        def tick(self):
+            # Orders are never executed, so they pile up
+            self.limit_buy(Decimal(1), amount=Decimal(10))
+
+    monitor = MemoryMonitor(every=20, window=3, min_growth=1000)
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    result = run_backtest(PilingStrategy, h1_candles, 10_000, since, 
+                          since + timedelta(hours=200), '0.001', '0.001',
+                          PREFETCH_SINCE, instruments=[monitor])
+    report = result.reports['memory']
+    orders = [ sample.components['orders'] for sample in report.samples ]
+
+    assert len(report.samples) > 3
+    assert 'analyser:H4:CLOSE' in report.samples[-1].components
+    assert orders == sorted(orders) and orders[-1] > orders[0]
+    assert len(report.warnings) == 1 and 'orders' in report.warnings[0]
+
+
+def test_memory_is_traced(h1_candles):
+    """Ensure that allocations are traced if `trace` is True."""
+    class IdleStrategy(TradingStrategy):
+        def tick(self):
+            pass
+
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    result = run_backtest(IdleStrategy, h1_candles, 10_000, since, 
+                          since + timedelta(hours=200), '0.001', '0.001',
+                          instruments=[MemoryMonitor(every=100, trace=True)])
+    last = result.reports['memory'].samples[-1]
+    assert last.traced > 0 and last.traced_peak >= last.traced
+    assert len(last.top) > 0
@@ -0,0 +1,57 @@
+import numpy
+from datetime import datetime, timedelta
+from pytest import fixture
+from backintime.trading_strategy import TradingStrategy
+from backintime.timeframes import Timeframes as tf
+from backintime.analyser.indicators.sma import sma_params as sma
+from backintime.data.columns import CandleColumns, CandleColumnsFactory
+from backintime.utils import run_backtest, PREFETCH_SINCE
+from backintime.instrumentation import Phase, PhaseProfiler
+
+
+class _Strategy(TradingStrategy):
+    indicators = { sma(tf.H4, period=5) }
+    candle_timeframes = { tf.H4 }
+
+    def tick(self):
+        self.analyser.sma(tf.H4, period=5)
+        self.candles.get(tf.H4)
+
+
+@fixture
+def h1_candles() -> CandleColumnsFactory:
+    """500 H1 candles since 2022-12-01."""
+    start = round(datetime.fromisoformat('2022-12-01 00:00+00:00')
+                    .timestamp()*1000)
+    open_time = start + numpy.arange(500, dtype=numpy.int64)*3600_000
+    prices = 100 + numpy.sin(numpy.arange(500)/10)
+    columns = CandleColumns(open_time, open_time + 3600_000 - 1,
+                            prices, prices + 1, prices - 1, prices, prices)
+    return CandleColumnsFactory(columns, 'BTCUSDT', tf.H1)
+
+
+def test_phases_are_profiled(h1_candles):
+    """Ensure that time and calls of each phase are accumulated."""
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    until = since + timedelta(hours=500)
+    result = run_backtest(_Strategy, h1_candles, 10_000, since, until, 
+                          '0.001', '0.001', PREFETCH_SINCE, 
+                          instruments=[PhaseProfiler()])
+    report = result.reports['profile']
+    processed = report[Phase.BROKER].calls
+
+    assert processed > 0
+    for phase in (Phase.DATA, Phase.CANDLES, Phase.ANALYSER, Phase.TICK):
+        assert report[phase].calls == processed
+    assert report[Phase.PREFETCH].calls == 1
+    assert report[Phase.SKIP].calls == 0
+    assert report.total_ns > report[Phase.TICK].total_ns > 0
+
+
+def test_no_reports_without_instruments(h1_candles):
+    """Ensure that reports are empty if no instruments are passed."""
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    until = since + timedelta(hours=500)
+    result = run_backtest(_Strategy, h1_candles, 10_000, since, until, 
+                          '0.001', '0.001')
+    assert result.reports == {}
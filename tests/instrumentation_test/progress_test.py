@@ -0,0 +1,84 @@
+import numpy
+from datetime import datetime, timedelta
+from pytest import fixture
+from backintime.trading_strategy import TradingStrategy
+from backintime.timeframes import Timeframes as tf
+from backintime.data.columns import CandleColumns, CandleColumnsFactory
+from backintime import utils
+from backintime.engine import Engine
+from backintime.utils import run_backtest
+from backintime.instrumentation import ProgressMonitor
+
+
+class _IdleStrategy(TradingStrategy):
+    def tick(self):
+        pass
+
+
+@fixture
+def h1_candles() -> CandleColumnsFactory:
+    """100 H1 candles since 2022-12-01."""
+    start = round(datetime.fromisoformat('2022-12-01 00:00+00:00')
+                    .timestamp()*1000)
+    open_time = start + numpy.arange(100, dtype=numpy.int64)*3600_000
+    prices = numpy.full(100, 100.0)
+    columns = CandleColumns(open_time, open_time + 3600_000 - 1,
+                            prices, prices + 1, prices - 1, prices, prices)
+    return CandleColumnsFactory(columns, 'BTCUSDT', tf.H1)
+
+
+def test_progress_is_reported_each_n_candles(h1_candles):
+    """
+    Ensure that progress is reported each `every` candles
+    and when the run is finished.
+    """
+    reported = []
+    monitor = ProgressMonitor(reported.append, every=25, interval=None)
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    until = since + timedelta(hours=100)
+    run_backtest(_IdleStrategy, h1_candles, 10_000, since, until, 
+                 '0.001', '0.001', instruments=[monitor])
+
+    assert [ progress.candles for progress in reported ] == \
+                [25, 50, 75, 100, 100]
+    assert reported[1].time == since + timedelta(hours=50, milliseconds=-1)
+    assert abs(reported[1].fraction - 0.5) < 1e-6
+    assert reported[1].eta is not None
+    assert reported[-1].equity == 10_000
+    assert all(progress.candles_per_second > 0 for progress in reported)
+
+
+def test_on_progress_callback(h1_candles):
+    """Ensure that `on_progress` is called when the run is finished."""
+    reported = []
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    until = since + timedelta(hours=100)
+    result = run_backtest(_IdleStrategy, h1_candles, 10_000, since, until, 
+                          '0.001', '0.001', on_progress=reported.append)
+
+    assert len(reported) == 1 and reported[0].candles == 100
+    assert result.reports['progress'] == reported[0]
+
+
+def test_on_progress_keeps_plain_components(h1_candles, monkeypatch):
+    """
+    Ensure that `on_progress` alone doesn't switch the run 
+    to instrumented engine, broker and analyser.
+    """
+    engines = []
+    class SpyEngine(Engine):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            engines.append(self)
+
+    monkeypatch.setattr(utils, 'Engine', SpyEngine)
+    reported = []
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    until = since + timedelta(hours=100)
+    run_backtest(_IdleStrategy, h1_candles, 10_000, since, until, 
+                 '0.001', '0.001', on_progress=reported.append)
+
+    assert len(engines) == 1
+    assert type(engines[0].broker) is utils.Broker
+    assert type(engines[0].strategy.analyser) is utils.Analyser
+    assert reported[-1].candles == 100
@@ -0,0 +1,161 @@
+import numpy
+import urllib.request
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+from pytest import fixture
+from backintime.trading_strategy import TradingStrategy
+from backintime.broker.base import InsufficientFunds
+from backintime.timeframes import Timeframes as tf
+from backintime.data.columns import CandleColumns, CandleColumnsFactory
+from backintime.utils import run_backtest
+from backintime.instrumentation import (
+    MetricsRegistry,
+    MetricsServer,
+    PrometheusMonitor
+)
+
+
+class _IdleStrategy(TradingStrategy):
+    title = 'idle'
+
+    def tick(self):
+        pass
+
+
+class _FailingStrategy(TradingStrategy):
+    title = 'failing'
+
+    def tick(self):
+        raise RuntimeError("Oops")
+
+
+class _BrokeStrategy(TradingStrategy):
+    title = 'broke'
+
+    def tick(self):
+        raise InsufficientFunds()
+
+
+@fixture
+def h1_candles() -> CandleColumnsFactory:
+    """100 H1 candles since 2022-12-01."""
+    start = round(datetime.fromisoformat('2022-12-01 00:00+00:00')
+                    .timestamp()*1000)
+    open_time = start + numpy.arange(100, dtype=numpy.int64)*3600_000
+    prices = numpy.full(100, 100.0)
+    columns = CandleColumns(open_time, open_time + 3600_000 - 1,
+                            prices, prices + 1, prices - 1, prices, prices)
+    return CandleColumnsFactory(columns, 'BTCUSDT', tf.H1)
+
+
+def _run(strategy_t, factory, monitor):
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    return run_backtest(strategy_t, factory, 10_000, since, 
+                        since + timedelta(hours=100), '0.001', '0.001',
+                        instruments=[monitor])
+
+
+def test_render():
+    """Ensure that metrics are rendered in Prometheus text format."""
+    registry = MetricsRegistry()
+    registry.inc('runs_total', 'Runs.', status='ok')
+    registry.inc('runs_total', 'Runs.', 2, status='ok')
+    registry.set('open_orders', 'Open orders.', 5, strategy='a"b')
+    assert registry.render() == (
+        '# HELP runs_total Runs.\n'
+        '# TYPE runs_total counter\n'
+        'runs_total{status="ok"} 3.0\n'
+        '# HELP open_orders Open orders.\n'
+        '# TYPE open_orders gauge\n'
+        'open_orders{strategy="a\\"b"} 5.0\n')
+
+
+def test_runs_are_counted(h1_candles, tmp_path):
+    """
+    Ensure that candles and completed and failed runs are counted,
+    and written to textfile.
+    """
+    registry = MetricsRegistry()
+    textfile = str(tmp_path/'backintime.prom')
+    _run(_IdleStrategy, h1_candles, PrometheusMonitor(registry, textfile))
+    _run(_IdleStrategy, h1_candles, PrometheusMonitor(registry))
+    try:
+        _run(_FailingStrategy, h1_candles, PrometheusMonitor(registry))
+    except RuntimeError:
+        pass
+
+    get = registry.get
+    assert get('backintime_candles_processed_total', strategy='idle') == 200
+    assert get('backintime_runs_total', 
+               strategy='idle', status='completed') == 2
+    assert get('backintime_runs_total', 
+               strategy='failing', status='failed') == 1
+    assert get('backintime_phase_seconds_total', 
+               strategy='idle', phase='tick') > 0
+    with open(textfile) as file:
+        assert 'backintime_candles_processed_total{strategy="idle"} 100.0' \
+                    in file.read()
+
+
+def test_monitor_is_reset_between_runs(h1_candles):
+    """
+    Ensure that a reused monitor counts each run, and that runs
+    stopped by expected errors aren't counted as failed.
+    """
+    registry = MetricsRegistry()
+    monitor = PrometheusMonitor(registry)
+    try:
+        _run(_FailingStrategy, h1_candles, monitor)
+    except RuntimeError:
+        pass
+    _run(_BrokeStrategy, h1_candles, monitor)
+    _run(_IdleStrategy, h1_candles, monitor)
+
+    get = registry.get
+    assert get('backintime_runs_total', 
+               strategy='failing', status='failed') == 1
+    assert get('backintime_runs_total', 
+               strategy='broke', status='stopped') == 1
+    assert get('backintime_runs_total', 
+               strategy='broke', status='failed') is None
+    assert get('backintime_runs_total', 
+               strategy='idle', status='completed') == 1
+    assert get('backintime_candles_processed_total', strategy='idle') == 100
+
+
+def test_open_orders_are_labelled_by_run():
+    """
+    Ensure that open orders of concurrent runs of the same strategy
+    are kept apart and removed once each run is finished.
+    """
+    registry = MetricsRegistry()
+    monitors = [ PrometheusMonitor(registry) for _ in range(2) ]
+    for monitor, open_orders in zip(monitors, (2, 5)):
+        context = SimpleNamespace(strategy=_IdleStrategy, 
+                                  broker=SimpleNamespace(
+                                            open_orders=open_orders))
+        monitor.on_start(context)
+
+    first, second = monitors
+    assert first.run_id != second.run_id
+    get = lambda monitor: registry.get('backintime_open_orders', 
+                                       strategy='idle', run=monitor.run_id)
+    assert get(first) == 2 and get(second) == 5
+    first.on_finish()
+    assert get(first) is None and get(second) == 5
+
+def test_metrics_are_served(h1_candles):
+    """Ensure that metrics are served over HTTP."""
+    registry = MetricsRegistry()
+    server = MetricsServer(port=0, registry=registry).start()
+    try:
+        _run(_IdleStrategy, h1_candles, PrometheusMonitor(registry))
+        url = f"http://127.0.0.1:{server.port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+    finally:
+        server.stop()
+    assert 'backintime_worker_resident_memory_bytes{worker=' in body
+    # Open orders of the finished run are removed
+    assert '# TYPE backintime_open_orders gauge' in body
+    assert 'backintime_open_orders{' not in body
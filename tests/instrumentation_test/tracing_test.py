@@ -0,0 +1,70 @@
+import json
+import numpy
+from datetime import datetime, timedelta
+from pytest import fixture
+from backintime.trading_strategy import TradingStrategy
+from backintime.timeframes import Timeframes as tf
+from backintime.analyser.indicators.sma import sma_params as sma
+from backintime.data.columns import CandleColumns, CandleColumnsFactory
+from backintime.utils import run_backtest, PREFETCH_SINCE
+from backintime.instrumentation import ChromeTracer
+
+
+class _Strategy(TradingStrategy):
+    indicators = { sma(tf.H4, period=5) }
+    candle_timeframes = { tf.H4 }
+
+    def tick(self):
+        self.analyser.sma(tf.H4, period=5)
+
+
+@fixture
+def h1_candles() -> CandleColumnsFactory:
+    """500 H1 candles since 2022-12-01."""
+    start = round(datetime.fromisoformat('2022-12-01 00:00+00:00')
+                    .timestamp()*1000)
+    open_time = start + numpy.arange(500, dtype=numpy.int64)*3600_000
+    prices = 100 + numpy.sin(numpy.arange(500)/10)
+    columns = CandleColumns(open_time, open_time + 3600_000 - 1,
+                            prices, prices + 1, prices - 1, prices, prices)
+    return CandleColumnsFactory(columns, 'BTCUSDT', tf.H1)
+
+
+def _run(factory: CandleColumnsFactory, tracer: ChromeTracer):
+    since = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    until = since + timedelta(hours=500)
+    return run_backtest(_Strategy, factory, 10_000, since, until, 
+                        '0.001', '0.001', PREFETCH_SINCE, 
+                        instruments=[tracer])
+
+
+def test_trace_is_saved_in_chrome_format(h1_candles, tmp_path):
+    """
+    Ensure that sampled candles are saved as Chrome trace spans, 
+    along with their phases and indicator calculations.
+    """
+    path = str(tmp_path/'trace.json')
+    tracer = ChromeTracer(path, sample_every=10)
+    result = _run(h1_candles, tracer)
+    with tracer.span('export'):
+        result.get_stats('FIFO')
+    with open(path) as file:
+        events = json.load(file)['traceEvents']
+
+    spans = [ event for event in events if event['ph'] == 'X' ]
+    names = [ event['name'] for event in spans ]
+    candles = names.count('candle')
+    assert names.count('prefetch') == 1
+    assert 0 < candles < 50
+    assert names.count('tick') == names.count('sma') == candles
+    assert all(event['dur'] >= 0 for event in spans)
+    assert 'export' in [ event['name'] for event in tracer.events ]
+    assert result.reports['trace'].events == len(spans)
+
+
+def test_trace_size_is_bounded(h1_candles):
+    """Ensure that events over `max_events` are dropped."""
+    tracer = ChromeTracer(max_events=100)
+    report = _run(h1_candles, tracer).reports['trace']
+    assert report.events == 100
+    assert report.dropped > 0
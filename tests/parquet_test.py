@@ -0,0 +1,127 @@
+import os
+import typing as t
+from datetime import datetime
+from pytest import fixture, importorskip
+from backintime.timeframes import Timeframes as tf
+from backintime.data.candle import Candle
+from backintime.data.csv import CSVCandlesFactory
+from backintime.data.data_provider import ParsingError
+
+pyarrow = importorskip('pyarrow')
+import pyarrow.parquet as pq
+from backintime.data.parquet import (
+    ParquetCandlesFactory,
+    ParquetCandlesSchema,
+    _select_row_groups
+)
+
+
+def _candles_equal(first_candle: Candle, second_candle: Candle) -> bool:
+    return (first_candle.open_time == second_candle.open_time and \
+            first_candle.open == second_candle.open and \
+            first_candle.high == second_candle.high and \
+            first_candle.low == second_candle.low and \
+            first_candle.close == second_candle.close and \
+            first_candle.close_time == second_candle.close_time and \
+            first_candle.volume == second_candle.volume)
+
+
+@fixture
+def csv_factory() -> CSVCandlesFactory:
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, 'csv_test', 'test_h4_candles.csv')
+    return CSVCandlesFactory(test_file, "BTCUSDT", tf.H4)
+
+
+@fixture
+def parquet_file(csv_factory, tmp_path) -> str:
+    """Parquet file with timestamp columns and row groups of 8 rows."""
+    columns = csv_factory.load_columns()
+    data = columns.as_dict()
+    time_type = pyarrow.timestamp('ms', tz='UTC')
+    table = pyarrow.table({
+        name: pyarrow.array(values, type=time_type) \
+                if name.endswith('_time') else values 
+            for name, values in data.items()
+    })
+    filename = str(tmp_path / 'candles.parquet')
+    pq.write_table(table, filename, row_group_size=8)
+    return filename
+
+
+def test_parquet_candles_match_csv(csv_factory, parquet_file):
+    """
+    Ensure that Parquet provider yields the same candles 
+    as CSV provider for the same date range.
+    """
+    since = datetime.fromisoformat("2018-01-03 08:00+00:00")
+    until = datetime.fromisoformat("2018-01-06 04:00+00:00")
+    factory = ParquetCandlesFactory(parquet_file, "BTCUSDT", tf.H4, 
+                                    batch_size=5)
+    expected = list(csv_factory.create(since, until))
+    candles = list(factory.create(since, until))
+
+    assert len(candles) == len(expected)
+    assert all(map(_candles_equal, candles, expected))
+
+
+def test_time_filter_is_pushed_down_to_row_groups(parquet_file):
+    """Ensure that only row groups overlapping date range are read."""
+    since = datetime.fromisoformat("2018-01-03 08:00+00:00")
+    until = datetime.fromisoformat("2018-01-04 08:00+00:00")
+    parquet = pq.ParquetFile(parquet_file)
+    since_ms = int(since.timestamp() * 1000)
+    until_ms = int(until.timestamp() * 1000)
+
+    row_groups = _select_row_groups(parquet, 'open_time', 
+                                    since_ms, until_ms)
+    assert 0 < len(row_groups) < parquet.metadata.num_row_groups
+
+
+def test_custom_schema_with_integer_times(csv_factory, tmp_path):
+    """Ensure that columns are mapped with schema."""
+    data = csv_factory.load_columns().as_dict()
+    table = pyarrow.table({
+        't': data['open_time'], 'ct': data['close_time'],
+        'o': data['open'], 'h': data['high'], 
+        'l': data['low'], 'c': data['close']
+    })
+    filename = str(tmp_path / 'candles.parquet')
+    pq.write_table(table, filename)
+    schema = ParquetCandlesSchema(open_time='t', close_time='ct', 
+                                  open='o', high='h', low='l', 
+                                  close='c', volume=None)
+    since = datetime.fromisoformat("2018-01-03 08:00+00:00")
+    until = datetime.fromisoformat("2018-01-03 16:00+00:00")
+    factory = ParquetCandlesFactory(filename, "BTCUSDT", tf.H4, schema)
+    expected = list(csv_factory.create(since, until))
+    candles = list(factory.create(since, until))
+
+    assert len(candles) == 2
+    assert candles[1].close == expected[1].close
+    assert candles[1].volume.is_nan()
+
+
+def test_missing_column_will_raise(parquet_file):
+    """
+    Ensure that `ParsingError` naming the column is raised
+    if a column of schema is not in Parquet file.
+    """
+    since = datetime.fromisoformat("2018-01-03 08:00+00:00")
+    until = datetime.fromisoformat("2018-01-03 16:00+00:00")
+    schema = ParquetCandlesSchema(open_time='opened_at')
+    factory = ParquetCandlesFactory(parquet_file, "BTCUSDT", tf.H4, schema)
+    message = None
+
+    try:
+        list(factory.create(since, until))
+    except ParsingError as e:
+        message = str(e)
+    assert message and 'opened_at' in message
+
+    message = None
+    try:
+        _select_row_groups(pq.ParquetFile(parquet_file), 'opened_at', 0, 1)
+    except ParsingError as e:
+        message = str(e)
+    assert message and 'opened_at' in message
@@ -0,0 +1,102 @@
+import os
+import typing as t
+from datetime import datetime
+from pytest import fixture, raises
+from backintime.timeframes import Timeframes as tf
+from backintime.data.candle import Candle
+from backintime.data.csv import CSVCandlesFactory
+from backintime.data.partitioned import (
+    PartitionedCSVCandlesFactory,
+    PartitionGap,
+    PartitionOverlap
+)
+
+
+PATTERN = 'BTCUSDT-4h-%Y-%m-%d.csv'
+
+
+def _candles_equal(first_candle: Candle, second_candle: Candle) -> bool:
+    return (first_candle.open_time == second_candle.open_time and \
+            first_candle.open == second_candle.open and \
+            first_candle.high == second_candle.high and \
+            first_candle.low == second_candle.low and \
+            first_candle.close == second_candle.close and \
+            first_candle.close_time == second_candle.close_time and \
+            first_candle.volume == second_candle.volume)
+
+
+@fixture
+def test_file() -> str:
+    dirname = os.path.dirname(__file__)
+    return os.path.join(dirname, 'csv_test', 'test_h4_candles.csv')
+
+
+@fixture
+def daily_rows(test_file) -> t.Dict[str, t.List[str]]:
+    """Rows of the test file grouped by date, with header."""
+    with open(test_file) as csvfile:
+        header, *rows = csvfile.readlines()
+    partitions: t.Dict[str, t.List[str]] = {}
+    for row in rows:
+        partitions.setdefault(row[:10], [header]).append(row)
+    return partitions
+
+
+def _write_partitions(directory, partitions) -> None:
+    for date, rows in partitions.items():
+        filename = f"BTCUSDT-4h-{date}.csv"
+        (directory / filename).write_text(''.join(rows))
+
+
+def test_partitioned_candles_match_single_file(test_file, daily_rows, 
+                                               tmp_path):
+    """
+    Ensure that candles read from daily partitions match candles
+    from a single file and only overlapping partitions are opened.
+    """
+    _write_partitions(tmp_path, daily_rows)
+    since = datetime.fromisoformat("2018-01-02 08:00+00:00")
+    until = datetime.fromisoformat("2018-01-04 12:00+00:00")
+    factory = PartitionedCSVCandlesFactory(str(tmp_path), PATTERN, 
+                                           "BTCUSDT", tf.H4)
+    expected = CSVCandlesFactory(test_file, "BTCUSDT", tf.H4)
+    expected = list(expected.create(since, until))
+    candles = list(factory.create(since, until))
+
+    assert len(candles) == len(expected)
+    assert all(map(_candles_equal, candles, expected))
+    assert len(factory._partitions) == 3
+
+
+def test_overlapping_partitions(daily_rows, tmp_path):
+    """
+    Ensure that overlapping candles are yielded only once,
+    or `PartitionOverlap` is raised in strict mode.
+    """
+    daily_rows['2018-01-03'].insert(1, daily_rows['2018-01-02'][-1])
+    _write_partitions(tmp_path, daily_rows)
+    since = datetime.fromisoformat("2018-01-02 00:00+00:00")
+    until = datetime.fromisoformat("2018-01-04 00:00+00:00")
+    factory = PartitionedCSVCandlesFactory(str(tmp_path), PATTERN, 
+                                           "BTCUSDT", tf.H4)
+    strict_factory = PartitionedCSVCandlesFactory(str(tmp_path), PATTERN, 
+                                                  "BTCUSDT", tf.H4, 
+                                                  strict=True)
+    candles = list(factory.create(since, until))
+
+    assert len(candles) == 12
+    with raises(PartitionOverlap):
+        list(strict_factory.create(since, until))
+
+
+def test_gap_between_partitions_will_raise(daily_rows, tmp_path):
+    """Ensure that gap between partitions is detected in strict mode."""
+    del daily_rows['2018-01-03'][1]
+    _write_partitions(tmp_path, daily_rows)
+    since = datetime.fromisoformat("2018-01-02 00:00+00:00")
+    until = datetime.fromisoformat("2018-01-04 00:00+00:00")
+    factory = PartitionedCSVCandlesFactory(str(tmp_path), PATTERN, 
+                                           "BTCUSDT", tf.H4, strict=True)
+
+    with raises(PartitionGap):
+        list(factory.create(since, until))
@@ -0,0 +1,79 @@
+import numpy
+from datetime import datetime
+from backintime.timeframes import Timeframes as tf
+from backintime.candles import CandlesBuffer, ResampledCandlesBuffer
+from backintime.data.columns import CandleColumns, to_millis
+from backintime.resampling import resample
+
+
+def _h1_columns(hours) -> CandleColumns:
+    """H1 candles at `hours` since 2022-12-01, with close = hour."""
+    start = to_millis(datetime.fromisoformat('2022-12-01 00:00+00:00'))
+    open_time = start + numpy.array(hours, dtype=numpy.int64)*3600_000
+    prices = numpy.array(hours, dtype=numpy.float64)
+    return CandleColumns(open_time, open_time + 3600_000 - 1, prices,
+                         prices + 0.5, prices - 0.5, prices, 
+                         numpy.ones(len(hours)))
+
+
+def test_resample_bars_and_partial_state():
+    """
+    Ensure that bars and in-progress state of each bar are built
+    correctly, including bars with missing candles.
+    """
+    # The second H4 bar misses its first candle
+    columns = _h1_columns([0, 1, 2, 3, 5, 6, 7, 8])
+    resampled = resample(columns, tf.H4)
+
+    assert len(resampled.bars) == 3
+    assert resampled.bars.open.tolist() == [0, 5, 8]
+    assert resampled.bars.high.tolist() == [3.5, 7.5, 8.5]
+    assert resampled.bars.low.tolist() == [-0.5, 4.5, 7.5]
+    assert resampled.bars.close.tolist() == [3, 7, 8]
+    assert resampled.bars.volume.tolist() == [4, 3, 1]
+    assert resampled.bars.open_time[1] == columns.open_time[4]
+    assert resampled.bars.close_time[1] - columns.open_time[0] == \
+                8*3600_000 - 1
+
+    assert resampled.bar_index.tolist() == [0, 0, 0, 0, 1, 1, 1, 2]
+    assert resampled.partial.high.tolist() == \
+                [0.5, 1.5, 2.5, 3.5, 5.5, 6.5, 7.5, 8.5]
+    assert resampled.partial.low.tolist() == \
+                [-0.5, -0.5, -0.5, -0.5, 4.5, 4.5, 4.5, 7.5]
+    assert resampled.partial.volume.tolist() == [1, 2, 3, 4, 1, 2, 3, 1]
+    assert resampled.is_closed.tolist() == \
+                [False, False, False, True, False, False, True, False]
+
+
+def test_resample_sums_volume_exactly():
+    """
+    Ensure that volumes are summed as decimals, 
+    without float rounding errors.
+    """
+    columns = _h1_columns([0, 1, 2])
+    columns.volume[:] = [0.1, 0.2, 0.7]
+    resampled = resample(columns, tf.H4)
+
+    assert resampled.partial.volume.tolist() == [0.1, 0.3, 1.0]
+    assert resampled.bars.volume.tolist() == [1.0]
+
+
+def test_resampled_buffer_matches_incremental_after_gap():
+    """
+    Ensure that candles of `ResampledCandlesBuffer` match those of 
+    `CandlesBuffer` when the first candle of a bar is missing.
+    """
+    columns = _h1_columns([0, 1, 2, 3, 5, 6, 7, 8])
+    columns.volume[:] = [0.1, 0.2, 0.3, 0.4, 1.1, 2.2, 3.3, 0.5]
+    start_time = datetime.fromisoformat('2022-12-01 00:00+00:00')
+    buffer = CandlesBuffer(start_time, { tf.H4 })
+    resampled = ResampledCandlesBuffer(start_time, { tf.H4 }, columns)
+
+    for candle in columns:
+        buffer.update(candle)
+        resampled.update(candle)
+        expected, actual = buffer.get(tf.H4), resampled.get(tf.H4)
+        assert actual.open_time == expected.open_time
+        assert actual.close_time == expected.close_time
+        assert actual.volume == expected.volume
+        assert actual.is_closed == expected.is_closed
@@ -0,0 +1,120 @@
+import os
+import typing as t
+from datetime import datetime
+from pytest import fixture
+from backintime.timeframes import Timeframes as tf
+from backintime.data.candle import Candle
+from backintime.data.csv import CSVCandlesFactory
+from backintime.data.data_provider import DataProviderError, ParsingError
+from backintime.data.sqlite import SQLiteCandlesFactory, import_csv
+
+
+def _candles_equal(first_candle: Candle, second_candle: Candle) -> bool:
+    return (first_candle.open_time == second_candle.open_time and \
+            first_candle.open == second_candle.open and \
+            first_candle.high == second_candle.high and \
+            first_candle.low == second_candle.low and \
+            first_candle.close == second_candle.close and \
+            first_candle.close_time == second_candle.close_time and \
+            first_candle.volume == second_candle.volume)
+
+
+@fixture
+def csv_factory() -> CSVCandlesFactory:
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, 'csv_test', 'test_h4_candles.csv')
+    return CSVCandlesFactory(test_file, "BTCUSDT", tf.H4)
+
+
+def test_sqlite_candles_match_csv(csv_factory, tmp_path):
+    """
+    Ensure that candles imported from CSV file are read back 
+    from SQLite database for the same date range.
+    """
+    database = str(tmp_path / 'candles.db')
+    imported = import_csv(database, csv_factory, batch_size=7)
+    since = datetime.fromisoformat("2018-01-03 08:00+00:00")
+    until = datetime.fromisoformat("2018-01-06 04:00+00:00")
+    factory = SQLiteCandlesFactory(database, "BTCUSDT", tf.H4, 
+                                   batch_size=4)
+    expected = list(csv_factory.create(since, until))
+    candles = list(factory.create(since, until))
+
+    assert imported == len(csv_factory.load_columns())
+    assert len(candles) == len(expected)
+    assert all(map(_candles_equal, candles, expected))
+
+
+def test_sqlite_candles_filtered_by_symbol(csv_factory, tmp_path):
+    """Ensure that candles of other symbols are not yielded."""
+    database = str(tmp_path / 'candles.db')
+    import_csv(database, csv_factory)
+    since = datetime.fromisoformat("2018-01-01 00:00+00:00")
+    until = datetime.fromisoformat("2019-01-01 00:00+00:00")
+
+    assert not list(SQLiteCandlesFactory(database, "ETHUSDT", tf.H4)
+                        .create(since, until))
+    assert not list(SQLiteCandlesFactory(database, "BTCUSDT", tf.H1)
+                        .create(since, until))
+
+
+def test_csv_is_imported_in_chunks(csv_factory, tmp_path):
+    """
+    Ensure that all candles are imported when CSV file is parsed
+    in chunks, in a pool of processes.
+    """
+    database = str(tmp_path / 'candles.db')
+    chunked = CSVCandlesFactory(csv_factory.filename, "BTCUSDT", tf.H4, 
+                                workers=2, chunk_size=512)
+    imported = import_csv(database, chunked, batch_size=7)
+    since = datetime.fromisoformat("2018-01-01 00:00+00:00")
+    until = datetime.fromisoformat("2019-01-01 00:00+00:00")
+    expected = list(csv_factory.create(since, until))
+    candles = list(SQLiteCandlesFactory(database, "BTCUSDT", tf.H4)
+                        .create(since, until))
+
+    assert len(list(chunked.iter_columns())) > 1
+    assert imported == len(expected)
+    assert len(candles) == len(expected)
+    assert all(map(_candles_equal, candles, expected))
+
+
+def test_import_of_missing_price_will_raise(csv_factory, tmp_path):
+    """
+    Ensure that importing candle without close price 
+    will raise `ParsingError`.
+    """
+    with open(csv_factory.filename) as csvfile:
+        rows = csvfile.readlines()
+    fields = rows[3].split(';')
+    fields[4] = 'NaN'
+    rows[3] = ';'.join(fields)
+    test_file = tmp_path / 'candles.csv'
+    test_file.write_text(''.join(rows))
+    database = str(tmp_path / 'candles.db')
+    factory = CSVCandlesFactory(str(test_file), "BTCUSDT", tf.H4)
+    parsing_error_raised = False
+
+    try:
+        import_csv(database, factory)
+    except ParsingError:
+        parsing_error_raised = True
+    assert parsing_error_raised
+
+
+def test_missing_database_will_raise(tmp_path):
+    """
+    Ensure that reading from missing database 
+    will raise `DataProviderError`.
+    """
+    database = str(tmp_path / 'missing.db')
+    since = datetime.fromisoformat("2018-01-01 00:00+00:00")
+    until = datetime.fromisoformat("2019-01-01 00:00+00:00")
+    candles = SQLiteCandlesFactory(database, "BTCUSDT", tf.H4)
+    data_provider_error_raised = False
+
+    try:
+        next(iter(candles.create(since, until)))
+    except DataProviderError:
+        data_provider_error_raised = True
+    assert data_provider_error_raised
@@ -1,19 +1,30 @@
 import os
 import typing as t
-from pytest import fixture
-from datetime import datetime
+import numpy
+from pytest import fixture, mark
+from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 from backintime.trading_strategy import TradingStrategy
 from backintime.timeframes import Timeframes as tf
 from backintime.data.csv import CSVCandlesFactory
+from backintime.data.columns import (
+    CandleColumns, 
+    CandleColumnsFactory, 
+    to_millis
+)
 from backintime.analyser.analyser import Analyser
 from backintime.analyser.indicators.sma import sma_params as sma
+from backintime.analyser.indicators.constants import (
+    CandleProperties,
+    OPEN, HIGH, LOW, CLOSE
+)
 from backintime.utils import (
     run_backtest,
     prefetch_values, 
     PREFETCH_SINCE, 
     PREFETCH_UNTIL,
-    IncompatibleTimeframe
+    IncompatibleTimeframe,
+    get_required_properties
 )
 
 
@@ -102,3 +113,157 @@ def test_incompatible_timeframe(stumb_strategy):
     except IncompatibleTimeframe:
         incompatible_timeframe_raised = True
     assert incompatible_timeframe_raised
+
+
+def test_required_properties(stumb_strategy):
+    """
+    Ensure that only prices used by indicators and broker are
+    required, unless the strategy reads candles directly.
+    """
+    class CandlesStrategy(stumb_strategy):
+        candle_timeframes = { tf.H4 }
+
+    assert get_required_properties(stumb_strategy) == \
+                { OPEN, HIGH, LOW, CLOSE }
+    assert get_required_properties(CandlesStrategy) == set(CandleProperties)
+
+
+def test_resampled_backtest_matches_incremental():
+    """
+    Ensure that backtesting with candles resampled up front gives
+    the same candles, indicators and trades as aggregating them
+    one at a time.
+    """
+    class RecordingStrategy(TradingStrategy):
+        indicators = { sma(tf.D1, period=5) }
+        candle_timeframes = { tf.D1: 3, tf.H4: 0 }
+        records: t.List[tuple] = []
+
+        def tick(self):
+            candle = self.candles.get(tf.D1)
+            history = self.candles.history(tf.D1, 3)
+            ma = self.analyser.sma(tf.D1, period=5)[-1]
+            self.records.append((candle.open_time, candle.high, candle.low,
+                                 candle.close, candle.volume, 
+                                 candle.is_closed, 
+                                 self.candles.get(tf.H4).close,
+                                 history.close.tolist(), 
+                                 history.volume.tolist(), ma))
+            if not self.position and candle.close > ma:
+                self.buy()
+            elif self.position and candle.close < ma:
+                self.sell()
+
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, "test_h4.csv")
+    candles = CSVCandlesFactory(test_file, 'BTCUSDT', tf.H4)
+    since = datetime.fromisoformat("2021-12-02 00:00+00:00")
+    until = datetime.fromisoformat("2022-01-01 00:00+00:00")
+    results = []
+    for resample in (False, True):
+        RecordingStrategy.records = []
+        result = run_backtest(RecordingStrategy, candles, 10_000, 
+                              since, until, '0.001', '0.001', 
+                              resample=resample)
+        results.append((RecordingStrategy.records, result))
+    (expected, expected_result), (records, result) = results
+
+    assert len(records) == len(expected) > 0
+    assert records == expected
+    assert result.trades_count == expected_result.trades_count > 0
+    assert result.result_balance == expected_result.result_balance
+
+
+def test_tick_only_on_tick_timeframes():
+    """
+    Ensure that `tick` is called only when candles of 
+    `tick_timeframes` close.
+    """
+    class DailyStrategy(TradingStrategy):
+        tick_timeframes = { tf.D1 }
+        candle_timeframes = { tf.D1 }
+        ticks: t.List[datetime] = []
+
+        def tick(self):
+            candle = self.candles.get(tf.D1)
+            assert candle.is_closed
+            self.ticks.append(candle.open_time)
+
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, "test_h4.csv")
+    candles = CSVCandlesFactory(test_file, 'BTCUSDT', tf.H4)
+    since = datetime.fromisoformat("2021-12-02 00:00+00:00")
+    until = datetime.fromisoformat("2021-12-07 00:00+00:00")
+    run_backtest(DailyStrategy, candles, 10_000, since, until, 
+                 '0.001', '0.001')
+
+    assert len(DailyStrategy.ticks) == 5
+    assert DailyStrategy.ticks[0] == since
+
+
+@mark.parametrize('resample', [False, True])
+def test_tick_timeframes_with_boundary_close_time(resample):
+    """
+    Ensure that ticks on `tick_timeframes` don't depend on whether
+    close time is the last ms of a candle or the next open time.
+    """
+    class H4Strategy(TradingStrategy):
+        tick_timeframes = { tf.H4 }
+        candle_timeframes = { tf.H1 }
+        ticks: t.List[datetime] = []
+
+        def tick(self):
+            self.ticks.append(self.candles.get(tf.H1).open_time)
+
+    since = datetime.fromisoformat("2022-12-01 00:00+00:00")
+    open_time = to_millis(since) + numpy.arange(24, dtype=numpy.int64)*3600_000
+    prices = numpy.full(24, 100.0)
+    columns = CandleColumns(open_time, open_time + 3600_000, prices, 
+                            prices, prices, prices, prices)
+    candles = CandleColumnsFactory(columns, 'BTCUSDT', tf.H1)
+    run_backtest(H4Strategy, candles, 10_000, since, 
+                 since + timedelta(days=1), '0.001', '0.001', 
+                 resample=resample)
+
+    assert H4Strategy.ticks == [ since + timedelta(hours=4*i + 3) 
+                                    for i in range(6) ]
+
+def test_sleeping_strategy_skips_ticks():
+    """
+    Ensure that sleeping strategy doesn't tick until wake up
+    condition is met, while orders are still executed, 
+    with and without resampling.
+    """
+    class SleepingStrategy(TradingStrategy):
+        candle_timeframes = { tf.H4 }
+        ticks: t.List[datetime] = []
+
+        def tick(self):
+            candle = self.candles.get(tf.H4)
+            self.ticks.append(candle.open_time)
+            if not self.position:
+                self.buy()
+            else:
+                self.sell()
+            self.sleep_until(price_above=candle.close * Decimal('1.03'),
+                             price_below=candle.close * Decimal('0.97'))
+
+    dirname = os.path.dirname(__file__)
+    test_file = os.path.join(dirname, "test_h4.csv")
+    candles = CSVCandlesFactory(test_file, 'BTCUSDT', tf.H4)
+    since = datetime.fromisoformat("2021-11-01 00:00+00:00")
+    until = datetime.fromisoformat("2021-12-07 00:00+00:00")
+    results = []
+    for resample in (False, True):
+        SleepingStrategy.ticks = []
+        result = run_backtest(SleepingStrategy, candles, 10_000, 
+                              since, until, '0.001', '0.001', 
+                              resample=resample)
+        results.append((SleepingStrategy.ticks, result))
+    (expected, expected_result), (ticks, result) = results
+
+    assert 1 < len(ticks) < 36*6 // 2
+    assert ticks == expected
+    assert result.trades_count == expected_result.trades_count > 0
+    assert result.result_balance == expected_result.result_balance
+    assert result.result_equity == expected_result.result_equity